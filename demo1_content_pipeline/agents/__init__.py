@@ -1,13 +1,21 @@
 """Agent definitions for the content creation pipeline."""
 
-from .planner import create_planner_agent
-from .researcher import create_researcher_agent
-from .writer import create_writer_agent
-from .critic import create_critic_agent
-
-__all__ = [
-    "create_planner_agent",
-    "create_researcher_agent",
-    "create_writer_agent",
-    "create_critic_agent",
-]
+import importlib
+
+# Each factory's module imports AutoGen, so it is only loaded when the
+# factory is first looked up
+_FACTORY_MODULES = {
+    "create_planner_agent": ".planner",
+    "create_researcher_agent": ".researcher",
+    "create_writer_agent": ".writer",
+    "create_critic_agent": ".critic",
+}
+
+__all__ = list(_FACTORY_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _FACTORY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_FACTORY_MODULES[name], __name__)
+    return getattr(module, name)
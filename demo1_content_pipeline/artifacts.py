@@ -0,0 +1,286 @@
+"""
+Content-addressed store for the pipeline's approved content.
+
+A finished run's approved draft and research payloads are written as
+zlib-compressed blobs named by the SHA-256 of their content, so identical
+outputs (re-runs, cache-served runs) are stored once. Each run adds a small
+manifest blob with the topic, content type and run metadata; the manifest's
+digest is the artifact's key. A SQLite index maps topic, content type and
+date to keys, so downstream jobs can fetch results without re-running the
+pipeline or parsing transcripts.
+
+Usage:
+    python demo1_content_pipeline/artifacts.py list --topic "Python asyncio basics"
+    python demo1_content_pipeline/artifacts.py show <key> [--research]
+    python demo1_content_pipeline/artifacts.py latest "Python asyncio basics" technical_blog
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+ARTIFACT_VERSION = 1
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+class ArtifactStore:
+    """
+    Compressed, content-addressed blobs under ``directory/objects`` and a
+    SQLite index of runs in ``directory/index.sqlite``.
+
+    Safe to share between threads; several processes can write to the same
+    directory, as blobs are written atomically and SQLite serializes the
+    index.
+    """
+
+    def __init__(self, directory: str, compression_level: int = 6):
+        self.directory = directory
+        self.compression_level = compression_level
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(self.directory, "index.sqlite"),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS artifacts (
+                    key TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    date TEXT NOT NULL,
+                    status TEXT,
+                    content_digest TEXT NOT NULL
+                )""")
+            self._conn.execute("""CREATE INDEX IF NOT EXISTS artifacts_job
+                ON artifacts (topic, content_type, created_at)""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS artifacts_date ON artifacts (date)"
+            )
+        return self._conn
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
+
+    def put_blob(self, data: bytes) -> str:
+        """Store ``data`` once and return its SHA-256 digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(zlib.compress(data, self.compression_level))
+        os.replace(partial, path)
+        return digest
+
+    def get_blob(self, digest: str) -> Optional[bytes]:
+        if not _DIGEST.fullmatch(digest):
+            return None
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+    def _put_json(self, value: Any) -> str:
+        return self.put_blob(
+            json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode(
+                "utf-8"
+            )
+        )
+
+    def _get_json(self, digest: str) -> Any:
+        data = self.get_blob(digest)
+        return None if data is None else json.loads(data)
+
+    def put(
+        self,
+        topic: str,
+        content_type: str,
+        content: str,
+        research: Optional[List[Dict[str, Any]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Store one run's content, research and metadata.
+
+        Returns:
+            The artifact key (the digest of the run's manifest)
+        """
+        created_at = time.time()
+        manifest = {
+            "version": ARTIFACT_VERSION,
+            "topic": topic,
+            "content_type": content_type,
+            "created_at": created_at,
+            "content": self.put_blob(content.encode("utf-8")),
+            "research": self._put_json(research or []),
+            "metadata": metadata or {},
+        }
+        key = self._put_json(manifest)
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    topic,
+                    content_type,
+                    created_at,
+                    time.strftime("%Y-%m-%d", time.gmtime(created_at)),
+                    (metadata or {}).get("status"),
+                    manifest["content"],
+                ),
+            )
+        return key
+
+    def get(self, key: str, research: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Load an artifact by key.
+
+        Args:
+            key: Artifact key returned by ``put``
+            research: Also load the research payloads
+
+        Returns:
+            The manifest with ``key``, the content text under ``text`` and,
+            if requested, the payloads under ``research_payloads``; None if
+            the key is unknown
+        """
+        manifest = self._get_json(key)
+        if not isinstance(manifest, dict) or manifest.get("version") != (
+            ARTIFACT_VERSION
+        ):
+            return None
+        content = self.get_blob(manifest["content"])
+        if content is None:
+            return None
+        artifact = {"key": key, **manifest, "text": content.decode("utf-8")}
+        if research:
+            artifact["research_payloads"] = self._get_json(manifest["research"]) or []
+        return artifact
+
+    def find(
+        self,
+        topic: Optional[str] = None,
+        content_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        List index entries, newest first.
+
+        Args:
+            topic: Only this topic
+            content_type: Only this content type
+            since: Only artifacts from this UTC date (YYYY-MM-DD) on
+            until: Only artifacts up to and including this UTC date
+            limit: Maximum number of entries (None for all)
+
+        Returns:
+            Dicts with key, topic, content_type, created_at, date, status
+            and content_digest
+        """
+        filters, params = [], []
+        for column, operator, value in (
+            ("topic", "=", topic),
+            ("content_type", "=", content_type),
+            ("date", ">=", since),
+            ("date", "<=", until),
+        ):
+            if value is not None:
+                filters.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        with self._lock:
+            cursor = self._connection().execute(
+                f"""SELECT key, topic, content_type, created_at, date, status,
+                content_digest FROM artifacts {where}
+                ORDER BY created_at DESC LIMIT ?""",
+                (*params, -1 if limit is None else limit),
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def latest(self, topic: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """Load the newest artifact for a job, or None if it has none."""
+        entries = self.find(topic=topic, content_type=content_type, limit=1)
+        return self.get(entries[0]["key"]) if entries else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from config import ARTIFACT_DIR
+
+    parser = argparse.ArgumentParser(description="Inspect stored pipeline results.")
+    parser.add_argument("--dir", default=ARTIFACT_DIR, help="Artifact directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="List artifacts, newest first")
+    listing.add_argument("--topic")
+    listing.add_argument("--content-type")
+    listing.add_argument("--since", help="UTC date, YYYY-MM-DD")
+    listing.add_argument("--until", help="UTC date, YYYY-MM-DD")
+    listing.add_argument("--limit", type=int, default=20)
+    show = commands.add_parser("show", help="Print one artifact's content")
+    show.add_argument("key")
+    show.add_argument("--research", action="store_true", help="Print as JSON")
+    latest = commands.add_parser("latest", help="Print a job's newest content")
+    latest.add_argument("topic")
+    latest.add_argument("content_type")
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.dir)
+    if args.command == "list":
+        for entry in store.find(
+            args.topic, args.content_type, args.since, args.until, args.limit
+        ):
+            print(
+                f"{entry['key'][:16]}  {entry['date']}  {entry['content_type']:<15}"
+                f"{entry['topic']}"
+            )
+        return 0
+    if args.command == "show":
+        # Keys can be abbreviated to any unique prefix shown by "list"
+        matches = [
+            entry["key"]
+            for entry in store.find(limit=None)
+            if entry["key"].startswith(args.key)
+        ]
+        artifact = store.get(matches[0], research=args.research) if matches else None
+        if len(matches) > 1:
+            print(f"Ambiguous key prefix '{args.key}'", file=sys.stderr)
+            return 1
+    else:
+        artifact = store.latest(args.topic, args.content_type)
+    if artifact is None:
+        print("No such artifact", file=sys.stderr)
+        return 1
+    if args.command == "show" and args.research:
+        print(json.dumps(artifact, indent=2, ensure_ascii=False))
+    else:
+        print(artifact["text"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
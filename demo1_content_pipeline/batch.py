@@ -0,0 +1,216 @@
+"""Headless batch runner for the content creation pipeline.
+
+Reads (topic, content_type) jobs from a JSONL or CSV file, runs the pipeline
+for each one in a single process and appends every result to a JSONL output
+as soon as the job finishes. Jobs already present in the output are skipped,
+so re-running the same command resumes an interrupted batch.
+
+Usage:
+    python demo1_content_pipeline/batch.py jobs.jsonl -o results.jsonl
+    python demo1_content_pipeline/batch.py jobs.jsonl -o results.jsonl -c 32
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_CONTENT_TYPE = "technical_blog"
+
+JobKey = Tuple[str, str]
+
+
+def job_key(job: Dict[str, Any]) -> JobKey:
+    return (job["topic"].strip(), job.get("content_type") or DEFAULT_CONTENT_TYPE)
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from e
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def load_jobs(path: str) -> List[Dict[str, str]]:
+    """
+    Load pipeline jobs from a JSONL or CSV file.
+
+    Each job needs a ``topic``; ``content_type`` defaults to technical_blog.
+    CSV files must have a header row with those column names.
+
+    Args:
+        path: Path to a ``.jsonl``/``.json`` or ``.csv`` job file
+
+    Returns:
+        List of jobs with ``topic`` and ``content_type`` keys, duplicates removed
+    """
+    reader = _read_csv if path.lower().endswith(".csv") else _read_jsonl
+
+    jobs = []
+    seen: Set[JobKey] = set()
+    for raw in reader(path):
+        if not raw.get("topic"):
+            continue
+        topic, content_type = job_key(raw)
+        if (topic, content_type) in seen:
+            continue
+        seen.add((topic, content_type))
+        jobs.append({"topic": topic, "content_type": content_type})
+    return jobs
+
+
+def load_completed(output_path: str) -> Set[JobKey]:
+    """
+    Collect the keys of jobs that already have a result in the output file.
+
+    Failed jobs (status "error") are not counted, so they are retried on rerun.
+    A truncated last line from a killed run is ignored.
+    """
+    completed: Set[JobKey] = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("topic") and record.get("status") != "error":
+                completed.add(job_key(record))
+    return completed
+
+
+def append_result(output_path: str, result: Dict[str, Any]) -> None:
+    with open(output_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_batch(
+    jobs_path: str, output_path: str, concurrency: int = 1, resume: bool = False
+) -> Dict[str, int]:
+    """
+    Run every pending job and record each result as soon as it finishes.
+
+    With ``concurrency`` of 1 jobs run one after another with the usual
+    console transcript; above 1 they are multiplexed on one event loop via
+    the async pipeline and only a line per finished job is printed.
+
+    Args:
+        jobs_path: JSONL or CSV job file
+        output_path: JSONL file that results are appended to
+        concurrency: Maximum number of pipelines in flight
+        resume: Continue failed jobs from their last checkpointed round
+
+    Returns:
+        Counts of jobs run, skipped, and failed
+    """
+    from pipeline import PipelineSession, a_run_many, run_content_pipeline
+
+    jobs = load_jobs(jobs_path)
+    completed = load_completed(output_path)
+    todo = [job for job in jobs if job_key(job) not in completed]
+    stats = {
+        "total": len(jobs),
+        "skipped": len(jobs) - len(todo),
+        "run": 0,
+        "failed": 0,
+    }
+
+    def record(result: Dict[str, Any]) -> None:
+        append_result(output_path, result)
+        stats["run"] += 1
+        if result["status"] == "error":
+            stats["failed"] += 1
+        print(
+            f"[{stats['run']}/{len(todo)}] {result['status']}: "
+            f"{result['content_type']}: {result['topic']}"
+        )
+
+    if concurrency > 1:
+        asyncio.run(
+            a_run_many(todo, concurrency=concurrency, on_result=record, resume=resume)
+        )
+        return stats
+
+    # One set of agents serves every job; only the conversation is reset
+    session = PipelineSession() if todo else None
+    for job in todo:
+        record(
+            run_content_pipeline(
+                job["topic"], job["content_type"], resume=resume, session=session
+            )
+        )
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the content pipeline over a JSONL/CSV job file."
+    )
+    parser.add_argument(
+        "jobs", help="Job file (.jsonl or .csv) with topic,content_type"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="results.jsonl",
+        help="JSONL file to append results to (default: results.jsonl)",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of pipelines to run at once on one event loop (default: 1)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue failed jobs from their last checkpointed round",
+    )
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        args.jobs,
+        args.output,
+        concurrency=max(1, args.concurrency),
+        resume=args.resume,
+    )
+    print(
+        f"\nBatch finished: {stats['run']} run, {stats['skipped']} skipped, "
+        f"{stats['failed']} failed (of {stats['total']} jobs)"
+    )
+    if stats["run"]:
+        from pipeline import (
+            print_cache_stats,
+            print_model_stats,
+            print_rate_limit_stats,
+            print_stream_stats,
+        )
+
+        print_cache_stats()
+        print_stream_stats()
+        print_model_stats()
+        print_rate_limit_stats()
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""Offline benchmark for the content creation pipeline.
+
+Starts the scripted mock chat-completions server from mock_server.py, points
+every agent at it and runs the full pipeline once per demo topic (or per
+--repeat). Reports wall time, rounds, LLM calls, new client connections,
+prompt tokens and local overhead (wall time minus the latency the server
+simulated), so regressions in the orchestration code show up without
+network access or API spend.
+
+Usage:
+    python demo1_content_pipeline/benchmark.py
+    python demo1_content_pipeline/benchmark.py --latency-ms 400 --jitter-ms 100 \\
+        --tokens-per-second 80 --speaker-selection graph --json bench.json
+    python demo1_content_pipeline/benchmark.py --draft-candidates 3
+    python demo1_content_pipeline/benchmark.py --section-parallel --tokens-per-second 40
+    python demo1_content_pipeline/benchmark.py --max-overhead-s 0.5  # CI gate
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from mock_server import MockLLMServer
+
+
+def configure_environment(
+    base_url: str,
+    speaker_selection: str,
+    draft_candidates: int = 1,
+    section_parallel: bool = False,
+) -> None:
+    # config.py reads these at import time, so this must run before pipeline is
+    # imported. The completion cache is off so every run reaches the server.
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ["OPENAI_API_KEY"] = "sk-mock-benchmark"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["TRACE_PATH"] = ""
+    os.environ["CHECKPOINT_ENABLED"] = "false"
+    os.environ["ARTIFACTS_ENABLED"] = "false"
+    os.environ["SPEAKER_SELECTION_METHOD"] = speaker_selection
+    os.environ["DRAFT_CANDIDATES"] = str(draft_candidates)
+    os.environ["SECTION_PARALLEL"] = str(section_parallel).lower()
+
+
+def run_once(
+    server: MockLLMServer, topic: str, content_type: str, session: Any = None
+) -> Dict[str, Any]:
+    from pipeline import PipelineSession
+
+    server.reset_stats()
+    started = time.perf_counter()
+    # Without a shared session each job builds its own, inside the timing, so
+    # the two modes differ only in the build cost that reuse saves
+    if session is None:
+        session = PipelineSession(silent=True)
+    result = session.run(topic, content_type)
+    wall = time.perf_counter() - started
+
+    return {
+        "topic": topic,
+        "status": result["status"],
+        "wall_s": wall,
+        "rounds": result["rounds"],
+        "llm_calls": server.requests,
+        "connections": server.connections,
+        "prompt_tokens": server.prompt_tokens,
+        "cached_tokens": server.cached_tokens,
+        "llm_s": server.simulated_seconds,
+        "overhead_s": max(0.0, wall - server.simulated_seconds),
+        **({"error": result["error"]} if "error" in result else {}),
+    }
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    header = (
+        f"{'topic':<34}{'status':<18}{'wall s':>8}{'rounds':>8}"
+        f"{'LLM calls':>11}{'conns':>7}{'prompt tok':>12}{'cached':>8}{'LLM s':>8}"
+        f"{'overhead s':>12}"
+    )
+    print(header)
+    print("─" * len(header))
+    for row in rows:
+        print(
+            f"{row['topic'][:33]:<34}{row['status']:<18}{row['wall_s']:>8.2f}"
+            f"{row['rounds']:>8}{row['llm_calls']:>11}{row['connections']:>7}"
+            f"{row['prompt_tokens']:>12}{row['cached_tokens']:>8}"
+            f"{row['llm_s']:>8.2f}{row['overhead_s']:>12.3f}"
+        )
+    print("─" * len(header))
+    print(
+        f"{'median':<52}{statistics.median(r['wall_s'] for r in rows):>8.2f}"
+        f"{statistics.median(r['rounds'] for r in rows):>8.0f}"
+        f"{statistics.median(r['llm_calls'] for r in rows):>11.0f}"
+        f"{statistics.median(r['connections'] for r in rows):>7.0f}"
+        f"{statistics.median(r['prompt_tokens'] for r in rows):>12.0f}"
+        f"{statistics.median(r['cached_tokens'] for r in rows):>8.0f}"
+        f"{statistics.median(r['llm_s'] for r in rows):>8.2f}"
+        f"{statistics.median(r['overhead_s'] for r in rows):>12.3f}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline against a local mock LLM server."
+    )
+    parser.add_argument("--content-type", default="technical_blog")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per topic")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=None,
+        help="Simulated generation speed (default: instant)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--speaker-selection", choices=["auto", "graph"], default="auto"
+    )
+    parser.add_argument(
+        "--fail-model",
+        action="append",
+        default=[],
+        help="Have the mock answer this model with 503 errors (repeatable)",
+    )
+    parser.add_argument(
+        "--draft-candidates",
+        type=int,
+        default=1,
+        help="Parallel Writer drafts per turn (default: 1, no speculative drafting)",
+    )
+    parser.add_argument(
+        "--section-parallel",
+        action="store_true",
+        help="Write long-form Writer turns section by section, concurrently",
+    )
+    parser.add_argument(
+        "--reuse-session",
+        action="store_true",
+        help="Run every topic on one PipelineSession instead of rebuilding",
+    )
+    parser.add_argument("--json", help="Also write the per-run rows to this file")
+    parser.add_argument(
+        "--max-overhead-s",
+        type=float,
+        default=None,
+        help="Exit with status 1 if the median local overhead exceeds this",
+    )
+    args = parser.parse_args(argv)
+
+    with MockLLMServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+        failing_models=args.fail_model,
+    ) as server:
+        configure_environment(
+            server.base_url,
+            args.speaker_selection,
+            args.draft_candidates,
+            args.section_parallel,
+        )
+        from main import DEMO_TOPICS
+        from pipeline import PipelineSession
+
+        session = PipelineSession(silent=True) if args.reuse_session else None
+        rows = [
+            run_once(server, topic, args.content_type, session)
+            for topic in DEMO_TOPICS
+            for _ in range(max(1, args.repeat))
+        ]
+
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+    failed = [row for row in rows if row["status"] == "error"]
+    if failed:
+        print(f"\n{len(failed)} run(s) failed: {failed[0].get('error')}")
+        return 1
+    median_overhead = statistics.median(row["overhead_s"] for row in rows)
+    if args.max_overhead_s is not None and median_overhead > args.max_overhead_s:
+        print(
+            f"\nMedian overhead {median_overhead:.3f}s exceeds "
+            f"--max-overhead-s {args.max_overhead_s}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
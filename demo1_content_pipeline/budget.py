@@ -0,0 +1,136 @@
+"""
+Per-conversation budgets for the content pipeline.
+
+MAX_ROUNDS caps the number of turns, but not what they cost: a verbose run
+can spend far more tokens and time than the cap suggests. A BudgetGovernor
+adds up the tokens, estimated cost and wall time of one conversation and
+ends it gracefully, after the current turn, once any ceiling is reached.
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from autogen import Agent, GroupChatManager
+
+from llm_cache import from_cache
+from prompt_prefix import cached_tokens
+
+REASON_TOKENS = "token budget exhausted"
+REASON_COST = "cost budget exhausted"
+REASON_TIME = "time budget exhausted"
+
+
+class BudgetGovernor:
+    """
+    Tracks one conversation's usage against optional ceilings.
+
+    A limit of None (or 0) is not enforced. Cost is the estimate AutoGen
+    attaches to each response from its price table (or a ``price`` entry in
+    the config list), so unknown models count as free. Responses served by
+    the completion cache cost nothing and are only counted as cache hits.
+    In "auto" mode the manager's speaker selection goes through its own
+    client (routing.py), so those completions are counted too.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost_usd: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        self.max_tokens = max_tokens or None
+        self.max_cost_usd = max_cost_usd or None
+        self.max_seconds = max_seconds or None
+        self.exhausted: Optional[str] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new conversation with the same ceilings."""
+        with self._lock:
+            self.prompt_tokens = 0
+            self.cached_prompt_tokens = 0
+            self.completion_tokens = 0
+            self.cache_hits = 0
+            self.cost_usd = 0.0
+            self.started = time.perf_counter()
+            self.exhausted = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record(self, response: Any) -> None:
+        """Add one completion's token usage and cost."""
+        if from_cache(response):
+            with self._lock:
+                self.cache_hits += 1
+            return
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.cached_prompt_tokens += cached_tokens(response)
+            self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+            self.cost_usd += getattr(response, "cost", 0) or 0
+
+    def check(self) -> Optional[str]:
+        """
+        Return why the budget is exhausted, or None while there is room left.
+
+        The first reason found sticks, so the result records what ended the run.
+        """
+        if self.exhausted is None:
+            if self.max_tokens is not None and self.total_tokens >= self.max_tokens:
+                self.exhausted = REASON_TOKENS
+            elif self.max_cost_usd is not None and self.cost_usd >= self.max_cost_usd:
+                self.exhausted = REASON_COST
+            elif self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+                self.exhausted = REASON_TIME
+        return self.exhausted
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hits": self.cache_hits,
+            "cost_usd": round(self.cost_usd, 6),
+            "elapsed_s": round(self.elapsed(), 3),
+            "exhausted": self.exhausted,
+        }
+
+    def _track_client(self, agent: Agent) -> None:
+        client = getattr(agent, "client", None)
+        if client is None:
+            return
+        create = client.create
+
+        @functools.wraps(create)
+        def metered_create(**config: Any) -> Any:
+            response = create(**config)
+            self.record(response)
+            return response
+
+        client.create = metered_create
+
+    def attach(self, agents: List[Agent], manager: GroupChatManager) -> None:
+        """
+        Meter ``agents``' completions and let ``manager`` end the chat early.
+
+        The manager checks its termination condition on every message it
+        appends, in both the sync and async chat loops, so an exhausted
+        budget ends the conversation there instead of raising mid-turn.
+        """
+        for agent in agents + [manager]:
+            self._track_client(agent)
+        is_termination_msg = manager._is_termination_msg
+
+        def is_termination_or_exhausted(message: Dict) -> bool:
+            return is_termination_msg(message) or self.check() is not None
+
+        manager._is_termination_msg = is_termination_or_exhausted
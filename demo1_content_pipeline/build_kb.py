@@ -0,0 +1,48 @@
+"""
+Build a SQLite knowledge base for the "sqlite" KB_BACKEND.
+
+Loads the built-in entries, or a JSONL file with one
+{"key": ..., "title": ..., "key_points": [...], ...} object per line.
+Unless KB_SEARCH_MODE is "keyword", each entry's embedding is stored too.
+
+Usage:
+    python demo1_content_pipeline/build_kb.py knowledge.sqlite [entries.jsonl]
+"""
+
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+from tools.kb_store import SQLiteKnowledgeStore
+from tools.knowledge_tools import search_options
+
+
+def read_entries(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry.pop("key"), entry
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print(__doc__)
+        return 1
+
+    # Store embeddings too, sized as the workers will read them
+    store = SQLiteKnowledgeStore(argv[0], **search_options())
+    if len(argv) > 1:
+        store.put_many(read_entries(argv[1]))
+    else:
+        from tools.knowledge_tools import KNOWLEDGE_BASE
+
+        store.put_many(KNOWLEDGE_BASE.items())
+    count = sum(1 for _ in store.keys())
+    store.close()
+    print(f"Wrote {count} entries to {argv[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,196 @@
+"""
+Per-round checkpoints of a group chat, and resuming from them.
+
+A run that dies at round 9 (timeout, exception, deploy) would otherwise
+have to pay for every completion again. With a CheckpointStore attached,
+the conversation is written to disk after every message the group chat
+records: the messages themselves (tool calls and tool results included),
+the last speaker and the round. Resuming rebuilds the pipeline, loads the
+messages back through AutoGen's ``GroupChatManager.resume`` and continues
+from the last speaker with only the remaining rounds.
+
+Checkpoints are keyed by topic and content type, plus a run id when the
+caller has one (the service passes its job id), so concurrent runs of the
+same topic do not overwrite each other's.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from autogen import ConversableAgent, GroupChat, GroupChatManager
+
+CHECKPOINT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def group_chats(manager: "GroupChatManager") -> List["GroupChat"]:
+    """
+    ``manager``'s GroupChat and the copies it actually runs the chat on.
+
+    GroupChatManager makes shallow copies of its GroupChat when it registers
+    its reply functions; they share one message list, but settings such as
+    ``max_round`` have to be changed on every copy.
+    """
+    from autogen import GroupChat
+
+    copies = [
+        reply_func["config"]
+        for reply_func in manager._reply_func_list
+        if isinstance(reply_func["config"], GroupChat)
+    ]
+    return [manager.groupchat] + copies
+
+
+class CheckpointStore:
+    """
+    One JSON file per job under ``directory``.
+
+    A job is its topic and content type, and its ``run_id`` if one is given.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, topic: str, content_type: str, run_id: Optional[str] = None) -> str:
+        key = f"{content_type}\n{topic}"
+        if run_id is not None:
+            key += f"\n{run_id}"
+        digest = hashlib.sha256(key.encode("utf-8"))
+        return os.path.join(self.directory, f"{digest.hexdigest()[:16]}.json")
+
+    def save(
+        self,
+        topic: str,
+        content_type: str,
+        messages: List[Dict[str, Any]],
+        run_id: Optional[str] = None,
+    ) -> None:
+        """Write the checkpoint atomically, replacing any earlier one."""
+        os.makedirs(self.directory, exist_ok=True)
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "topic": topic,
+            "content_type": content_type,
+            "run_id": run_id,
+            "round": len(messages),
+            "last_speaker": messages[-1].get("name") if messages else None,
+            "saved_at": time.time(),
+            "messages": messages,
+        }
+        path = self.path(topic, content_type, run_id)
+        # Unique per writer, so two saves of one job cannot mix their bytes
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False, default=str)
+        os.replace(partial, path)
+
+    def load(
+        self, topic: str, content_type: str, run_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the job's checkpoint, or None if there is no usable one."""
+        try:
+            with open(self.path(topic, content_type, run_id), encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("version") != CHECKPOINT_VERSION or not checkpoint.get(
+            "messages"
+        ):
+            return None
+        return checkpoint
+
+    def clear(
+        self, topic: str, content_type: str, run_id: Optional[str] = None
+    ) -> None:
+        try:
+            os.remove(self.path(topic, content_type, run_id))
+        except FileNotFoundError:
+            pass
+
+    def attach(
+        self,
+        manager: "GroupChatManager",
+        topic: str,
+        content_type: str,
+        run_id: Optional[str] = None,
+    ) -> None:
+        """
+        Checkpoint ``manager``'s group chat every time it records a message.
+
+        Attach after ``resume_from_checkpoint``, so the replayed history is
+        not written out again message by message. A failed save is logged
+        and the chat goes on; only the resume point is lost.
+        """
+        messages = manager.groupchat.messages
+
+        for group_chat in group_chats(manager):
+            append = group_chat.append
+
+            @functools.wraps(append)
+            def checkpointed_append(
+                message: Dict, speaker: Any, append: Any = append
+            ) -> None:
+                append(message, speaker)
+                try:
+                    self.save(topic, content_type, messages, run_id)
+                except (OSError, TypeError, ValueError) as e:
+                    logger.warning(
+                        "Could not checkpoint round %d of %r: %s",
+                        len(messages),
+                        topic,
+                        e,
+                    )
+
+            checkpointed_append.checkpoint_store = self
+            group_chat.append = checkpointed_append
+
+    def detach(self, manager: "GroupChatManager") -> None:
+        """Stop checkpointing ``manager``'s group chat (undoes ``attach``)."""
+        for group_chat in group_chats(manager):
+            append = vars(group_chat).get("append")
+            if getattr(append, "checkpoint_store", None) is self:
+                group_chat.append = append.__wrapped__
+
+
+def _prepare_resume(
+    manager: "GroupChatManager", checkpoint: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    # The resumed chat gets the rounds the original run had left
+    done = len(checkpoint["messages"])
+    for group_chat in group_chats(manager):
+        group_chat.max_round = max(2, group_chat.max_round - done + 1)
+    return checkpoint["messages"]
+
+
+def resume_from_checkpoint(
+    manager: "GroupChatManager", checkpoint: Dict[str, Any], silent: bool = False
+) -> Tuple["ConversableAgent", Dict[str, Any]]:
+    """
+    Load a checkpoint into a freshly built pipeline's manager.
+
+    Returns:
+        The last speaker and its message; continue the chat with
+        ``agent.initiate_chat(manager, message=message, clear_history=False)``
+    """
+    messages = _prepare_resume(manager, checkpoint)
+    return manager.resume(
+        messages=messages, remove_termination_string=None, silent=silent
+    )
+
+
+async def a_resume_from_checkpoint(
+    manager: "GroupChatManager", checkpoint: Dict[str, Any], silent: bool = False
+) -> Tuple["ConversableAgent", Dict[str, Any]]:
+    """Async variant of resume_from_checkpoint; continue with ``a_initiate_chat``."""
+    messages = _prepare_resume(manager, checkpoint)
+    return await manager.a_resume(
+        messages=messages, remove_termination_string=None, silent=silent
+    )
@@ -0,0 +1,200 @@
+"""
+Per-agent conversation history compaction.
+
+Every agent in the GroupChat receives the whole history, so earlier Writer
+drafts and long tool outputs are resent on every round. The transforms here
+plug into AutoGen's TransformMessages capability, which runs them on the
+agent's messages right before each completion (the stored history itself is
+never modified).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from autogen import ConversableAgent
+from autogen.token_count_utils import count_token
+
+DRAFT_AUTHOR = "Writer"
+
+
+def _is_tool_call(message: Dict[str, Any]) -> bool:
+    return bool(message.get("function_call") or message.get("tool_calls"))
+
+
+def _is_tool_result(message: Dict[str, Any]) -> bool:
+    return message.get("role") in ("function", "tool")
+
+
+# tiktoken downloads its encodings on first use; when that fails (offline
+# runs) fall back to the usual four-characters-per-token estimate.
+_tokenizer_available = True
+
+
+def _count_tokens(text: str, model: str) -> int:
+    global _tokenizer_available
+    if _tokenizer_available:
+        try:
+            return count_token(text, model)
+        except Exception:
+            _tokenizer_available = False
+    return len(text) // 4
+
+
+def _text_tokens(message: Dict[str, Any], model: str) -> int:
+    content = message.get("content")
+    return _count_tokens(content, model) if isinstance(content, str) else 0
+
+
+class KeepLatestDrafts:
+    """
+    Replace all but the newest ``keep`` Writer drafts with a short marker.
+
+    ``agent_name`` is the agent the history belongs to: its own messages
+    carry the assistant role instead of its name.
+    """
+
+    def __init__(self, agent_name: str, keep: int = 1, author: str = DRAFT_AUTHOR):
+        self.agent_name = agent_name
+        self.keep = keep
+        self.author = author
+
+    def _is_draft(self, message: Dict[str, Any]) -> bool:
+        if not message.get("content") or _is_tool_call(message):
+            return False
+        if message.get("name") == self.author:
+            return True
+        return self.agent_name == self.author and message.get("role") == "assistant"
+
+    def apply_transform(self, messages: List[Dict]) -> List[Dict]:
+        drafts = [i for i, message in enumerate(messages) if self._is_draft(message)]
+        stale = drafts[: max(0, len(drafts) - self.keep)]
+        compacted = list(messages)
+        for i in stale:
+            compacted[i] = {
+                **messages[i],
+                "content": f"[Earlier draft by {self.author} omitted; "
+                "a newer version follows.]",
+            }
+        return compacted
+
+    def get_logs(self, pre: List[Dict], post: List[Dict]) -> Tuple[str, bool]:
+        dropped = sum(a.get("content") != b.get("content") for a, b in zip(pre, post))
+        return f"Omitted {dropped} earlier drafts.", dropped > 0
+
+
+class CompactToolOutputs:
+    """Truncate tool results older than the newest ``keep_latest`` to ``max_chars``."""
+
+    def __init__(self, max_chars: int = 600, keep_latest: int = 2):
+        self.max_chars = max_chars
+        self.keep_latest = keep_latest
+
+    def apply_transform(self, messages: List[Dict]) -> List[Dict]:
+        results = [i for i, message in enumerate(messages) if _is_tool_result(message)]
+        old = results[: max(0, len(results) - self.keep_latest)]
+        compacted = list(messages)
+        for i in old:
+            content = messages[i].get("content")
+            if isinstance(content, str) and len(content) > self.max_chars:
+                compacted[i] = {
+                    **messages[i],
+                    "content": content[: self.max_chars] + " ...[truncated]",
+                }
+        return compacted
+
+    def get_logs(self, pre: List[Dict], post: List[Dict]) -> Tuple[str, bool]:
+        truncated = sum(a.get("content") != b.get("content") for a, b in zip(pre, post))
+        return f"Truncated {truncated} tool outputs.", truncated > 0
+
+
+class TokenBudget:
+    """
+    Drop the oldest messages until the history fits in ``max_tokens``.
+
+    The first message (the task) is always kept, whole messages are dropped
+    rather than cut mid-text, and a tool result is never kept without the
+    call that produced it.
+    """
+
+    def __init__(self, max_tokens: int, model: str = "gpt-4"):
+        self.max_tokens = max_tokens
+        self.model = model
+
+    def apply_transform(self, messages: List[Dict]) -> List[Dict]:
+        if len(messages) <= 2:
+            return messages
+
+        head, rest = messages[:1], messages[1:]
+        # A tool call and the results that answer it are kept or dropped
+        # together; the API rejects a tool result without its call
+        units: List[List[Dict]] = []
+        for message in rest:
+            if _is_tool_result(message) and units and _is_tool_call(units[-1][0]):
+                units[-1].append(message)
+            else:
+                units.append([message])
+
+        budget = self.max_tokens - _text_tokens(head[0], self.model)
+        kept: List[Dict] = []
+        for unit in reversed(units):
+            tokens = sum(_text_tokens(message, self.model) for message in unit)
+            if kept and tokens > budget:
+                break
+            budget -= tokens
+            kept[:0] = unit
+        # Results whose call is not in the history at all
+        while kept and _is_tool_result(kept[0]):
+            kept.pop(0)
+        return head + kept
+
+    def get_logs(self, pre: List[Dict], post: List[Dict]) -> Tuple[str, bool]:
+        dropped = len(pre) - len(post)
+        return f"Dropped {dropped} messages over the token budget.", dropped > 0
+
+
+def build_transforms(
+    agent_name: str, policy: Dict[str, Any], model: str = "gpt-4"
+) -> List[Any]:
+    """
+    Build the transforms for one agent's compaction policy.
+
+    Args:
+        agent_name: Name of the agent whose history is compacted
+        policy: Any of ``keep_drafts``, ``tool_output_chars``,
+            ``keep_tool_outputs`` and ``max_tokens``; a missing or None
+            entry disables that step
+        model: Model name used to count tokens
+
+    Returns:
+        Transforms in the order they are applied
+    """
+    transforms: List[Any] = []
+    if policy.get("keep_drafts") is not None:
+        transforms.append(KeepLatestDrafts(agent_name, keep=policy["keep_drafts"]))
+    if policy.get("tool_output_chars") is not None:
+        transforms.append(
+            CompactToolOutputs(
+                max_chars=policy["tool_output_chars"],
+                keep_latest=policy.get("keep_tool_outputs", 2),
+            )
+        )
+    if policy.get("max_tokens") is not None:
+        transforms.append(TokenBudget(policy["max_tokens"], model=model))
+    return transforms
+
+
+def apply_history_compaction(
+    agent: ConversableAgent,
+    policy: Optional[Dict[str, Any]],
+    model: str = "gpt-4",
+    verbose: bool = False,
+) -> None:
+    """Compact ``agent``'s history before each completion according to ``policy``."""
+    # Imported here: loading AutoGen's transforms module opens a default disk
+    # cache under ./.cache/42 as a side effect
+    from autogen.agentchat.contrib.capabilities.transform_messages import (
+        TransformMessages,
+    )
+
+    transforms = build_transforms(agent.name, policy or {}, model=model)
+    if transforms:
+        TransformMessages(transforms=transforms, verbose=verbose).add_to_agent(agent)
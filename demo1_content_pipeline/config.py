@@ -4,6 +4,11 @@ import os
 import warnings
 from dotenv import load_dotenv
 
+from artifacts import ArtifactStore
+from checkpoint import CheckpointStore
+from llm_cache import CompletionCache, with_completion_cache
+from rate_limit import RateLimiter
+
 warnings.filterwarnings("ignore", message=".*flaml.automl is not available.*")
 load_dotenv()
 
@@ -11,29 +16,152 @@ load_dotenv()
 # LLM Configuration
 MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4")
 
-LLM_CONFIG = {
-    "config_list": [
-        {
-            "model": MODEL_NAME,
-            "api_key": os.getenv("OPENAI_API_KEY"),
-        }
-    ],
-    "timeout": int(os.getenv("TIMEOUT_SECONDS", 300)),
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
+
+# One keep-alive connection pool shared by every agent and pipeline in the
+# process (HTTP/2 is used when the h2 package is installed)
+HTTP_POOL_ENABLED = os.getenv("HTTP_POOL_ENABLED", "true").lower() == "true"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", 30))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+# Every request through the shared pool is paced to RATE_LIMIT_RPM requests
+# and RATE_LIMIT_TPM tokens a minute (0 = no limit), with the number in
+# flight adapting between RATE_LIMIT_MIN_CONCURRENCY and
+# RATE_LIMIT_MAX_CONCURRENCY to 429s and RATE_LIMIT_TARGET_LATENCY_S
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+RATE_LIMIT_RPM = float(os.getenv("RATE_LIMIT_RPM", 0))
+RATE_LIMIT_TPM = float(os.getenv("RATE_LIMIT_TPM", 0))
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", 16))
+RATE_LIMIT_MIN_CONCURRENCY = int(os.getenv("RATE_LIMIT_MIN_CONCURRENCY", 1))
+RATE_LIMIT_TARGET_LATENCY_S = float(os.getenv("RATE_LIMIT_TARGET_LATENCY_S", 0))
+
+RATE_LIMITER = (
+    RateLimiter(
+        requests_per_minute=RATE_LIMIT_RPM,
+        tokens_per_minute=RATE_LIMIT_TPM,
+        max_concurrency=RATE_LIMIT_MAX_CONCURRENCY,
+        min_concurrency=RATE_LIMIT_MIN_CONCURRENCY,
+        target_latency_s=RATE_LIMIT_TARGET_LATENCY_S,
+    )
+    if RATE_LIMIT_ENABLED and HTTP_POOL_ENABLED
+    else None
+)
+
+LLM_TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", 300))
+
+
+def _build_http_client():
+    # http_pool imports openai, so it is only loaded once a client is needed
+    if not HTTP_POOL_ENABLED:
+        return None
+    from http_pool import shared_http_client
+
+    return shared_http_client(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_seconds=HTTP_KEEPALIVE_SECONDS,
+        http2=HTTP2_ENABLED,
+        limiter=RATE_LIMITER,
+    )
+
+
+def _build_llm_config() -> dict:
+    http_client = __getattr__("HTTP_CLIENT")
+    return {
+        "config_list": [
+            {
+                "model": MODEL_NAME,
+                "api_key": os.getenv("OPENAI_API_KEY"),
+                **({"base_url": OPENAI_API_BASE} if OPENAI_API_BASE else {}),
+                **({"http_client": http_client} if http_client is not None else {}),
+            }
+        ],
+        "timeout": LLM_TIMEOUT_SECONDS,
+    }
+
+
+# Per-role model fallback lists, most preferred first (comma-separated).
+# Coordination roles (Planner, Researcher, speaker selection) default to
+# FAST_MODEL_NAME, Writer and Critic to MODEL_NAME.
+FAST_MODEL_NAME = os.getenv("FAST_MODEL_NAME", MODEL_NAME)
+
+
+def _model_list(variable: str, default: str) -> list:
+    return [m.strip() for m in os.getenv(variable, default).split(",") if m.strip()]
+
+
+def role_llm_config(models: list) -> dict:
+    llm_config = __getattr__("LLM_CONFIG")
+    base = llm_config["config_list"][0]
+    return {**llm_config, "config_list": [{**base, "model": m} for m in models]}
+
+
+PLANNER_MODELS = _model_list("PLANNER_MODELS", FAST_MODEL_NAME)
+RESEARCHER_MODELS = _model_list("RESEARCHER_MODELS", FAST_MODEL_NAME)
+WRITER_MODELS = _model_list("WRITER_MODELS", MODEL_NAME)
+CRITIC_MODELS = _model_list("CRITIC_MODELS", MODEL_NAME)
+MANAGER_MODELS = _model_list("MANAGER_MODELS", FAST_MODEL_NAME)
+
+# With several models per role, the healthy ones are tried fastest first by
+# mean latency (MODEL_RANK_BY_LATENCY=false keeps the listed order). Ones
+# failing more than MODEL_MAX_ERROR_RATE of recent calls are tried last for
+# MODEL_COOLDOWN_SECONDS, as are ones slower than MODEL_MAX_LATENCY_S on
+# average (0 disables that check)
+MODEL_ROUTER_ENABLED = os.getenv("MODEL_ROUTER_ENABLED", "true").lower() == "true"
+MODEL_MAX_ERROR_RATE = float(os.getenv("MODEL_MAX_ERROR_RATE", 0.5))
+MODEL_COOLDOWN_SECONDS = float(os.getenv("MODEL_COOLDOWN_SECONDS", 60))
+MODEL_MAX_LATENCY_S = float(os.getenv("MODEL_MAX_LATENCY_S", 0))
+MODEL_RANK_BY_LATENCY = os.getenv("MODEL_RANK_BY_LATENCY", "true").lower() == "true"
+
+
+# Completion cache shared by all agents (set LLM_CACHE_BYPASS=true to force
+# fresh completions while still refreshing the cache)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/completions.sqlite")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", 512))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+COMPLETION_CACHE = (
+    CompletionCache(
+        path=LLM_CACHE_PATH,
+        max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS or None,
+        bypass=LLM_CACHE_BYPASS,
+    )
+    if LLM_CACHE_ENABLED
+    else None
+)
+
+
+# Knowledge base storage: "memory" serves the built-in entries, "sqlite"
+# loads entries on demand from KB_PATH (build it with build_kb.py)
+KB_BACKEND = os.getenv("KB_BACKEND", "memory")
+KB_PATH = os.getenv("KB_PATH", "knowledge.sqlite")
+KB_CACHE_SIZE = int(os.getenv("KB_CACHE_SIZE", 1024))
+
+# Knowledge base search: "keyword" (BM25), "semantic" (local hashing
+# embeddings) or "hybrid" (both, blended with KB_HYBRID_WEIGHT on the
+# semantic side). Matches below KB_MIN_SIMILARITY without a keyword hit
+# are dropped.
+KB_SEARCH_MODE = os.getenv("KB_SEARCH_MODE", "hybrid")
+KB_EMBEDDING_DIM = int(os.getenv("KB_EMBEDDING_DIM", 512))
+KB_HYBRID_WEIGHT = float(os.getenv("KB_HYBRID_WEIGHT", 0.5))
+KB_MIN_SIMILARITY = float(os.getenv("KB_MIN_SIMILARITY", 0.2))
+
+
+# Configuration for different agent roles (built on first use, see below)
+_ROLE_MODELS = {
+    "PLANNER_CONFIG": ("Planner", PLANNER_MODELS),
+    "RESEARCHER_CONFIG": ("Researcher", RESEARCHER_MODELS),
+    "WRITER_CONFIG": ("Writer", WRITER_MODELS),
+    "CRITIC_CONFIG": ("Critic", CRITIC_MODELS),
+    "MANAGER_CONFIG": ("chat_manager", MANAGER_MODELS),
 }
 
 
-# Configuration for different agent roles
-PLANNER_CONFIG = {**LLM_CONFIG}
-
-RESEARCHER_CONFIG = {**LLM_CONFIG}
-
-
-WRITER_CONFIG = {**LLM_CONFIG}
-
-
-CRITIC_CONFIG = {**LLM_CONFIG}
-
-
 # Agent System Messages
 PLANNER_SYSTEM_MESSAGE = """You are a Planning Agent responsible for coordinating the content creation process.
 
@@ -106,7 +234,7 @@ Review checklist:
 - Meets content type guidelines
 
 Response format:
-If issues found: List specific improvements needed and ask Writer to revise
+If issues found: List specific improvements needed, naming the section (by its heading) each one concerns, and ask Writer to revise
 If approved: Say "APPROVED - Content meets quality standards" and summarize strengths
 
 Be thorough but fair. One round of revision is usually sufficient."""
@@ -114,8 +242,145 @@ Be thorough but fair. One round of revision is usually sufficient."""
 
 MAX_ROUNDS = int(os.getenv("MAX_ROUNDS", 12))
 ADMIN_NAME = "Admin"
-SPEAKER_SELECTION_METHOD = "auto"
+# "auto" asks the GroupChatManager's LLM to pick every speaker; "graph" follows
+# the fixed workflow in routing.py and only asks the LLM on ambiguous edges
+# (or never, with SPEAKER_GRAPH_LLM_FALLBACK=false)
+SPEAKER_SELECTION_METHOD = os.getenv("SPEAKER_SELECTION_METHOD", "auto").lower()
+SPEAKER_GRAPH_LLM_FALLBACK = (
+    os.getenv("SPEAKER_GRAPH_LLM_FALLBACK", "true").lower() == "true"
+)
+
+# History compaction before each completion, per agent: keep_drafts (latest
+# Writer drafts kept in full), tool_output_chars/keep_tool_outputs (truncate
+# older tool results) and max_tokens (drop oldest messages past the budget).
+# Compacted histories change in the middle each round, which defeats the
+# provider's prefix cache (prompt_prefix.py); leave it off where one exists.
+HISTORY_COMPACTION_ENABLED = (
+    os.getenv("HISTORY_COMPACTION_ENABLED", "false").lower() == "true"
+)
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", 6000))
+HISTORY_COMPACTION = {
+    "Planner": {
+        "keep_drafts": 0,
+        "tool_output_chars": 300,
+        "keep_tool_outputs": 0,
+        "max_tokens": HISTORY_MAX_TOKENS,
+    },
+    "Researcher": {
+        "keep_drafts": 0,
+        "tool_output_chars": 600,
+        "keep_tool_outputs": 2,
+        "max_tokens": HISTORY_MAX_TOKENS,
+    },
+    "Writer": {
+        "keep_drafts": 1,
+        "tool_output_chars": 600,
+        "keep_tool_outputs": 2,
+        "max_tokens": HISTORY_MAX_TOKENS,
+    },
+    "Critic": {
+        "keep_drafts": 1,
+        "tool_output_chars": 600,
+        "keep_tool_outputs": 2,
+        "max_tokens": HISTORY_MAX_TOKENS,
+    },
+}
+
+# Run search_knowledge_base(topic) and get_writing_guidelines(content_type)
+# before the chat and put their results in the initial message
+PREFETCH_TOOLS = os.getenv("PREFETCH_TOOLS", "false").lower() == "true"
+
+# Per-conversation ceilings; when one is reached the chat ends after the
+# current turn and the latest draft is returned (0 disables a limit)
+BUDGET_MAX_TOKENS = int(os.getenv("BUDGET_MAX_TOKENS", 0))
+BUDGET_MAX_COST_USD = float(os.getenv("BUDGET_MAX_COST_USD", 0))
+BUDGET_MAX_SECONDS = float(os.getenv("BUDGET_MAX_SECONDS", 0))
+
+# The Admin runs all tool calls of one assistant turn concurrently in a
+# shared pool of TOOL_MAX_WORKERS threads; a call still running after
+# TOOL_TIMEOUT_SECONDS is answered with an error result and its pool is
+# replaced, so hung tools never hold all the workers
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", 8))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", 30))
+
+# With DRAFT_CANDIDATES > 1 the Writer writes that many drafts concurrently
+# (cycling through DRAFT_TEMPERATURES) and the Critic picks or merges the
+# best in one review, which stands in for its next turn
+DRAFT_CANDIDATES = int(os.getenv("DRAFT_CANDIDATES", 1))
+DRAFT_TEMPERATURES = [
+    float(t) for t in os.getenv("DRAFT_TEMPERATURES", "0.7,0.9,0.5").split(",") if t
+]
+
+# With SECTION_PARALLEL=true the Writer's turns for SECTION_CONTENT_TYPES are
+# outlined by the Planner's model, written section by section concurrently
+# (at most SECTION_MAX sections) and stitched with a short consistency pass;
+# takes precedence over DRAFT_CANDIDATES for those content types
+SECTION_PARALLEL = os.getenv("SECTION_PARALLEL", "false").lower() == "true"
+SECTION_CONTENT_TYPES = [
+    t.strip()
+    for t in os.getenv(
+        "SECTION_CONTENT_TYPES", "technical_blog,tutorial,documentation"
+    ).split(",")
+    if t.strip()
+]
+SECTION_MAX = int(os.getenv("SECTION_MAX", 8))
+
+# Stream agent completions token by token to the terminal (and STREAM_FILE,
+# if set); the GroupChatManager's speaker selection is never streamed
+STREAM_ENABLED = os.getenv("STREAM_ENABLED", "false").lower() == "true"
+STREAM_FILE = os.getenv("STREAM_FILE", "")
+
+# The group chat is checkpointed to CHECKPOINT_DIR after every round; a
+# failed run keeps its checkpoint so it can be resumed
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".cache/checkpoints")
+CHECKPOINT_STORE = CheckpointStore(CHECKPOINT_DIR) if CHECKPOINT_ENABLED else None
+
+# Approved content, the research behind it and run metadata are kept in a
+# content-addressed store under ARTIFACT_DIR, indexed by topic, content type
+# and date (see artifacts.py)
+ARTIFACTS_ENABLED = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", ".cache/artifacts")
+ARTIFACT_STORE = ArtifactStore(ARTIFACT_DIR) if ARTIFACTS_ENABLED else None
+
+# Per-call spans (LLM completions, speaker selection, tool runs) are appended
+# to TRACE_PATH after every run; TRACE_ENABLED=false skips instrumentation
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+TRACE_PATH = os.getenv("TRACE_PATH", ".cache/spans.jsonl")
+
+# service.py: SERVICE_WORKERS pipelines run jobs from a queue of at most
+# SERVICE_QUEUE_SIZE waiting jobs (submissions beyond it get 429); the last
+# SERVICE_RETAIN_JOBS finished jobs stay available for status and results
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", 8080))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", 4))
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", 64))
+SERVICE_RETAIN_JOBS = int(os.getenv("SERVICE_RETAIN_JOBS", 1000))
 
 SHOW_COLORS = True
 SHOW_TOOL_CALLS = True
 VERBOSE = True
+
+
+# HTTP_CLIENT, LLM_CONFIG and the *_CONFIG role configs carry the shared
+# HTTP client, which needs openai; they are built on first access so that
+# scripts only reading settings (setup checks, batch job parsing, the CLI
+# before a run starts) do not pay for importing it.
+_LAZY_SETTINGS = {
+    "HTTP_CLIENT": _build_http_client,
+    "LLM_CONFIG": _build_llm_config,
+    **{
+        name: lambda agent_name=agent_name, models=models: with_completion_cache(
+            role_llm_config(models), COMPLETION_CACHE, agent_name
+        )
+        for name, (agent_name, models) in _ROLE_MODELS.items()
+    },
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in globals():
+        globals()[name] = _LAZY_SETTINGS[name]()
+    return globals()[name]
@@ -0,0 +1,27 @@
+"""Console output shared by the command-line entry point and the pipeline."""
+
+from termcolor import colored
+
+from config import SHOW_COLORS
+
+
+def print_header(text: str, color: str = "cyan") -> None:
+    if SHOW_COLORS:
+        print("\n" + colored("=" * 70, color))
+        print(colored(f"  {text}", color, attrs=["bold"]))
+        print(colored("=" * 70, color) + "\n")
+    else:
+        print("\n" + "=" * 70)
+        print(f"  {text}")
+        print("=" * 70 + "\n")
+
+
+def print_section(text: str, color: str = "yellow") -> None:
+    if SHOW_COLORS:
+        print(colored(f"\n{'─' * 70}", color))
+        print(colored(f"  {text}", color, attrs=["bold"]))
+        print(colored(f"{'─' * 70}\n", color))
+    else:
+        print(f"\n{'─' * 70}")
+        print(f"  {text}")
+        print(f"{'─' * 70}\n")
@@ -0,0 +1,316 @@
+"""
+Speculative parallel drafting for the Writer -> Critic loop.
+
+Each Writer turn requests several drafts at once, with different
+temperatures and emphases, instead of one. The Critic then reviews all of
+them in a single call: it picks the best (or merges them) and writes its
+review of that draft. The chosen draft becomes the Writer's message, and the
+review is replayed as the Critic's next turn, so the batched review takes the
+place of the Critic's usual call instead of adding one. The extra drafts
+cost tokens, but a rejection (which adds a full Writer and Critic round
+trip) only happens when none of the drafts is good enough.
+"""
+
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from autogen import Agent, ConversableAgent
+
+from offload import run_blocking
+from prompt_prefix import assemble_prompt
+
+# Extra instruction per candidate; the first candidate is the plain draft
+DRAFT_EMPHASES = [
+    None,
+    "Lead with a concrete, worked example before explaining the concepts.",
+    "Be concise: cut anything that does not directly help the reader.",
+    "Give the common pitfalls and how to avoid them particular attention.",
+    "Follow the target format's structure closely, section by section.",
+]
+
+# Instructions before the per-job task and drafts, so they stay in the prefix
+JUDGE_PROMPT = """Candidate drafts were written in parallel for the task below. Review all of them and choose the one to publish.
+
+Reply in this format:
+BEST: <number of the best draft>
+MERGED: <optional; a combined draft, only if borrowing from the others clearly improves the best one>
+REVIEW: <your review of the chosen draft, in your usual response format>
+
+Task:
+{task}
+{feedback}
+{drafts}"""
+
+_BEST = re.compile(r"BEST:\s*(\d+)", re.IGNORECASE)
+_MERGED = re.compile(r"MERGED:(.*?)(?=^REVIEW:|\Z)", re.IGNORECASE | re.S | re.M)
+_REVIEW = re.compile(r"^REVIEW:(.*)", re.IGNORECASE | re.S | re.M)
+
+
+class _Overrides:
+    """An LLM client whose completions use extra request parameters."""
+
+    def __init__(self, client: Any, overrides: Dict[str, Any]):
+        self._client = client
+        self._overrides = overrides
+
+    def create(self, **config: Any) -> Any:
+        return self._client.create(**{**config, **self._overrides})
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class _PairState:
+    """
+    What a Writer/Critic pair's reply functions share: the Critic and the
+    review waiting to be replayed as its turn.
+    """
+
+    def __init__(self, critic: ConversableAgent):
+        self.critic = critic
+        self.pending: Optional[Tuple[str, str]] = None
+
+    def __copy__(self) -> "_PairState":
+        # register_reply copies each reply function's config; keep one state
+        return self
+
+
+def _forget(state: _PairState) -> None:
+    state.pending = None
+
+
+def _content(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("content") or ""
+    return message or ""
+
+
+def parse_judgement(
+    text: str, drafts: Sequence[str]
+) -> Tuple[str, Optional[str], bool]:
+    """
+    Read the Critic's choice from a batched review.
+
+    Returns:
+        The chosen (or merged) draft, the review to replay as the Critic's
+        turn (None when the reply has no REVIEW section, or no usable
+        choice) and whether the drafts were merged
+    """
+    best = _BEST.search(text)
+    number = int(best.group(1)) if best else None
+    merged = _MERGED.search(text)
+    review = _REVIEW.search(text)
+    review_text = review.group(1).strip() if review else None
+    if merged and merged.group(1).strip():
+        return merged.group(1).strip(), review_text, True
+    if number is None or not 1 <= number <= len(drafts):
+        # Without a usable choice the review may be about any draft
+        return drafts[0], None, False
+    return drafts[number - 1], review_text, False
+
+
+class SpeculativeDrafter:
+    """
+    Replaces the Writer's single completion with a batch of drafts judged by
+    the Critic.
+
+    One instance (and its thread pool) is shared by all pipelines in the
+    process; ``attach`` wires one Writer/Critic pair.
+
+    Args:
+        candidates: Drafts requested per Writer turn
+        temperatures: Temperature per candidate, cycled if shorter
+        max_workers: Threads running draft completions in sync chats
+    """
+
+    def __init__(
+        self,
+        candidates: int = 3,
+        temperatures: Sequence[float] = (0.7, 0.9, 0.5),
+        max_workers: int = 8,
+    ):
+        self.candidates = candidates
+        self.temperatures = list(temperatures) or [0.7]
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="draft"
+        )
+        self._lock = threading.Lock()
+        self._stats = {"rounds": 0, "drafts": 0, "merged": 0, "replayed_reviews": 0}
+
+    def attach(self, writer: ConversableAgent, critic: ConversableAgent) -> None:
+        """Draft in parallel for ``writer`` and let ``critic`` judge the batch."""
+        # Cleared whenever either agent resets
+        state = _PairState(critic)
+        reply_funcs = [entry["reply_func"] for entry in writer._reply_func_list]
+        writer.register_reply(
+            [Agent, None],
+            self.generate_drafts_reply,
+            position=reply_funcs.index(ConversableAgent.generate_oai_reply),
+            config=state,
+            reset_config=_forget,
+        )
+        reply_funcs = [entry["reply_func"] for entry in writer._reply_func_list]
+        writer.register_reply(
+            [Agent, None],
+            self.a_generate_drafts_reply,
+            position=reply_funcs.index(ConversableAgent.a_generate_oai_reply),
+            config=state,
+            reset_config=_forget,
+            ignore_async_in_sync_chat=True,
+        )
+        # Ahead of both completion replies, so it also runs in async chats
+        reply_funcs = [entry["reply_func"] for entry in critic._reply_func_list]
+        critic.register_reply(
+            [Agent, None],
+            self.replay_review_reply,
+            position=reply_funcs.index(ConversableAgent.a_generate_oai_reply),
+            config=state,
+            reset_config=_forget,
+        )
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                self._stats[name] += count
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return drafting counters for the process.
+
+        Returns:
+            Writer turns drafted in parallel, drafts written, batched reviews
+            that merged drafts, and reviews replayed as the Critic's turn
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _candidate_messages(
+        self, writer: ConversableAgent, messages: List[Dict], index: int
+    ) -> Tuple[List[Dict], Dict[str, Any]]:
+        emphasis = DRAFT_EMPHASES[index % len(DRAFT_EMPHASES)]
+        trailing = (
+            []
+            if emphasis is None
+            else [{"role": "system", "content": f"For this draft: {emphasis}"}]
+        )
+        prompt = assemble_prompt(writer, messages, *trailing)
+        temperature = self.temperatures[index % len(self.temperatures)]
+        return prompt, {"temperature": temperature}
+
+    def _draft(self, writer: ConversableAgent, messages: List[Dict], index: int) -> str:
+        prompt, overrides = self._candidate_messages(writer, messages, index)
+        reply = writer._generate_oai_reply_from_client(
+            _Overrides(writer.client, overrides), prompt, writer.client_cache
+        )
+        return _content(reply)
+
+    def _judge(
+        self, critic: ConversableAgent, messages: List[Dict], drafts: List[str]
+    ) -> Tuple[str, Optional[str]]:
+        task = _content(messages[0]) if messages else ""
+        feedback = next(
+            (
+                _content(m)
+                for m in reversed(messages)
+                if m.get("name") == critic.name and _content(m)
+            ),
+            None,
+        )
+        prompt = JUDGE_PROMPT.format(
+            task=task,
+            feedback=f"\nYour previous review:\n{feedback}\n" if feedback else "",
+            drafts="\n\n".join(
+                f"### Draft {number}\n{draft}"
+                for number, draft in enumerate(drafts, start=1)
+            ),
+        )
+        reply = critic._generate_oai_reply_from_client(
+            critic.client,
+            assemble_prompt(critic, [], prompt),
+            critic.client_cache,
+        )
+        chosen, review, merged = parse_judgement(_content(reply), drafts)
+        self._count(merged=int(merged))
+        return chosen, review
+
+    def _select(
+        self,
+        state: _PairState,
+        messages: List[Dict],
+        results: List[Any],
+    ) -> Tuple[bool, Optional[str]]:
+        drafts = [r for r in results if isinstance(r, str) and r]
+        if not drafts:
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                raise errors[0]
+            return False, None
+        self._count(rounds=1, drafts=len(drafts))
+        if len(drafts) == 1:
+            return True, drafts[0]
+        chosen, review = self._judge(state.critic, messages, drafts)
+        state.pending = (chosen, review) if review else None
+        return True, chosen
+
+    def generate_drafts_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[_PairState] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Write the candidates in the thread pool, then have the Critic pick."""
+        if recipient.client is None or not messages:
+            return False, None
+        futures = [
+            self._pool.submit(self._draft, recipient, messages, index)
+            for index in range(self.candidates)
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return self._select(config, messages, results)
+
+    async def a_generate_drafts_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[_PairState] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Async variant: the candidates run in the executor threads."""
+        if recipient.client is None or not messages:
+            return False, None
+        results = await asyncio.gather(
+            *(
+                run_blocking(self._draft, recipient, messages, index)
+                for index in range(self.candidates)
+            ),
+            return_exceptions=True,
+        )
+        # The Critic's call blocks like any AutoGen 0.2 completion
+        return await run_blocking(self._select, config, messages, results)
+
+    def replay_review_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[_PairState] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Answer with the batched review when the draft it covers is up."""
+        pending = config.pending
+        config.pending = None
+        if pending is None or not messages:
+            return False, None
+        draft, review = pending
+        if _content(messages[-1]) != draft:
+            return False, None
+        self._count(replayed_reviews=1)
+        return True, review
@@ -0,0 +1,153 @@
+"""
+Process-wide HTTP connection pool for the OpenAI clients.
+
+Every agent (and AutoGen's internal speaker-selection agent) builds its own
+OpenAI client from the LLM config, and by default each of those opens its
+own connection pool. Passing one shared ``http_client`` through the config
+list lets all agents of all pipelines in the process reuse the same
+keep-alive connections, over HTTP/2 when the ``h2`` package is installed.
+Since every request goes through it, the pool is also where the shared
+rate limiter sees each attempt (the OpenAI client's retries included) and
+its status.
+"""
+
+import importlib.util
+import json
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+from openai import DefaultHttpxClient
+
+from rate_limit import RateLimiter
+
+try:
+    import httpx
+except ImportError:  # openai releases that ship the httpx2 fork instead
+    import httpx2 as httpx
+
+
+def _estimate_tokens(request: Any) -> int:
+    # The serialized request (messages, tool schemas) at ~4 bytes per token
+    return max(1, len(request.content or b"") // 4)
+
+
+def _used_tokens(body: bytes) -> Optional[int]:
+    try:
+        return json.loads(body)["usage"]["total_tokens"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    """
+    Releases the limiter ticket when the response body is closed.
+
+    JSON bodies are kept to read the actual token usage from; streamed
+    (server-sent event) bodies are passed through untouched.
+    """
+
+    def __init__(self, response: Any, limiter: RateLimiter, ticket: Dict):
+        self.stream = response.stream
+        self.limiter = limiter
+        self.ticket = ticket
+        self.status = response.status_code
+        content_type = response.headers.get("content-type", "")
+        self.body: Optional[bytearray] = (
+            bytearray() if content_type.startswith("application/json") else None
+        )
+        self.released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.stream:
+            if self.body is not None:
+                self.body.extend(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            if not self.released:
+                self.released = True
+                used = _used_tokens(bytes(self.body)) if self.body else None
+                self.limiter.release(self.ticket, self.status, used)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Admits each request through a RateLimiter before sending it."""
+
+    def __init__(self, transport: Any, limiter: RateLimiter):
+        self.transport = transport
+        self.limiter = limiter
+
+    def handle_request(self, request: Any) -> Any:
+        ticket = self.limiter.acquire(_estimate_tokens(request))
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            self.limiter.release(ticket, None)
+            raise
+        response.stream = _MeteredStream(response, self.limiter, ticket)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class SharedHttpClient(DefaultHttpxClient):
+    """
+    An httpx client that survives AutoGen's copies of the LLM config.
+
+    ConversableAgent deep-copies ``llm_config``; returning the same instance
+    keeps every copy on this pool instead of failing on its locks.
+    """
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SharedHttpClient":
+        return self
+
+
+_client: Optional[SharedHttpClient] = None
+_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def shared_http_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_seconds: float = 30.0,
+    http2: bool = True,
+    limiter: Optional[RateLimiter] = None,
+) -> SharedHttpClient:
+    """
+    Return the process-wide client, creating it on first use.
+
+    The arguments only take effect on the first call.
+
+    Args:
+        max_connections: Cap on open connections across all agents
+        max_keepalive_connections: Idle connections kept for reuse
+        keepalive_seconds: How long an idle connection is kept
+        http2: Negotiate HTTP/2 if the ``h2`` package is installed
+        limiter: Admit every request through this rate limiter
+
+    Returns:
+        The shared client
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            transport = httpx.HTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_seconds,
+                ),
+                http2=http2 and http2_available(),
+            )
+            if limiter is not None:
+                transport = RateLimitedTransport(transport, limiter)
+            _client = SharedHttpClient(transport=transport)
+        return _client
@@ -0,0 +1,292 @@
+"""
+Persistent, content-addressed completion cache for the agents' LLM calls.
+
+AutoGen hands every request to the ``cache`` object found in an agent's
+llm_config before calling the provider. This module implements that
+interface on top of SQLite so identical prompts (re-runs, retries after a
+crash, repeated speaker selection) are answered from disk.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+# Message fields that change how a completion is produced. Anything else
+# (e.g. per-run metadata added by AutoGen) is dropped from the cache key.
+_MESSAGE_FIELDS = ("role", "name", "content", "function_call", "tool_calls")
+
+
+def _normalize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for field in _MESSAGE_FIELDS:
+        value = message.get(field)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        normalized[field] = value
+    return normalized
+
+
+def cache_key(request: Dict[str, Any]) -> str:
+    """
+    Build a content-addressed key for a completion request.
+
+    The key covers the model, the normalized message list, the function/tool
+    schemas and any remaining sampling parameters, hashed with SHA-256.
+
+    Args:
+        request: The create() parameters AutoGen sends to the provider
+
+    Returns:
+        Hex digest identifying the request
+    """
+    request = dict(request)
+    payload = {
+        "model": request.pop("model", None),
+        "messages": [_normalize_message(m) for m in request.pop("messages", [])],
+        "functions": request.pop("functions", None),
+        "tools": request.pop("tools", None),
+        "params": request,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _request_key(raw_key: str) -> str:
+    # AutoGen passes ``get_key(params)``, which is the request serialized as
+    # sorted JSON; fall back to hashing the raw string for anything else.
+    try:
+        request = json.loads(raw_key)
+    except (TypeError, ValueError):
+        request = None
+    if isinstance(request, dict):
+        return cache_key(request)
+    return hashlib.sha256(str(raw_key).encode("utf-8")).hexdigest()
+
+
+def from_cache(response: Any) -> bool:
+    """Whether ``response`` came from a CompletionCache instead of the provider."""
+    return getattr(response, "from_completion_cache", False)
+
+
+class CompletionCache:
+    """
+    SQLite-backed completion store with TTL and size-bounded LRU eviction.
+
+    One instance is shared by all agents; use ``for_agent`` to get the
+    per-agent view that goes into each llm_config so hits and misses are
+    counted per agent. The stored size is tracked as a running total, so
+    writes do not sum the table; it is recounted before evicting, since
+    other processes may share the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        bypass: bool = False,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.bypass = bypass
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0}
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS completions_lru ON completions (accessed_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS completions_age ON completions (created_at)"
+            )
+            self._bytes = self._stored_bytes(self._conn)
+        return self._conn
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()[0]
+
+    def for_agent(self, agent_name: str) -> "AgentCacheView":
+        return AgentCacheView(self, agent_name)
+
+    def get(self, key: str, default: Optional[Any] = None, agent: str = "") -> Any:
+        if self.bypass:
+            self._record(agent, hit=False)
+            return default
+
+        digest = _request_key(key)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created_at, size FROM completions WHERE key = ?",
+                (digest,),
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                conn.execute("DELETE FROM completions WHERE key = ?", (digest,))
+                self._bytes -= row[2]
+                row = None
+            if row is not None:
+                conn.execute(
+                    "UPDATE completions SET accessed_at = ? WHERE key = ?",
+                    (now, digest),
+                )
+
+        self._record(agent, hit=row is not None)
+        if row is None:
+            return default
+        response = pickle.loads(row[0])
+        # Marked on the returned copy only; the stored one stays as it was
+        response.from_completion_cache = True
+        return response
+
+    def set(self, key: str, value: Any) -> None:
+        blob = pickle.dumps(value)
+        if len(blob) > self.max_bytes:
+            return
+
+        digest = _request_key(key)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            replaced = conn.execute(
+                "SELECT size FROM completions WHERE key = ?", (digest,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (digest, blob, len(blob), now, now),
+            )
+            self._bytes += len(blob) - (replaced[0] if replaced else 0)
+            self._evict(conn, now)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds is not None:
+            cutoff = now - self.ttl_seconds
+            expired = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM completions WHERE created_at < ?",
+                (cutoff,),
+            ).fetchone()[0]
+            if expired:
+                conn.execute("DELETE FROM completions WHERE created_at < ?", (cutoff,))
+                self._bytes -= expired
+
+        if self._bytes <= self.max_bytes:
+            return
+        total = self._stored_bytes(conn)
+
+        # Drop least recently used entries until the store fits again.
+        rows = conn.execute(
+            "SELECT key, size FROM completions ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+        self._bytes = total
+
+    def _record(self, agent: str, hit: bool) -> None:
+        with self._lock:
+            self._stats[agent or "unknown"]["hits" if hit else "misses"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return hit/miss counters per agent.
+
+        Returns:
+            Mapping of agent name to hits, misses, and hit_rate
+        """
+        with self._lock:
+            snapshot = {name: dict(counts) for name, counts in self._stats.items()}
+        for counts in snapshot.values():
+            total = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = counts["hits"] / total if total else 0.0
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM completions")
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class AgentCacheView:
+    """
+    Per-agent handle on a shared CompletionCache.
+
+    Implements AutoGen's AbstractCache protocol. AutoGen enters and exits the
+    cache around every request, so exiting does not close the shared store,
+    and deep copies (made when agents copy their llm_config) share it too.
+    """
+
+    def __init__(self, cache: CompletionCache, agent_name: str):
+        self.cache = cache
+        self.agent_name = agent_name
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return self.cache.get(key, default, agent=self.agent_name)
+
+    def set(self, key: str, value: Any) -> None:
+        self.cache.set(key, value)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "AgentCacheView":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "AgentCacheView":
+        return self
+
+
+def with_completion_cache(
+    llm_config: Dict[str, Any], cache: Optional[CompletionCache], agent_name: str
+) -> Dict[str, Any]:
+    """Return a copy of ``llm_config`` that routes requests through ``cache``."""
+    if cache is None:
+        # Without a cache AutoGen falls back to its own disk cache (seed 41)
+        return {**llm_config, "cache_seed": None}
+    return {**llm_config, "cache": cache.for_agent(agent_name)}
@@ -1,208 +1,80 @@
-"""Multi-agent content creation pipeline using AutoGen."""
+"""
+Command-line entry point for the content creation pipeline.
 
-import sys
-import warnings
-import logging
+Only settings and console helpers are imported up front. The pipeline
+itself (AutoGen, openai and the agents, see pipeline.py) is imported once a
+run actually starts, so --help, --list-topics and invalid invocations
+return immediately.
+"""
 
-warnings.filterwarnings(
-    "ignore", message=".*API key specified is not a valid OpenAI format.*"
-)
-warnings.filterwarnings("ignore", message=".*Model .* is not found.*")
-warnings.filterwarnings("ignore", message=".*flaml.automl is not available.*")
-warnings.filterwarnings("ignore", category=UserWarning, module="flaml")
+import argparse
+import os
+import sys
+from typing import List, Optional
 
 from termcolor import colored
-from autogen import UserProxyAgent, GroupChat, GroupChatManager
-
-logging.getLogger("autogen.oai.client").setLevel(logging.ERROR)
-
-from agents import (
-    create_planner_agent,
-    create_researcher_agent,
-    create_writer_agent,
-    create_critic_agent,
-)
-from tools.knowledge_tools import search_knowledge_base, get_writing_guidelines
-from config import MAX_ROUNDS, LLM_CONFIG, SHOW_COLORS
-
 
-def print_header(text: str, color: str = "cyan") -> None:
-    if SHOW_COLORS:
-        print("\n" + colored("=" * 70, color))
-        print(colored(f"  {text}", color, attrs=["bold"]))
-        print(colored("=" * 70, color) + "\n")
-    else:
-        print("\n" + "=" * 70)
-        print(f"  {text}")
-        print("=" * 70 + "\n")
+from console import print_header
 
+DEMO_TOPICS = [
+    "Python asyncio basics",
+    "AutoGen agents",
+    "Machine learning fundamentals",
+    "RESTful API design",
+    "Docker containerization basics",
+]
 
-def print_section(text: str, color: str = "yellow") -> None:
-    if SHOW_COLORS:
-        print(colored(f"\n{'─' * 70}", color))
-        print(colored(f"  {text}", color, attrs=["bold"]))
-        print(colored(f"{'─' * 70}\n", color))
-    else:
-        print(f"\n{'─' * 70}")
-        print(f"  {text}")
-        print(f"{'─' * 70}\n")
+CONTENT_TYPES = ["technical_blog", "tutorial", "documentation", "email"]
 
 
-def is_termination_message(message: dict) -> bool:
-    content = message.get("content", "").upper()
-    termination_signals = [
-        "TASK_COMPLETE",
-        "APPROVED - CONTENT MEETS QUALITY STANDARDS",
-        "WORKFLOW COMPLETE",
-    ]
-    return any(signal in content for signal in termination_signals)
+def resolve_topic(choice: str) -> str:
+    """A topic number from DEMO_TOPICS (1-based) or the topic text itself."""
+    if choice.isdigit() and 1 <= int(choice) <= len(DEMO_TOPICS):
+        return DEMO_TOPICS[int(choice) - 1]
+    return choice.strip()
 
 
-def create_user_proxy() -> UserProxyAgent:
-    user_proxy = UserProxyAgent(
-        name="Admin",
-        system_message="A human administrator overseeing the content creation process.",
-        human_input_mode="NEVER",
-        max_consecutive_auto_reply=0,
-        is_termination_msg=is_termination_message,
-        code_execution_config=False,
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the multi-agent content creation demo."
     )
-    return user_proxy
-
-
-def register_tools(user_proxy: UserProxyAgent, agents: list) -> None:
-    for agent in agents:
-        if agent.name == "Researcher":
-            user_proxy.register_function(
-                function_map={
-                    "search_knowledge_base": search_knowledge_base,
-                    "get_writing_guidelines": get_writing_guidelines,
-                }
-            )
-
-            if agent.llm_config:
-                agent.llm_config["functions"] = [
-                    {
-                        "name": "search_knowledge_base",
-                        "description": "Search the knowledge base for information on a topic. Returns key points, examples, and common pitfalls.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "topic": {
-                                    "type": "string",
-                                    "description": "The topic to search (e.g., 'python asyncio', 'autogen agents', 'machine learning')",
-                                }
-                            },
-                            "required": ["topic"],
-                        },
-                    },
-                    {
-                        "name": "get_writing_guidelines",
-                        "description": "Get writing guidelines for specific content types including structure, style, and checklists.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "content_type": {
-                                    "type": "string",
-                                    "enum": [
-                                        "technical_blog",
-                                        "tutorial",
-                                        "documentation",
-                                        "email",
-                                    ],
-                                    "description": "The type of content to get guidelines for",
-                                }
-                            },
-                            "required": ["content_type"],
-                        },
-                    },
-                ]
-
-
-def setup_group_chat(agents: list, user_proxy: UserProxyAgent) -> GroupChat:
-    all_agents = agents + [user_proxy]
-    group_chat = GroupChat(
-        agents=all_agents,
-        messages=[],
-        max_round=MAX_ROUNDS,
-        speaker_selection_method="auto",
+    parser.add_argument(
+        "--topic",
+        help="Topic number (see --list-topics) or any topic; skips the prompts",
     )
-    return group_chat
-
-
-def run_content_pipeline(topic: str, content_type: str = "technical_blog") -> None:
-    print_header("AutoGen Multi-Agent Content Creation Pipeline", "cyan")
-
-    print(f"Topic: {colored(topic, 'green', attrs=['bold'])}")
-    print(f"Content Type: {colored(content_type, 'green', attrs=['bold'])}")
-    print(f"Max Rounds: {colored(MAX_ROUNDS, 'green', attrs=['bold'])}\n")
-
-    print_section("Creating Agents...", "yellow")
-
-    planner = create_planner_agent()
-    print(f"✓ {colored('Planner Agent', 'green')} - Coordinates workflow")
-
-    researcher = create_researcher_agent()
-    print(f"✓ {colored('Researcher Agent', 'green')} - Gathers information")
-
-    writer = create_writer_agent()
-    print(f"✓ {colored('Writer Agent', 'green')} - Creates content")
-
-    critic = create_critic_agent()
-    print(f"✓ {colored('Critic Agent', 'green')} - Reviews quality")
-
-    user_proxy = create_user_proxy()
-    print(f"✓ {colored('Admin (UserProxy)', 'green')} - Executes tools & oversees")
-
-    agents = [planner, researcher, writer, critic]
-
-    print_section("Registering Tools...", "yellow")
-    register_tools(user_proxy, agents)
-    print(f"✓ Registered {colored('search_knowledge_base', 'green')} tool")
-    print(f"✓ Registered {colored('get_writing_guidelines', 'green')} tool")
-
-    print_section("Setting Up Group Chat...", "yellow")
-    group_chat = setup_group_chat(agents, user_proxy)
-
-    manager = GroupChatManager(
-        groupchat=group_chat,
-        llm_config=LLM_CONFIG,
+    parser.add_argument(
+        "--content-type",
+        default="technical_blog",
+        choices=CONTENT_TYPES,
+        help="Content to create (default: technical_blog)",
     )
-    print(
-        f"✓ Group chat configured with {colored(f'{len(agents) + 1}', 'green')} participants"
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the topic's interrupted run from its last checkpoint",
     )
+    parser.add_argument(
+        "--list-topics", action="store_true", help="Print the demo topics and exit"
+    )
+    return parser.parse_args(argv)
 
-    print_section("Starting Multi-Agent Workflow...", "magenta")
-
-    initial_message = f"""We need to create a {content_type} about: {topic}
-
-Please coordinate the team to:
-1. Research the topic thoroughly using available tools
-2. Create well-structured, engaging content
-3. Review and ensure quality standards are met
 
-Let's begin!"""
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.list_topics:
+        for number, topic in enumerate(DEMO_TOPICS, start=1):
+            print(f"{number}. {topic}")
+        return 0
 
-    print(f"Initial message to Planner:\n{colored(initial_message, 'white')}\n")
+    if args.topic:
+        from pipeline import run_content_pipeline
 
-    try:
-        user_proxy.initiate_chat(
-            manager,
-            message=initial_message,
+        result = run_content_pipeline(
+            topic=resolve_topic(args.topic),
+            content_type=args.content_type,
+            resume=args.resume,
         )
-    except Exception as e:
-        print(colored(f"\n⚠️  Error during execution: {e}", "red"))
-        print(colored("This might be due to missing API key or configuration.", "red"))
-        sys.exit(1)
-
-    print_section("Workflow Complete!", "green")
-    print(f"✓ Total rounds: {colored(len(group_chat.messages), 'green')}")
-    print(f"✓ Check the conversation above for the final content")
-    print(f"\n{'═' * 70}\n")
-
-
-def main():
-    import os
+        return 1 if result["status"] == "error" else 0
 
     print_header("Demo 1: Content Creation Pipeline", "cyan")
     if not os.getenv("OPENAI_API_KEY"):
@@ -216,31 +88,21 @@ def main():
             colored("Continue anyway to see the structure? (y/n): ", "cyan")
         )
         if response.lower() != "y":
-            sys.exit(0)
+            return 0
 
     DEMO_TOPIC = "Python asyncio basics"
-    CONTENT_TYPE = "technical_blog"
+    CONTENT_TYPE = args.content_type
 
     print(colored("\nAvailable topics:", "cyan", attrs=["bold"]))
-    print(colored("  1. Python asyncio basics", "white"))
-    print(colored("  2. AutoGen agents", "white"))
-    print(colored("  3. Machine learning fundamentals", "white"))
-    print(colored("  4. RESTful API design", "white"))
-    print(colored("  5. Docker containerization basics", "white"))
+    for number, topic in enumerate(DEMO_TOPICS, start=1):
+        print(colored(f"  {number}. {topic}", "white"))
 
     try:
         choice = input(
             colored("\nChoose topic (1-5) or press Enter for default [1]: ", "cyan")
         )
-        topics = [
-            "Python asyncio basics",
-            "AutoGen agents",
-            "Machine learning fundamentals",
-            "RESTful API design",
-            "Docker containerization basics",
-        ]
-        if choice and choice.isdigit() and 1 <= int(choice) <= 5:
-            DEMO_TOPIC = topics[int(choice) - 1]
+        if choice and choice.isdigit() and 1 <= int(choice) <= len(DEMO_TOPICS):
+            DEMO_TOPIC = DEMO_TOPICS[int(choice) - 1]
     except (EOFError, KeyboardInterrupt):
         print(colored("\nUsing default topic...", "yellow"))
 
@@ -256,7 +118,27 @@ def main():
     except (EOFError, KeyboardInterrupt):
         print(colored("\nStarting demo automatically...\n", "cyan"))
 
-    run_content_pipeline(topic=DEMO_TOPIC, content_type=CONTENT_TYPE)
+    from pipeline import load_checkpoint, run_content_pipeline
+
+    resume = args.resume
+    checkpoint = load_checkpoint(DEMO_TOPIC, CONTENT_TYPE)
+    if checkpoint is not None and not resume:
+        try:
+            answer = input(
+                colored(
+                    f"Resume the interrupted run from round {checkpoint['round']}? (Y/n): ",
+                    "cyan",
+                )
+            )
+            resume = answer.strip().lower() != "n"
+        except (EOFError, KeyboardInterrupt):
+            resume = True
+
+    result = run_content_pipeline(
+        topic=DEMO_TOPIC, content_type=CONTENT_TYPE, resume=resume
+    )
+    if result["status"] == "error":
+        return 1
 
     print(colored("\nDemo complete!", "green", attrs=["bold"]))
     print(colored("Check the conversation above for results.", "green"))
@@ -265,7 +147,8 @@ def main():
     print(colored("  - Modify CONTENT_TYPE for different formats", "white"))
     print(colored("  - Edit agent system messages in config.py", "white"))
     print(colored("  - Adjust MAX_ROUNDS in .env", "white"))
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
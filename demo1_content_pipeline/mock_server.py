@@ -0,0 +1,610 @@
+"""
+Local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+Replies are scripted per agent, recognised by its system message, so a full
+Planner -> Researcher -> Writer -> Critic run completes without network
+access: the Researcher calls both knowledge base tools (in one turn when the
+request offers ``tools``, one per turn for legacy ``functions``) before
+summarising, the Critic asks for one revision (naming a section of the
+draft) and then approves, and speaker selection requests are answered from
+the workflow rules in routing.py. A batched review of parallel drafts (see drafting.py) picks the first draft
+and approves it, standing in for one of several drafts needing no revision.
+Section-parallel turns (see sections.py) get an outline with one section per
+guideline step, a short text per section and no consistency edits.
+Models listed in ``failing_models`` get 503 errors, to exercise model
+fallback, and requests beyond ``max_concurrent`` in flight get 429s, to
+exercise rate limiting. Prompt caching is simulated the way providers do
+it: the leading blocks of the serialized request (model, tool schemas, then
+messages) that an earlier request already sent, byte for byte, are reported
+as ``usage.prompt_tokens_details.cached_tokens``. Latency is drawn from a
+seeded normal distribution plus a per-token generation time, and
+``stream=True`` requests are answered with server-sent event chunks (and a
+final usage chunk when ``stream_options.include_usage`` is set).
+
+Usage:
+    python demo1_content_pipeline/mock_server.py --port 8765 --latency-ms 300
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from routing import APPROVAL_SIGNAL, SPEAKER_TRANSITIONS, next_speaker_name
+
+ROLE_MARKERS = {
+    "Planner": "Planning Agent",
+    "Researcher": "Research Agent",
+    "Writer": "Content Writer Agent",
+    "Critic": "Quality Critic Agent",
+}
+
+WRITER_DRAFT = """# {topic}
+
+Ever wondered how {topic} works in practice? This post walks through the
+core ideas, shows a worked example and ends with the pitfalls to avoid.
+
+## Key Ideas
+- What it is and why it matters
+- How the main pieces fit together
+
+## Example
+```python
+print("hello from {topic}")
+```
+
+## Takeaways
+Start small, measure, and build on what works."""
+
+
+# Prefix cache granularity, about 64 tokens
+PREFIX_BLOCK_CHARS = 256
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _prefix_digests(request: Dict[str, Any]) -> Tuple[List[str], int]:
+    """
+    Chained digests of the request's leading blocks, as a provider's prefix
+    cache keys them.
+
+    Returns:
+        One digest per complete block, and the prompt's length in characters
+    """
+    text = json.dumps(
+        [request.get("model"), request.get("tools"), request.get("functions")]
+    ) + "".join(json.dumps(m) for m in request.get("messages", []))
+    digest = hashlib.sha256()
+    digests = []
+    for start in range(0, len(text) - PREFIX_BLOCK_CHARS + 1, PREFIX_BLOCK_CHARS):
+        digest.update(text[start : start + PREFIX_BLOCK_CHARS].encode("utf-8"))
+        digests.append(digest.copy().hexdigest())
+    return digests, len(text)
+
+
+def _system_message(messages: List[Dict[str, Any]]) -> str:
+    for message in messages:
+        if message.get("role") == "system":
+            return message.get("content") or ""
+    return ""
+
+
+def _topic(messages: List[Dict[str, Any]]) -> str:
+    for message in messages:
+        match = re.search(r"about: (.+)", message.get("content") or "")
+        if match:
+            return match.group(1).strip()
+    return "the topic"
+
+
+def _last_content(messages: List[Dict[str, Any]]) -> str:
+    return (messages[-1].get("content") or "") if messages else ""
+
+
+def _content_type(messages: List[Dict[str, Any]]) -> str:
+    for message in messages:
+        match = re.search(r"create an? (\w+) about", message.get("content") or "")
+        if match:
+            return match.group(1)
+    return "technical_blog"
+
+
+def _called(messages: List[Dict[str, Any]], function_name: str) -> bool:
+    # A legacy function result, a tool call made earlier (tool results only
+    # carry the call id) or a result prefetched into the task message
+    return any(
+        (message.get("role") == "function" and message.get("name") == function_name)
+        or any(
+            call.get("function", {}).get("name") == function_name
+            for call in message.get("tool_calls") or []
+        )
+        or f"{function_name}(" in (message.get("content") or "")
+        for message in messages
+    )
+
+
+def _own_replies(messages: List[Dict[str, Any]]) -> int:
+    # Other agents' function calls also arrive with the assistant role
+    return sum(
+        1
+        for message in messages
+        if message.get("role") == "assistant"
+        and not (message.get("function_call") or message.get("tool_calls"))
+    )
+
+
+def _approved(messages: List[Dict[str, Any]]) -> bool:
+    return any(APPROVAL_SIGNAL in (m.get("content") or "").upper() for m in messages)
+
+
+def _is_speaker_selection(messages: List[Dict[str, Any]]) -> bool:
+    return any(message.get("name") == "checking_agent" for message in messages)
+
+
+def _select_speaker(messages: List[Dict[str, Any]]) -> str:
+    # AutoGen appends its selection prompt (sent as "checking_agent") after
+    # the group chat history; the last group chat turn decides who is next.
+    prompt = next(
+        (m.get("content") or "" for m in messages if m.get("name") == "checking_agent"),
+        "",
+    )
+    conversation = [
+        m
+        for m in messages
+        if m.get("role") != "system"
+        and m.get("name") not in ("checking_agent", "speaker_selection_agent")
+    ]
+    last = conversation[-1] if conversation else {}
+    if last.get("role") in ("function", "tool"):
+        last_speaker = "Admin"
+    else:
+        last_speaker = last.get("name") or "Admin"
+    candidates = SPEAKER_TRANSITIONS.get(last_speaker, [])
+    name = next_speaker_name(last_speaker, last, candidates)
+    if name is None:
+        listed = re.findall(r"\b(Planner|Researcher|Writer|Critic|Admin)\b", prompt)
+        name = next((n for n in candidates if n in listed), "Planner")
+    return name
+
+
+def scripted_reply(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the assistant message for a chat-completions request.
+
+    Args:
+        request: The decoded request body
+
+    Returns:
+        An assistant message dict, possibly carrying ``tool_calls`` or a
+        ``function_call``
+    """
+    messages = request.get("messages", [])
+    if _is_speaker_selection(messages):
+        return {"role": "assistant", "content": _select_speaker(messages)}
+
+    system = _system_message(messages)
+    role = next(
+        (name for name, marker in ROLE_MARKERS.items() if marker in system), "Critic"
+    )
+    topic = _topic(messages)
+
+    if role == "Planner":
+        request = _last_content(messages)
+        if request.startswith("Outline the"):
+            steps = re.findall(r"^\d+\. (.+)$", request, re.M)
+            outline = {
+                "title": topic,
+                "sections": [
+                    {"heading": step, "brief": f"{step} for {topic}"}
+                    for step in steps[1:] or ["Overview"]
+                ],
+            }
+            return {"role": "assistant", "content": json.dumps(outline)}
+        if "assembled from sections" in request:
+            return {"role": "assistant", "content": "NONE"}
+        if _approved(messages):
+            return {"role": "assistant", "content": "TASK_COMPLETE"}
+        return {
+            "role": "assistant",
+            "content": f"Plan: research, draft, review. Researcher, please gather "
+            f"information on {topic}.",
+        }
+
+    if role == "Researcher":
+        lookups = [
+            (name, arguments)
+            for name, arguments in (
+                ("search_knowledge_base", {"topic": topic}),
+                ("get_writing_guidelines", {"content_type": _content_type(messages)}),
+            )
+            if not _called(messages, name)
+        ]
+        if lookups and request.get("tools"):
+            return _tool_calls(lookups)
+        if lookups:
+            return _function_call(*lookups[0])
+        return {
+            "role": "assistant",
+            "content": f"Research summary for {topic}: key points, examples and "
+            "pitfalls gathered from the knowledge base. Writer, please draft.",
+        }
+
+    if role == "Writer":
+        section = re.search(r'Start with the line "## (.+?)"', _last_content(messages))
+        if section:
+            return {
+                "role": "assistant",
+                "content": f"## {section.group(1)}\n\nHow {section.group(1).lower()} "
+                f"applies to {topic}, with a short example.",
+            }
+        return {"role": "assistant", "content": WRITER_DRAFT.format(topic=topic)}
+
+    if any(
+        "Candidate drafts were written in parallel" in (m.get("content") or "")
+        for m in messages
+    ):
+        return {
+            "role": "assistant",
+            "content": "BEST: 1\nREVIEW: APPROVED - Content meets quality "
+            "standards. The strongest of the drafts.",
+        }
+    if _own_replies(messages) == 0:
+        # Name the section to revise, as the Critic is asked to
+        headings = re.findall(r"^## (.+)$", _last_content(messages), re.M)
+        target = next(
+            (heading for heading in headings if "example" in heading.lower()),
+            headings[0] if headings else None,
+        )
+        where = f' the "{target}" section' if target else ""
+        return {
+            "role": "assistant",
+            "content": f"Please revise{where}: add a concrete example and tighten "
+            "the intro.",
+        }
+    return {
+        "role": "assistant",
+        "content": "APPROVED - Content meets quality standards. Clear and well structured.",
+    }
+
+
+def _function_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "role": "assistant",
+        "content": None,
+        "function_call": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+def _tool_calls(calls: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+            for name, arguments in calls
+        ],
+    }
+
+
+def _finish_reason(message: Dict[str, Any]) -> str:
+    if message.get("tool_calls"):
+        return "tool_calls"
+    return "function_call" if message.get("function_call") else "stop"
+
+
+def _chunk_choice(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict:
+    return {"index": 0, "delta": delta, "finish_reason": finish_reason}
+
+
+class MockLLMServer:
+    """
+    Threaded HTTP server answering ``POST /v1/chat/completions``.
+
+    Counts requests, client connections and the simulated time spent
+    answering them, so a benchmark can separate model latency from local
+    overhead and see whether connections are reused.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        tokens_per_second: Optional[float] = None,
+        seed: int = 0,
+        failing_models: Optional[List[str]] = None,
+        max_concurrent: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.failing_models = set(failing_models or [])
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.simulated_seconds = 0.0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self._prefixes: set = set()
+        self.connections = 0
+        self.failures = 0
+        self.throttled = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.simulated_seconds = 0.0
+            self.prompt_tokens = 0
+            self.cached_tokens = 0
+            self.connections = 0
+            self.failures = 0
+            self.throttled = 0
+
+    def _delays(self, completion_tokens: int) -> Tuple[float, float]:
+        with self._lock:
+            latency = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms))
+        generation = (
+            completion_tokens / self.tokens_per_second
+            if self.tokens_per_second
+            else 0.0
+        )
+        return latency / 1000, generation
+
+    def complete(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], float, float]:
+        """
+        Build the response body and its simulated timing.
+
+        Returns:
+            The chat.completion body, the delay before the first token and
+            the time spent generating the rest
+        """
+        message = scripted_reply(request)
+        prompt_tokens = sum(
+            _estimate_tokens(m.get("content") or "")
+            for m in request.get("messages", [])
+        )
+        digests, prompt_chars = _prefix_digests(request)
+        completion_tokens = _estimate_tokens(
+            message.get("content")
+            or json.dumps(message.get("tool_calls") or message.get("function_call"))
+        )
+        latency, generation = self._delays(completion_tokens)
+        with self._lock:
+            cached = 0
+            while cached < len(digests) and digests[cached] in self._prefixes:
+                cached += 1
+            self._prefixes.update(digests)
+            cached_tokens = min(
+                prompt_tokens,
+                prompt_tokens * cached * PREFIX_BLOCK_CHARS // max(1, prompt_chars),
+            )
+            self.requests += 1
+            self.simulated_seconds += latency + generation
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+
+        body = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": _finish_reason(message),
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+        return body, latency, generation
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if request.get("model") in server.failing_models:
+                    with server._lock:
+                        server.failures += 1
+                    self._send(503, {"error": {"message": "model overloaded"}})
+                    return
+                with server._lock:
+                    throttled = (
+                        server.max_concurrent is not None
+                        and server.in_flight >= server.max_concurrent
+                    )
+                    if throttled:
+                        server.throttled += 1
+                    else:
+                        server.in_flight += 1
+                if throttled:
+                    self._send(
+                        429,
+                        {"error": {"message": "rate limit reached"}},
+                        {"retry-after-ms": "200"},
+                    )
+                    return
+                try:
+                    body, latency, generation = server.complete(request)
+                    time.sleep(latency)
+                    if request.get("stream"):
+                        self._stream(body, generation, request)
+                        return
+                    time.sleep(generation)
+                    self._send(200, body)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _stream(
+                self, body: Dict[str, Any], generation: float, request: Dict[str, Any]
+            ) -> None:
+                # Server-sent events, one chunk per word, spread over the
+                # generation time; the connection closes after [DONE]. Usage
+                # comes in a last, choice-less chunk if the request asks.
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                choice = body["choices"][0]
+                message = choice["message"]
+                if message.get("tool_calls"):
+                    deltas = [
+                        {
+                            "role": "assistant",
+                            "tool_calls": [
+                                {"index": i, **call}
+                                for i, call in enumerate(message["tool_calls"])
+                            ],
+                        }
+                    ]
+                elif message.get("function_call"):
+                    deltas = [
+                        {"role": "assistant", "function_call": message["function_call"]}
+                    ]
+                else:
+                    pieces = re.findall(r"\S+\s*|\s+", message["content"]) or [""]
+                    deltas = [{"role": "assistant", "content": pieces[0]}]
+                    deltas += [{"content": piece} for piece in pieces[1:]]
+
+                for delta in deltas:
+                    self._event({**body, "choices": [_chunk_choice(delta)]})
+                    time.sleep(generation / len(deltas))
+                self._event(
+                    {**body, "choices": [_chunk_choice({}, choice["finish_reason"])]}
+                )
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    self._event({**body, "choices": []}, usage=True)
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def _event(self, chunk: Dict[str, Any], usage: bool = False) -> None:
+                chunk = {**chunk, "object": "chat.completion.chunk"}
+                if not usage:
+                    chunk.pop("usage", None)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def _send(
+                self,
+                status: int,
+                body: Dict[str, Any],
+                headers: Optional[Dict[str, str]] = None,
+            ) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve scripted chat completions locally."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--fail-model",
+        action="append",
+        default=[],
+        help="Answer requests for this model with 503 (repeatable)",
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=None,
+        help="Answer requests beyond this many in flight with 429",
+    )
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+        failing_models=args.fail_model,
+        max_concurrent=args.max_concurrent,
+    )
+    print(f"Mock chat-completions server on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Health-aware ordering of each agent's model fallback list.
+
+Every role's config list names its models in order of preference, and
+AutoGen's OpenAIWrapper falls through that list when a model errors. The
+router takes that fallback over: it keeps one single-model client per
+entry and process-wide latency and error statistics per model, and before
+each completion tries the healthy models fastest first, with failing or
+too slow ones last, so a struggling model stops being tried first.
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from autogen import Agent, OpenAIWrapper
+from openai import APIError
+
+from llm_cache import from_cache
+
+
+class ModelHealth:
+    """Exponentially weighted latency and error rate of one model."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.latency_s: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.last_error_at: Optional[float] = None
+
+    def success(self, latency_s: Optional[float]) -> None:
+        self.calls += 1
+        self.error_rate *= 1 - self.alpha
+        if latency_s is not None:
+            self.latency_s = (
+                latency_s
+                if self.latency_s is None
+                else self.alpha * latency_s + (1 - self.alpha) * self.latency_s
+            )
+
+    def failure(self) -> None:
+        self.calls += 1
+        self.errors += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        self.last_error_at = time.monotonic()
+
+
+class ModelRouter:
+    """
+    Orders agents' model fallback lists by observed model health.
+
+    A model is demoted while its error rate is above ``max_error_rate`` and
+    its last failure is less than ``cooldown_seconds`` old (after that it is
+    tried again), or while its mean latency is above ``max_latency_s``.
+    With ``rank_by_latency``, models that are not demoted are tried fastest
+    first by mean latency; a model without a measurement yet is tried first
+    once so it gets one. Otherwise, and between ties, the configured
+    preference order is kept. One instance is shared by all pipelines.
+    """
+
+    def __init__(
+        self,
+        max_error_rate: float = 0.5,
+        cooldown_seconds: float = 60.0,
+        max_latency_s: Optional[float] = None,
+        alpha: float = 0.3,
+        rank_by_latency: bool = True,
+    ):
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.max_latency_s = max_latency_s or None
+        self.alpha = alpha
+        self.rank_by_latency = rank_by_latency
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _model_health(self, model: str) -> ModelHealth:
+        with self._lock:
+            if model not in self._health:
+                self._health[model] = ModelHealth(self.alpha)
+            return self._health[model]
+
+    def _demoted(self, model: str) -> bool:
+        health = self._model_health(model)
+        if (
+            health.error_rate > self.max_error_rate
+            and health.last_error_at is not None
+            and time.monotonic() - health.last_error_at < self.cooldown_seconds
+        ):
+            return True
+        return (
+            self.max_latency_s is not None
+            and health.latency_s is not None
+            and health.latency_s > self.max_latency_s
+        )
+
+    def order(self, models: List[str]) -> List[int]:
+        """Indices of ``models`` in the order they should be tried."""
+
+        def rank(i: int) -> Any:
+            latency = self._model_health(models[i]).latency_s
+            if not self.rank_by_latency or latency is None:
+                latency = 0.0
+            return self._demoted(models[i]), latency
+
+        return sorted(range(len(models)), key=rank)
+
+    def attach(self, agent: Agent) -> List[OpenAIWrapper]:
+        """
+        Route ``agent``'s completions through its config list by health.
+
+        Returns:
+            The single-model clients the completions now go through (empty
+            when the agent has fewer than two models), for anything that
+            needs to wrap the per-model requests, such as token streaming
+        """
+        llm_config = getattr(agent, "llm_config", None) or {}
+        config_list = llm_config.get("config_list") or []
+        if getattr(agent, "client", None) is None or len(config_list) < 2:
+            return []
+        models = [entry.get("model") for entry in config_list]
+        clients = [
+            OpenAIWrapper(**{**llm_config, "config_list": [entry]})
+            for entry in config_list
+        ]
+
+        @functools.wraps(agent.client.create)
+        def routed_create(**config: Any) -> Any:
+            error: Optional[Exception] = None
+            # The same errors OpenAIWrapper falls through its list on
+            for attempt, i in enumerate(self.order(models)):
+                started = time.perf_counter()
+                try:
+                    response = clients[i].create(**config)
+                except APIError as e:
+                    self._model_health(models[i]).failure()
+                    error = e
+                    continue
+                # A cached answer says nothing about the model's latency
+                self._model_health(models[i]).success(
+                    None if from_cache(response) else time.perf_counter() - started
+                )
+                # How many models failed before this one, as OpenAIWrapper reports
+                response.config_id = attempt
+                return response
+            raise error
+
+        agent.client.create = routed_create
+        return clients
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the health of every model seen so far.
+
+        Returns:
+            Mapping of model name to calls, errors, error rate, mean latency
+            and whether it is currently demoted
+        """
+        with self._lock:
+            models = list(self._health)
+        return {
+            model: {
+                "calls": self._health[model].calls,
+                "errors": self._health[model].errors,
+                "error_rate": round(self._health[model].error_rate, 3),
+                "latency_s": self._health[model].latency_s,
+                "demoted": self._demoted(model),
+            }
+            for model in models
+        }
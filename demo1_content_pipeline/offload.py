@@ -0,0 +1,75 @@
+"""
+Where async pipelines run their blocking completions.
+
+AutoGen 0.2 completions block, so async chats run them in a thread. By
+default that is the event loop's default executor, which belongs to the
+caller and caps in-flight calls at ``min(32, cpu_count + 4)``. Inside
+``use_executor`` the pipeline's completions (AutoGen's own, the drafting
+and section-writing calls, speaker selection) run in the given executor
+instead. The choice is held in a context variable, so it follows the tasks
+started inside the block and nothing else on the loop.
+"""
+
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from autogen import Agent, ConversableAgent
+from autogen.io import IOStream
+
+_executor: ContextVar[Optional[Executor]] = ContextVar("executor", default=None)
+
+
+@contextlib.contextmanager
+def use_executor(executor: Executor) -> Iterator[Executor]:
+    """Run blocking completions started in this context in ``executor``."""
+    token = _executor.set(executor)
+    try:
+        yield executor
+    finally:
+        _executor.reset(token)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """Await ``func(*args)`` in the current executor (the loop's default if unset)."""
+    iostream = IOStream.get_default()
+
+    def call() -> Any:
+        # Keep printing to the chat's stream, as AutoGen does
+        with IOStream.set_default(iostream):
+            return func(*args)
+
+    return await asyncio.get_running_loop().run_in_executor(_executor.get(), call)
+
+
+async def a_generate_oai_reply(
+    recipient: ConversableAgent,
+    messages: Optional[List[Dict]] = None,
+    sender: Optional[Agent] = None,
+    config: Optional[Any] = None,
+) -> Tuple[bool, Union[str, Dict, None]]:
+    """AutoGen's async completion reply, run in the current executor."""
+    if _executor.get() is None:
+        return False, None
+    return await run_blocking(
+        functools.partial(
+            recipient.generate_oai_reply,
+            messages=messages,
+            sender=sender,
+            config=config,
+        )
+    )
+
+
+def offload_completions(agent: ConversableAgent) -> None:
+    """Run ``agent``'s async completions in the executor set by ``use_executor``."""
+    reply_funcs = [entry["reply_func"] for entry in agent._reply_func_list]
+    agent.register_reply(
+        [Agent, None],
+        a_generate_oai_reply,
+        position=reply_funcs.index(ConversableAgent.a_generate_oai_reply),
+        ignore_async_in_sync_chat=True,
+    )
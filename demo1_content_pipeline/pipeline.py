@@ -0,0 +1,1011 @@
+"""
+Multi-agent content creation pipeline using AutoGen.
+
+Importing this module loads AutoGen and openai; the command-line entry
+point is main.py, which only imports it once a run starts.
+"""
+
+import asyncio
+import contextlib
+import json
+import warnings
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+warnings.filterwarnings(
+    "ignore", message=".*API key specified is not a valid OpenAI format.*"
+)
+warnings.filterwarnings("ignore", message=".*Model .* is not found.*")
+warnings.filterwarnings("ignore", message=".*flaml.automl is not available.*")
+warnings.filterwarnings("ignore", category=UserWarning, module="flaml")
+
+from termcolor import colored
+from autogen import (
+    AssistantAgent,
+    ConversableAgent,
+    UserProxyAgent,
+    GroupChat,
+    GroupChatManager,
+    OpenAIWrapper,
+)
+from autogen.io import IOStream
+
+logging.getLogger("autogen.oai.client").setLevel(logging.ERROR)
+
+from agents import (
+    create_planner_agent,
+    create_researcher_agent,
+    create_writer_agent,
+    create_critic_agent,
+)
+from tools.knowledge_tools import (
+    TOOLS,
+    search_knowledge_base,
+    get_writing_guidelines,
+    a_search_knowledge_base,
+    a_get_writing_guidelines,
+)
+from config import (
+    MAX_ROUNDS,
+    MANAGER_CONFIG,
+    COMPLETION_CACHE,
+    RATE_LIMITER,
+    CHECKPOINT_STORE,
+    ARTIFACT_STORE,
+    SPEAKER_SELECTION_METHOD,
+    SPEAKER_GRAPH_LLM_FALLBACK,
+    TRACE_ENABLED,
+    TRACE_PATH,
+    HISTORY_COMPACTION_ENABLED,
+    HISTORY_COMPACTION,
+    MODEL_NAME,
+    STREAM_ENABLED,
+    STREAM_FILE,
+    PREFETCH_TOOLS,
+    TOOL_MAX_WORKERS,
+    TOOL_TIMEOUT_SECONDS,
+    DRAFT_CANDIDATES,
+    DRAFT_TEMPERATURES,
+    SECTION_PARALLEL,
+    SECTION_CONTENT_TYPES,
+    SECTION_MAX,
+    BUDGET_MAX_TOKENS,
+    BUDGET_MAX_COST_USD,
+    BUDGET_MAX_SECONDS,
+    MODEL_RANK_BY_LATENCY,
+    MODEL_ROUTER_ENABLED,
+    MODEL_MAX_ERROR_RATE,
+    MODEL_COOLDOWN_SECONDS,
+    MODEL_MAX_LATENCY_S,
+)
+from console import print_header, print_section
+from budget import BudgetGovernor
+from checkpoint import (
+    a_resume_from_checkpoint,
+    group_chats,
+    resume_from_checkpoint,
+)
+from compaction import apply_history_compaction
+from drafting import SpeculativeDrafter
+from sections import SectionWriter
+from model_router import ModelRouter
+from offload import offload_completions, use_executor
+from streaming import FileSink, TokenStreamer
+from routing import (
+    APPROVAL_SIGNAL,
+    TransitionGraphSelector,
+    select_with_manager_client,
+)
+from tool_executor import ParallelToolExecutor
+from tracing import SPAN_TOOL, Tracer, instrument_pipeline
+
+# Shared by every pipeline in the process; add sinks with TOKEN_STREAMER.add_sink
+TOKEN_STREAMER = (
+    TokenStreamer([FileSink(STREAM_FILE)] if STREAM_FILE else [])
+    if STREAM_ENABLED
+    else None
+)
+
+# Shared by every pipeline, so model health carries over between runs
+MODEL_ROUTER = (
+    ModelRouter(
+        max_error_rate=MODEL_MAX_ERROR_RATE,
+        cooldown_seconds=MODEL_COOLDOWN_SECONDS,
+        max_latency_s=MODEL_MAX_LATENCY_S,
+        rank_by_latency=MODEL_RANK_BY_LATENCY,
+    )
+    if MODEL_ROUTER_ENABLED
+    else None
+)
+
+TOOL_EXECUTOR = ParallelToolExecutor(
+    max_workers=TOOL_MAX_WORKERS, timeout_seconds=TOOL_TIMEOUT_SECONDS
+)
+
+DRAFTER = (
+    SpeculativeDrafter(candidates=DRAFT_CANDIDATES, temperatures=DRAFT_TEMPERATURES)
+    if DRAFT_CANDIDATES > 1
+    else None
+)
+
+SECTION_WRITER = (
+    SectionWriter(content_types=SECTION_CONTENT_TYPES, max_sections=SECTION_MAX)
+    if SECTION_PARALLEL
+    else None
+)
+
+
+def print_cache_stats() -> None:
+    if COMPLETION_CACHE is None:
+        return
+    for agent_name, counts in sorted(COMPLETION_CACHE.stats().items()):
+        print(
+            f"✓ Cache {agent_name}: {counts['hits']} hits / {counts['misses']} misses "
+            f"({counts['hit_rate']:.0%})"
+        )
+
+
+def print_stream_stats() -> None:
+    if TOKEN_STREAMER is None:
+        return
+    for agent_name, ttft in sorted(TOKEN_STREAMER.stats().items()):
+        print(
+            f"✓ First token {agent_name}: {ttft['mean_s']:.2f}s mean, "
+            f"{ttft['max_s']:.2f}s max over {ttft['count']} completions"
+        )
+
+
+def print_draft_stats() -> None:
+    if DRAFTER is None:
+        return
+    stats = DRAFTER.stats()
+    print(
+        f"✓ Parallel drafts: {stats['drafts']} over {stats['rounds']} Writer turns, "
+        f"{stats['replayed_reviews']} reviews reused, {stats['merged']} merged"
+    )
+
+
+def print_section_stats() -> None:
+    if SECTION_WRITER is None:
+        return
+    stats = SECTION_WRITER.stats()
+    print(
+        f"✓ Parallel sections: {stats['sections']} written and {stats['kept']} kept "
+        f"over {stats['turns']} Writer turns, {stats['edits']} consistency edits"
+    )
+
+
+def print_tool_stats() -> None:
+    stats = TOOL_EXECUTOR.stats()
+    if not stats["timeouts"]:
+        return
+    print(
+        colored(
+            f"⚠️  Tools: {stats['timeouts']} of {stats['calls']} calls timed out, "
+            f"{stats['hung']} still running in abandoned threads",
+            "yellow",
+        )
+    )
+
+
+def print_budget(result: Dict[str, Any]) -> None:
+    budget = result.get("budget")
+    if budget is None:
+        return
+    print(
+        f"✓ Budget used: {budget['prompt_tokens'] + budget['completion_tokens']} "
+        f"tokens, ${budget['cost_usd']:.4f}, {budget['elapsed_s']:.1f}s"
+    )
+    if budget["exhausted"]:
+        print(
+            colored(
+                f"⚠️  Stopped early ({budget['exhausted']}); returning the latest draft",
+                "yellow",
+            )
+        )
+
+
+def print_rate_limit_stats() -> None:
+    if RATE_LIMITER is None:
+        return
+    stats = RATE_LIMITER.stats()
+    print(
+        f"✓ Rate limiter: {stats['admitted']} requests, {stats['throttled']} throttled, "
+        f"concurrency limit {stats['limit']:g}, peak queue {stats['max_queued']}, "
+        f"wait {stats['wait_s_mean']:.2f}s mean / {stats['wait_s_max']:.2f}s max"
+    )
+
+
+def print_model_stats() -> None:
+    if MODEL_ROUTER is None:
+        return
+    for model, health in sorted(MODEL_ROUTER.stats().items()):
+        latency = (
+            f"{health['latency_s']:.2f}s mean"
+            if health["latency_s"] is not None
+            else "no latency yet"
+        )
+        print(
+            f"✓ Model {model}: {health['calls']} calls, {health['errors']} errors, "
+            f"{latency}{' (demoted)' if health['demoted'] else ''}"
+        )
+
+
+def print_trace_summary(tracer: Optional[Tracer]) -> None:
+    if tracer is None or not tracer.spans:
+        return
+    print(f"\n{tracer.format_summary()}")
+    prompt = sum(row["prompt_tokens"] for row in tracer.summary())
+    cached = sum(row["cached_prompt_tokens"] for row in tracer.summary())
+    if prompt:
+        print(
+            f"\n✓ Provider prefix cache: {colored(cached, 'green')} of {prompt} "
+            f"prompt tokens ({cached / prompt:.0%})"
+        )
+    if TRACE_PATH:
+        print(f"\n✓ Spans appended to {colored(TRACE_PATH, 'green')}")
+
+
+def export_trace(tracer: Optional[Tracer]) -> None:
+    if tracer is not None and TRACE_PATH:
+        tracer.export_jsonl(TRACE_PATH)
+
+
+def is_termination_message(message: dict) -> bool:
+    content = (message.get("content") or "").upper()
+    termination_signals = [
+        "TASK_COMPLETE",
+        APPROVAL_SIGNAL,
+        "WORKFLOW COMPLETE",
+    ]
+    return any(signal in content for signal in termination_signals)
+
+
+def is_approval_message(message: dict) -> bool:
+    # Only the Critic can approve; a draft quoting the signal does not count
+    if message.get("name") != "Critic":
+        return False
+    return APPROVAL_SIGNAL in (message.get("content") or "").upper()
+
+
+def extract_final_content(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("name") == "Writer" and message.get("content"):
+            return message["content"]
+    return ""
+
+
+def extract_approved_content(messages: List[Dict[str, Any]]) -> Optional[str]:
+    # The last draft before the last approval; later drafts were not reviewed
+    approvals = [i for i, m in enumerate(messages) if is_approval_message(m)]
+    if not approvals:
+        return None
+    return extract_final_content(messages[: approvals[-1]]) or None
+
+
+def extract_research(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pair every tool call in the conversation with its result.
+
+    Returns:
+        One dict per call with the tool name, its JSON arguments and the
+        result text (None if the call never got one), in call order
+    """
+    calls: Dict[str, Dict[str, Any]] = {}
+    research = []
+    for message in messages:
+        for call in message.get("tool_calls") or []:
+            calls[call.get("id")] = {
+                "tool": call["function"]["name"],
+                "arguments": call["function"].get("arguments"),
+                "result": None,
+            }
+            research.append(calls[call.get("id")])
+        for response in message.get("tool_responses") or []:
+            if response.get("tool_call_id") in calls:
+                calls[response["tool_call_id"]]["result"] = response.get("content")
+    return research
+
+
+def store_artifact(result: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+    # Only approved runs are stored; their key is added to the result
+    if ARTIFACT_STORE is None or result["status"] != "approved":
+        return
+    content = extract_approved_content(messages)
+    if content is None:
+        return
+    metadata = {
+        key: result[key]
+        for key in ("status", "rounds", "trace_id", "resumed_from_round", "budget")
+        if key in result
+    }
+    metadata["task"] = messages[0].get("content") if messages else None
+    result["artifact"] = ARTIFACT_STORE.put(
+        result["topic"],
+        result["content_type"],
+        content,
+        research=extract_research(messages),
+        metadata=metadata,
+    )
+
+
+def create_user_proxy() -> UserProxyAgent:
+    user_proxy = UserProxyAgent(
+        name="Admin",
+        system_message="A human administrator overseeing the content creation process.",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=MAX_ROUNDS,
+        is_termination_msg=is_termination_message,
+        code_execution_config=False,
+    )
+    return user_proxy
+
+
+TOOL_FUNCTIONS = {
+    "search_knowledge_base": search_knowledge_base,
+    "get_writing_guidelines": get_writing_guidelines,
+}
+
+ASYNC_TOOL_FUNCTIONS = {
+    "search_knowledge_base": a_search_knowledge_base,
+    "get_writing_guidelines": a_get_writing_guidelines,
+}
+
+
+def register_tools(
+    user_proxy: UserProxyAgent,
+    agents: list,
+    function_map: Optional[Dict[str, Callable]] = None,
+) -> None:
+    for agent in agents:
+        if agent.name == "Researcher":
+            user_proxy.register_function(function_map=function_map or TOOL_FUNCTIONS)
+            TOOL_EXECUTOR.attach(user_proxy)
+
+            if agent.llm_config:
+                # The config dict is shared by every Researcher, and the client
+                # only sees tools that are in it when it is built
+                agent.llm_config = {**agent.llm_config, "tools": TOOLS}
+                agent.client = OpenAIWrapper(**agent.llm_config)
+
+
+def setup_group_chat(agents: list, user_proxy: UserProxyAgent) -> GroupChat:
+    all_agents = agents + [user_proxy]
+    if SPEAKER_SELECTION_METHOD == "graph":
+        selector = TransitionGraphSelector(llm_fallback=SPEAKER_GRAPH_LLM_FALLBACK)
+        return GroupChat(
+            agents=all_agents,
+            messages=[],
+            max_round=MAX_ROUNDS,
+            speaker_selection_method=selector,
+            allowed_or_disallowed_speaker_transitions=selector.allowed_transitions(
+                all_agents
+            ),
+            speaker_transitions_type="allowed",
+        )
+
+    group_chat = GroupChat(
+        agents=all_agents,
+        messages=[],
+        max_round=MAX_ROUNDS,
+        speaker_selection_method=SPEAKER_SELECTION_METHOD,
+    )
+    return group_chat
+
+
+def build_initial_message(
+    topic: str,
+    content_type: str,
+    prefetched: Optional[List[Tuple[str, Dict[str, str], Any]]] = None,
+) -> str:
+    # Ordered from most to least shared so jobs extend each other's cached
+    # prefix: the fixed instructions, then prefetched results that depend
+    # only on the content type, then the topic and its own results
+    if prefetched is None:
+        return f"""Please coordinate the team to:
+1. Research the topic thoroughly using available tools
+2. Create well-structured, engaging content
+3. Review and ensure quality standards are met
+
+We need to create a {content_type} about: {topic}
+
+Let's begin!"""
+
+    shared = [result for result in prefetched if set(result[1]) <= {"content_type"}]
+    per_job = [result for result in prefetched if result not in shared]
+    return f"""Please coordinate the team to:
+1. Research the topic starting from the tool results below (Researcher: call
+   the tools again only for follow-up queries they do not cover)
+2. Create well-structured, engaging content
+3. Review and ensure quality standards are met
+
+{format_prefetched(shared)}
+
+We need to create a {content_type} about: {topic}
+
+{format_prefetched(per_job)}
+
+Let's begin!"""
+
+
+def prefetch_calls(topic: str, content_type: str) -> List[Tuple[str, Dict[str, str]]]:
+    """The tool calls whose arguments are known before the chat starts."""
+    return [
+        ("search_knowledge_base", {"topic": topic}),
+        ("get_writing_guidelines", {"content_type": content_type}),
+    ]
+
+
+def format_prefetched(results: List[Tuple[str, Dict[str, str], Any]]) -> str:
+    sections = ["Prefetched tool results:"]
+    for name, arguments, result in results:
+        call = ", ".join(
+            f"{key}={json.dumps(value)}" for key, value in arguments.items()
+        )
+        sections.append(
+            f"{name}({call}) ->\n{json.dumps(result, ensure_ascii=False, default=str)}"
+        )
+    return "\n\n".join(sections)
+
+
+def prefetch_tool_results(
+    topic: str, content_type: str, tracer: Optional[Tracer] = None
+) -> List[Tuple[str, Dict[str, str], Any]]:
+    """
+    Run the Researcher's predictable tool calls locally, ahead of the chat.
+
+    Saves the LLM round trips the Researcher would otherwise spend emitting
+    these function calls; the tools stay registered for follow-ups.
+
+    Returns:
+        A (tool name, arguments, result) tuple per call
+    """
+    results = []
+    for name, arguments in prefetch_calls(topic, content_type):
+        if tracer is None:
+            results.append((name, arguments, TOOL_FUNCTIONS[name](**arguments)))
+            continue
+        with tracer.span(SPAN_TOOL, "prefetch", tool=name):
+            results.append((name, arguments, TOOL_FUNCTIONS[name](**arguments)))
+    return results
+
+
+async def a_prefetch_tool_results(
+    topic: str, content_type: str, tracer: Optional[Tracer] = None
+) -> List[Tuple[str, Dict[str, str], Any]]:
+    """Async variant of prefetch_tool_results; the calls run concurrently."""
+
+    async def call(name: str, arguments: Dict[str, str]) -> Any:
+        if tracer is None:
+            return await ASYNC_TOOL_FUNCTIONS[name](**arguments)
+        with tracer.span(SPAN_TOOL, "prefetch", tool=name):
+            return await ASYNC_TOOL_FUNCTIONS[name](**arguments)
+
+    calls = prefetch_calls(topic, content_type)
+    outputs = await asyncio.gather(*(call(name, args) for name, args in calls))
+    return [(name, args, output) for (name, args), output in zip(calls, outputs)]
+
+
+def prepare_initial_message(
+    topic: str, content_type: str, tracer: Optional[Tracer] = None
+) -> str:
+    prefetched = (
+        prefetch_tool_results(topic, content_type, tracer) if PREFETCH_TOOLS else None
+    )
+    return build_initial_message(topic, content_type, prefetched)
+
+
+async def a_prepare_initial_message(
+    topic: str, content_type: str, tracer: Optional[Tracer] = None
+) -> str:
+    prefetched = (
+        await a_prefetch_tool_results(topic, content_type, tracer)
+        if PREFETCH_TOOLS
+        else None
+    )
+    return build_initial_message(topic, content_type, prefetched)
+
+
+def build_pipeline(
+    function_map: Optional[Dict[str, Callable]] = None, silent: bool = False
+) -> Tuple[
+    List[AssistantAgent],
+    UserProxyAgent,
+    GroupChat,
+    GroupChatManager,
+    Optional[Tracer],
+    Optional[BudgetGovernor],
+]:
+    agents = [
+        create_planner_agent(),
+        create_researcher_agent(),
+        create_writer_agent(),
+        create_critic_agent(),
+    ]
+    user_proxy = create_user_proxy()
+    register_tools(user_proxy, agents, function_map)
+    roles = {agent.name: agent for agent in agents}
+    # Attached first so its reply runs before the drafter's
+    if SECTION_WRITER is not None:
+        SECTION_WRITER.attach(roles["Writer"], roles["Planner"])
+    if DRAFTER is not None:
+        DRAFTER.attach(roles["Writer"], roles["Critic"])
+    # Per-model clients of routed agents, which streaming must wrap as well
+    routed: Dict[str, List[OpenAIWrapper]] = {}
+    if MODEL_ROUTER is not None:
+        for agent in agents:
+            routed[agent.name] = MODEL_ROUTER.attach(agent)
+    if HISTORY_COMPACTION_ENABLED:
+        for agent in agents:
+            apply_history_compaction(
+                agent, HISTORY_COMPACTION.get(agent.name), model=MODEL_NAME
+            )
+    if TOKEN_STREAMER is not None:
+        for agent in agents:
+            TOKEN_STREAMER.attach(
+                agent, console=not silent, clients=routed.get(agent.name)
+            )
+    group_chat = setup_group_chat(agents, user_proxy)
+    manager = GroupChatManager(
+        groupchat=group_chat,
+        llm_config=MANAGER_CONFIG,
+        silent=silent,
+    )
+    select_with_manager_client(group_chats(manager))
+    if MODEL_ROUTER is not None:
+        MODEL_ROUTER.attach(manager)
+    tracer = (
+        instrument_pipeline(agents, user_proxy, group_chat, manager)
+        if TRACE_ENABLED
+        else None
+    )
+    governor = None
+    if BUDGET_MAX_TOKENS or BUDGET_MAX_COST_USD or BUDGET_MAX_SECONDS:
+        governor = BudgetGovernor(
+            max_tokens=BUDGET_MAX_TOKENS,
+            max_cost_usd=BUDGET_MAX_COST_USD,
+            max_seconds=BUDGET_MAX_SECONDS,
+        )
+        governor.attach(agents, manager)
+    return agents, user_proxy, group_chat, manager, tracer, governor
+
+
+def collect_result(
+    topic: str,
+    content_type: str,
+    group_chat: GroupChat,
+    error: Optional[Exception] = None,
+    tracer: Optional[Tracer] = None,
+    governor: Optional[BudgetGovernor] = None,
+) -> Dict[str, Any]:
+    result = {
+        "topic": topic,
+        "content_type": content_type,
+        "status": "incomplete",
+        "rounds": len(group_chat.messages),
+        "final_content": extract_final_content(group_chat.messages),
+    }
+    if tracer is not None:
+        result["trace_id"] = tracer.trace_id
+    if governor is not None:
+        result["budget"] = governor.usage()
+    if error is not None:
+        result["status"] = "error"
+        result["error"] = str(error)
+    elif any(is_approval_message(m) for m in group_chat.messages):
+        result["status"] = "approved"
+    elif governor is not None and governor.exhausted:
+        # final_content already holds the latest draft
+        result["status"] = "budget_exhausted"
+    return result
+
+
+def run_content_pipeline(
+    topic: str,
+    content_type: str = "technical_blog",
+    resume: bool = False,
+    session: Optional["PipelineSession"] = None,
+) -> Dict[str, Any]:
+    print_header("AutoGen Multi-Agent Content Creation Pipeline", "cyan")
+
+    print(f"Topic: {colored(topic, 'green', attrs=['bold'])}")
+    print(f"Content Type: {colored(content_type, 'green', attrs=['bold'])}")
+    print(f"Max Rounds: {colored(MAX_ROUNDS, 'green', attrs=['bold'])}\n")
+
+    if session is None:
+        print_section("Creating Agents...", "yellow")
+        session = PipelineSession()
+
+        print(f"✓ {colored('Planner Agent', 'green')} - Coordinates workflow")
+        print(f"✓ {colored('Researcher Agent', 'green')} - Gathers information")
+        print(f"✓ {colored('Writer Agent', 'green')} - Creates content")
+        print(f"✓ {colored('Critic Agent', 'green')} - Reviews quality")
+        print(f"✓ {colored('Admin (UserProxy)', 'green')} - Executes tools & oversees")
+
+        print_section("Registering Tools...", "yellow")
+        print(f"✓ Registered {colored('search_knowledge_base', 'green')} tool")
+        print(f"✓ Registered {colored('get_writing_guidelines', 'green')} tool")
+
+        print_section("Setting Up Group Chat...", "yellow")
+        print(
+            f"✓ Group chat configured with {colored(f'{len(session.agents) + 1}', 'green')} participants"
+        )
+
+    result = session.run(topic, content_type, resume=resume)
+    if result["status"] == "error":
+        if CHECKPOINT_STORE is not None and result["rounds"]:
+            print(
+                colored(
+                    f"Progress up to round {result['rounds']} is checkpointed; "
+                    "run again and choose to resume.",
+                    "yellow",
+                )
+            )
+        return result
+
+    print_section("Workflow Complete!", "green")
+    print(f"✓ Total rounds: {colored(result['rounds'], 'green')}")
+    print_budget(result)
+    print_cache_stats()
+    print_stream_stats()
+    print_draft_stats()
+    print_section_stats()
+    print_tool_stats()
+    print_model_stats()
+    print_rate_limit_stats()
+    print_trace_summary(session.tracer)
+    if "artifact" in result:
+        print(f"✓ Approved content stored as {colored(result['artifact'], 'green')}")
+    else:
+        print(f"✓ Check the conversation above for the final content")
+    print(f"\n{'═' * 70}\n")
+    return result
+
+
+def load_checkpoint(
+    topic: str, content_type: str, run_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    if CHECKPOINT_STORE is None:
+        return None
+    return CHECKPOINT_STORE.load(topic, content_type, run_id)
+
+
+def attach_checkpoints(
+    manager: GroupChatManager,
+    topic: str,
+    content_type: str,
+    run_id: Optional[str] = None,
+) -> None:
+    if CHECKPOINT_STORE is not None:
+        CHECKPOINT_STORE.attach(manager, topic, content_type, run_id)
+
+
+def detach_checkpoints(manager: GroupChatManager) -> None:
+    if CHECKPOINT_STORE is not None:
+        CHECKPOINT_STORE.detach(manager)
+
+
+def finish_checkpoint(result: Dict[str, Any], run_id: Optional[str] = None) -> None:
+    # A failed run keeps its checkpoint so it can be resumed
+    if CHECKPOINT_STORE is not None and result["status"] != "error":
+        CHECKPOINT_STORE.clear(result["topic"], result["content_type"], run_id)
+
+
+def set_section_content_type(agents: List[ConversableAgent], content_type: str) -> None:
+    if SECTION_WRITER is not None:
+        roles = {agent.name: agent for agent in agents}
+        SECTION_WRITER.set_content_type(roles["Writer"], content_type)
+
+
+def use_async_termination_check(agents: List[ConversableAgent]) -> None:
+    # AutoGen 0.2's a_generate_reply runs both the sync and the async
+    # termination check, so every auto-reply counts twice against
+    # max_consecutive_auto_reply; keep only the async one.
+    for agent in agents:
+        agent._reply_func_list = [
+            reply_func
+            for reply_func in agent._reply_func_list
+            if reply_func["reply_func"]
+            is not ConversableAgent.check_termination_and_human_reply
+        ]
+
+
+class NullIOStream:
+    """An AutoGen IOStream that drops all output and answers input with ""."""
+
+    def print(
+        self, *objects: Any, sep: str = " ", end: str = "\n", flush: bool = False
+    ) -> None:
+        pass
+
+    def input(self, prompt: str = "", *, password: bool = False) -> str:
+        return ""
+
+
+class PipelineSession:
+    """
+    A pipeline built once and reused for many conversations.
+
+    The agents, their OpenAI clients, tool registrations and instrumentation
+    are created in the constructor. Each ``run`` first clears only
+    per-conversation state: chat histories, reply counters, the group
+    chat's messages and round limit, the trace and the budget. A session
+    holds one conversation at a time; use one session per concurrent job.
+
+    Args:
+        silent: Do not print the conversation
+        use_async: Register coroutine tools for ``a_run`` instead of the
+            blocking ones for ``run``
+    """
+
+    def __init__(self, silent: bool = False, use_async: bool = False):
+        self.silent = silent
+        self.use_async = use_async
+        (
+            self.agents,
+            self.user_proxy,
+            self.group_chat,
+            self.manager,
+            self.tracer,
+            self.governor,
+        ) = build_pipeline(
+            function_map=ASYNC_TOOL_FUNCTIONS if use_async else None, silent=silent
+        )
+        if use_async:
+            use_async_termination_check(self.agents + [self.user_proxy, self.manager])
+            for agent in self.agents:
+                offload_completions(agent)
+        self.on_message: Optional[Callable[[Dict[str, Any]], None]] = None
+        for agent in self.agents + [self.user_proxy]:
+            agent.register_hook("process_message_before_send", self._message_sent)
+
+    def _message_sent(
+        self, sender: ConversableAgent, message: Any, recipient: Any, silent: bool
+    ) -> Any:
+        # Every participant's turn is sent to the manager exactly once
+        if self.on_message is not None and recipient is self.manager:
+            sent = {"content": message} if isinstance(message, str) else message
+            self.on_message(
+                {
+                    "round": len(self.group_chat.messages) + 1,
+                    "name": sender.name,
+                    "content": sent.get("content"),
+                    "tool_calls": [
+                        call["function"]["name"]
+                        for call in sent.get("tool_calls") or []
+                    ],
+                }
+            )
+        return message
+
+    def reset(self) -> None:
+        """Clear everything left over from the previous conversation."""
+        for agent in self.agents + [self.user_proxy, self.manager]:
+            # Also clears the group chat's messages, via the manager
+            agent.reset()
+        # Resuming from a checkpoint shortens max_round
+        for group_chat in group_chats(self.manager):
+            group_chat.max_round = MAX_ROUNDS
+        if self.tracer is not None:
+            self.tracer.reset()
+        if self.governor is not None:
+            self.governor.reset()
+
+    def _output(self) -> contextlib.AbstractContextManager:
+        # AutoGen prints tool executions whatever ``silent`` says, so a
+        # silent session swaps in a stream that drops everything
+        if self.silent:
+            return IOStream.set_default(NullIOStream())
+        return contextlib.nullcontext()
+
+    def _finish(
+        self,
+        topic: str,
+        content_type: str,
+        checkpoint: Optional[Dict[str, Any]],
+        error: Optional[Exception],
+        run_id: Optional[str],
+    ) -> Dict[str, Any]:
+        detach_checkpoints(self.manager)
+        self.on_message = None
+        export_trace(self.tracer)
+        result = collect_result(
+            topic, content_type, self.group_chat, error, self.tracer, self.governor
+        )
+        if checkpoint is not None:
+            result["resumed_from_round"] = checkpoint["round"]
+        finish_checkpoint(result, run_id)
+        store_artifact(result, self.group_chat.messages)
+        return result
+
+    def _print_error(self, error: Exception, resumed: bool) -> None:
+        if self.silent:
+            return
+        print(colored(f"\n⚠️  Error during execution: {error}", "red"))
+        if not resumed:
+            print(
+                colored("This might be due to missing API key or configuration.", "red")
+            )
+
+    def run(
+        self,
+        topic: str,
+        content_type: str = "technical_blog",
+        resume: bool = False,
+        on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run one conversation on the session's agents.
+
+        Args:
+            topic: Subject of the content
+            content_type: technical_blog, tutorial, documentation or email
+            resume: Continue from the job's checkpoint, if it has one
+            on_message: Called with the round, speaker name, content and
+                tool call names of every message as it is sent
+            run_id: Keys the checkpoint along with the topic and content
+                type; give concurrent runs of one topic distinct ids
+
+        Returns:
+            The result dict built by ``collect_result``
+        """
+        self.reset()
+        self.on_message = on_message
+        set_section_content_type(self.agents, content_type)
+        checkpoint = load_checkpoint(topic, content_type, run_id) if resume else None
+
+        error = None
+        with self._output():
+            try:
+                if checkpoint is not None:
+                    if not self.silent:
+                        print_section(
+                            f"Resuming Workflow from Round {checkpoint['round']}...",
+                            "magenta",
+                        )
+                    speaker, message = resume_from_checkpoint(
+                        self.manager, checkpoint, silent=self.silent
+                    )
+                    attach_checkpoints(self.manager, topic, content_type, run_id)
+                    speaker.initiate_chat(
+                        self.manager,
+                        message=message,
+                        clear_history=False,
+                        silent=self.silent,
+                    )
+                else:
+                    initial_message = prepare_initial_message(
+                        topic, content_type, self.tracer
+                    )
+                    if not self.silent:
+                        print_section("Starting Multi-Agent Workflow...", "magenta")
+                        print(
+                            f"Initial message to Planner:\n{colored(initial_message, 'white')}\n"
+                        )
+                    attach_checkpoints(self.manager, topic, content_type, run_id)
+                    self.user_proxy.initiate_chat(
+                        self.manager, message=initial_message, silent=self.silent
+                    )
+            except Exception as e:
+                self._print_error(e, checkpoint is not None)
+                error = e
+
+        return self._finish(topic, content_type, checkpoint, error, run_id)
+
+    async def a_run(
+        self,
+        topic: str,
+        content_type: str = "technical_blog",
+        resume: bool = False,
+        on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of ``run``; the session must be built with use_async."""
+        self.reset()
+        self.on_message = on_message
+        set_section_content_type(self.agents, content_type)
+        checkpoint = load_checkpoint(topic, content_type, run_id) if resume else None
+
+        error = None
+        with self._output():
+            try:
+                if checkpoint is not None:
+                    speaker, message = await a_resume_from_checkpoint(
+                        self.manager, checkpoint, silent=self.silent
+                    )
+                    attach_checkpoints(self.manager, topic, content_type, run_id)
+                    await speaker.a_initiate_chat(
+                        self.manager,
+                        message=message,
+                        clear_history=False,
+                        silent=self.silent,
+                    )
+                else:
+                    attach_checkpoints(self.manager, topic, content_type, run_id)
+                    await self.user_proxy.a_initiate_chat(
+                        self.manager,
+                        message=await a_prepare_initial_message(
+                            topic, content_type, self.tracer
+                        ),
+                        silent=self.silent,
+                    )
+            except Exception as e:
+                self._print_error(e, checkpoint is not None)
+                error = e
+
+        return self._finish(topic, content_type, checkpoint, error, run_id)
+
+
+async def a_run_content_pipeline(
+    topic: str,
+    content_type: str = "technical_blog",
+    silent: bool = True,
+    resume: bool = False,
+    session: Optional[PipelineSession] = None,
+) -> Dict[str, Any]:
+    """
+    Async variant of run_content_pipeline built on ``a_initiate_chat``.
+
+    Tools are registered as coroutines and nothing blocks the event loop,
+    so many pipelines can be awaited concurrently from one process. Pass a
+    ``session`` built with ``use_async=True`` to reuse its agents.
+    """
+    if session is None:
+        session = PipelineSession(silent=silent, use_async=True)
+    return await session.a_run(topic, content_type, resume=resume)
+
+
+async def a_run_many(
+    jobs: List[Dict[str, str]],
+    concurrency: int = 8,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    resume: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Run many pipelines on one event loop, at most ``concurrency`` at a time.
+
+    AutoGen 0.2 completions block, so each runs in a thread. They run in an
+    executor of their own, sized to the concurrency limit and shut down on
+    return, rather than in the loop's default executor, which would cap the
+    number of in-flight LLM calls at ``min(32, cpu_count + 4)``. At most
+    ``concurrency`` PipelineSessions are built and each is reused by the
+    jobs that follow it.
+
+    Args:
+        jobs: Dicts with ``topic`` and ``content_type`` keys
+        concurrency: Maximum number of conversations in flight
+        on_result: Called with each result as soon as its job finishes
+        resume: Continue jobs that have a checkpoint from an earlier run
+
+    Returns:
+        Results in the same order as ``jobs``
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    idle_sessions: List[PipelineSession] = []
+
+    async def run_one(job: Dict[str, str]) -> Dict[str, Any]:
+        async with semaphore:
+            session = (
+                idle_sessions.pop()
+                if idle_sessions
+                else PipelineSession(silent=True, use_async=True)
+            )
+            try:
+                result = await session.a_run(
+                    job["topic"], job["content_type"], resume=resume
+                )
+            finally:
+                idle_sessions.append(session)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm")
+    try:
+        # The jobs' tasks inherit the executor from this context
+        with use_executor(executor):
+            return await asyncio.gather(*(run_one(job) for job in jobs))
+    finally:
+        executor.shutdown(wait=False)
@@ -0,0 +1,89 @@
+"""
+Prompt assembly that keeps provider-side prefix caches warm.
+
+OpenAI-compatible providers cache prompts by prefix: when a request starts
+with the same tool schemas and leading messages, byte for byte, as a recent
+one, those tokens are served from cache (faster, and billed at a discount)
+and reported as ``usage.prompt_tokens_details.cached_tokens``. Every agent
+resends its system message and the whole conversation each round, so its
+prompts are almost all prefix as long as they are built in one fixed order:
+
+1. static content: the agent's system message (tool schemas travel in the
+   request's ``tools`` field, which providers place ahead of the messages);
+2. the conversation, oldest first, as that agent has stored it;
+3. what is specific to this one call (a section instruction, a draft's
+   emphasis), as trailing messages.
+
+AutoGen's own reply path already follows this order. The completions the
+pipeline makes itself (drafting.py, sections.py) build their prompts with
+``assemble_prompt`` so they extend the same prefixes instead of starting new
+ones.
+
+History compaction (compaction.py) cannot be combined with this. Its
+transforms rewrite the middle of each reply's history, and
+``agent_history`` still returns the full copy. Keep it off wherever prefix
+caching matters.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from autogen import Agent, ConversableAgent
+
+
+def assemble_prompt(
+    agent: ConversableAgent,
+    history: Sequence[Dict[str, Any]],
+    *trailing: Union[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Build the message list for one of ``agent``'s completions.
+
+    Args:
+        agent: Agent whose system message leads the prompt
+        history: Conversation so far, ideally ``agent_history`` so the
+            prompt extends the agent's previous ones
+        trailing: Per-call instructions; strings become user messages
+
+    Returns:
+        System message, history, then the trailing messages
+    """
+    return (
+        agent._oai_system_message
+        + list(history)
+        + [
+            (
+                {"role": "user", "content": message}
+                if isinstance(message, str)
+                else message
+            )
+            for message in trailing
+        ]
+    )
+
+
+def agent_history(
+    agent: ConversableAgent,
+    conversation: Optional[Agent],
+    fallback: Sequence[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Return the conversation as ``agent`` stored it.
+
+    In a group chat every agent holds its own copy of the history (its own
+    messages as ``assistant``, the others' as named ``user`` messages).
+    Prompting an agent's model with another agent's copy gives a different
+    byte sequence and so misses the prefix cache; this returns the agent's
+    copy for ``conversation`` (the GroupChatManager) when it has one.
+    """
+    if conversation is not None and agent.chat_messages.get(conversation):
+        return agent.chat_messages[conversation]
+    return list(fallback)
+
+
+def cached_tokens(response: Any) -> int:
+    """Prompt tokens the provider served from its prefix cache (0 if unreported)."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", 0) or 0
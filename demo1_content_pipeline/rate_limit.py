@@ -0,0 +1,205 @@
+"""
+Shared request and token rate limiting with adaptive concurrency.
+
+Many pipelines in one process share one provider quota. Every request is
+paced by two token buckets (requests per minute and tokens per minute) and
+admitted only while fewer than the current concurrency limit are in
+flight. That limit adapts AIMD-style: it grows by about one per round of
+successful calls and is cut on 429s or when latency passes a target. Retries
+go through the limiter like any other request, so clients backing off
+together cannot stampede the provider in sync.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Refills ``rate_per_minute`` units a minute, up to ``capacity``.
+
+    A request larger than the capacity waits for a full bucket and then
+    leaves it in debt, so oversized requests are slowed, not rejected.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, rate_per_minute / 10.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can be now)."""
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    Admission control for every LLM request in the process.
+
+    Callers block in ``acquire`` until both buckets have room and a
+    concurrency slot is free, then hand the ticket back to ``release`` with
+    the outcome. Not tied to any HTTP library; see http_pool.py for the
+    transport that drives it.
+
+    Args:
+        requests_per_minute: Request quota (None or 0 for no limit)
+        tokens_per_minute: Token quota (None or 0 for no limit)
+        max_concurrency: Upper bound for the adaptive concurrency limit
+        min_concurrency: Lower bound the limit is never cut below
+        target_latency_s: Cut the limit when a request takes longer than
+            this (None or 0 to react to 429s only)
+    """
+
+    BACKOFF = 0.5
+    LATENCY_BACKOFF = 0.9
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        target_latency_s: Optional[float] = None,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.target_latency_s = target_latency_s or None
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.admitted = 0
+        self.throttled = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens, now))
+        return max(waits)
+
+    def acquire(self, tokens: int) -> Dict[str, Any]:
+        """
+        Block until a request estimated at ``tokens`` may be sent.
+
+        Returns:
+            A ticket to pass to ``release`` once the request is done
+        """
+        started = time.monotonic()
+        with self._cond:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self.in_flight < int(self.limit):
+                        wait = self._wait_time(tokens, now)
+                        if wait == 0.0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self.queued -= 1
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+            self.admitted += 1
+            waited = time.monotonic() - started
+            self.wait_s_total += waited
+            self.wait_s_max = max(self.wait_s_max, waited)
+        return {"tokens": tokens, "sent_at": time.monotonic()}
+
+    def _cut(self, factor: float, now: float, latency: float) -> None:
+        # At most one cut per round trip, so a burst of 429s from requests
+        # that were already in flight only counts once
+        if now - self._last_cut >= latency:
+            self.limit = max(float(self.min_concurrency), self.limit * factor)
+            self._last_cut = now
+
+    def release(
+        self,
+        ticket: Dict[str, Any],
+        status: Optional[int],
+        used_tokens: Optional[int] = None,
+    ) -> None:
+        """
+        Return a concurrency slot and adapt the limit to the outcome.
+
+        Args:
+            ticket: What ``acquire`` returned
+            status: HTTP status of the response (None if the request failed)
+            used_tokens: Actual tokens, when known, to settle the estimate
+        """
+        now = time.monotonic()
+        latency = now - ticket["sent_at"]
+        with self._cond:
+            self.in_flight -= 1
+            if self.tokens is not None and used_tokens is not None:
+                difference = used_tokens - ticket["tokens"]
+                if difference > 0:
+                    self.tokens.take(difference)
+                else:
+                    self.tokens.give(-difference)
+            if status == 429:
+                self.throttled += 1
+                self._cut(self.BACKOFF, now, latency)
+            elif (
+                status is not None
+                and status < 400
+                and self.target_latency_s is not None
+                and latency > self.target_latency_s
+            ):
+                self._cut(self.LATENCY_BACKOFF, now, latency)
+            elif status is not None and status < 400:
+                self.limit = min(
+                    float(self.max_concurrency), self.limit + 1.0 / self.limit
+                )
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the limiter's current state and totals.
+
+        Returns:
+            Concurrency limit, requests in flight and queued (now and at
+            peak), admitted and throttled (429) requests, and total, mean
+            and max seconds spent waiting for admission
+        """
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "max_queued": self.max_queued,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "wait_s_total": round(self.wait_s_total, 3),
+                "wait_s_mean": round(self.wait_s_total / max(1, self.admitted), 3),
+                "wait_s_max": round(self.wait_s_max, 3),
+            }
@@ -0,0 +1,254 @@
+"""
+Speaker selection for the content pipeline.
+
+The workflow is a fixed loop (Planner -> Researcher -> Admin (tools) ->
+Writer -> Critic -> Writer | done), so the next speaker can usually be read
+off a transition table instead of asking the GroupChatManager's LLM. Only
+edges the rules cannot resolve fall back to LLM selection, and then only
+among the agents the graph allows. LLM selection itself is sent through
+the manager's own client, so it is traced, metered and routed like every
+other completion.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from autogen import Agent, GroupChat
+
+# Allowed next speakers for each speaker, by agent name.
+SPEAKER_TRANSITIONS: Dict[str, List[str]] = {
+    "Admin": ["Planner", "Researcher"],
+    "Planner": ["Researcher", "Writer", "Critic"],
+    "Researcher": ["Admin", "Writer"],
+    "Writer": ["Critic"],
+    "Critic": ["Writer", "Admin"],
+}
+
+APPROVAL_SIGNAL = "APPROVED - CONTENT MEETS QUALITY STANDARDS"
+
+
+def _is_tool_call(message: Dict) -> bool:
+    return bool(message.get("function_call") or message.get("tool_calls"))
+
+
+def _is_tool_result(message: Dict) -> bool:
+    return message.get("role") in ("function", "tool") or bool(
+        message.get("tool_responses")
+    )
+
+
+def _mentioned(content: str, candidates: List[str]) -> List[str]:
+    return [name for name in candidates if name.lower() in content.lower()]
+
+
+def next_speaker_name(
+    last_speaker: str, message: Dict, candidates: List[str]
+) -> Optional[str]:
+    """
+    Apply the workflow rules to pick the next speaker.
+
+    Args:
+        last_speaker: Name of the agent that sent ``message``
+        message: The latest message in the group chat
+        candidates: Allowed next speakers for ``last_speaker``
+
+    Returns:
+        The next speaker's name, or None when the edge is ambiguous
+    """
+    if len(candidates) == 1:
+        return candidates[0]
+
+    content = message.get("content") or ""
+    if _is_tool_call(message):
+        return "Admin"
+    if last_speaker == "Admin":
+        return "Researcher" if _is_tool_result(message) else "Planner"
+    if last_speaker == "Researcher":
+        return "Writer"
+    if last_speaker == "Critic":
+        return "Admin" if APPROVAL_SIGNAL in content.upper() else "Writer"
+    if last_speaker == "Planner":
+        mentions = _mentioned(content, candidates)
+        if len(mentions) == 1:
+            return mentions[0]
+    return None
+
+
+class TransitionGraphSelector:
+    """
+    Speaker selection function for GroupChat's ``speaker_selection_method``.
+
+    Resolves each turn from SPEAKER_TRANSITIONS. Ambiguous edges return
+    "auto" (restricted to the graph's allowed speakers) when ``llm_fallback``
+    is set, otherwise the first allowed speaker.
+    """
+
+    def __init__(
+        self,
+        transitions: Optional[Dict[str, List[str]]] = None,
+        llm_fallback: bool = True,
+    ):
+        self.transitions = transitions or SPEAKER_TRANSITIONS
+        self.llm_fallback = llm_fallback
+
+    def allowed_transitions(
+        self, agents: List["Agent"]
+    ) -> Dict["Agent", List["Agent"]]:
+        """Build the agent-keyed graph GroupChat uses to restrict fallbacks."""
+        by_name = {agent.name: agent for agent in agents}
+        return {
+            by_name[name]: [by_name[n] for n in next_names if n in by_name]
+            for name, next_names in self.transitions.items()
+            if name in by_name
+        }
+
+    def __call__(
+        self, last_speaker: "Agent", groupchat: "GroupChat"
+    ) -> Union["Agent", str]:
+        candidates = self.transitions.get(last_speaker.name, [])
+        message = groupchat.messages[-1] if groupchat.messages else {}
+
+        name = next_speaker_name(last_speaker.name, message, candidates)
+        if name is None and not self.llm_fallback and candidates:
+            name = candidates[0]
+        if name is None:
+            return "auto"
+        return groupchat.agent_by_name(name)
+
+
+# The GroupChat methods select_with_manager_client replaces. They are private
+# to AutoGen 0.2, which is why pyproject.toml pins its exact version.
+_AUTO_SELECT_HOOKS = ("_auto_select_speaker", "a_auto_select_speaker")
+
+
+def _selected_names(content: str, agents: List["Agent"]) -> List[str]:
+    # Names mentioned in a selection reply, matched the way AutoGen does:
+    # on word boundaries, with underscores also written as spaces or "\_"
+    names = []
+    for agent in agents:
+        spellings = {
+            agent.name,
+            agent.name.replace("_", " "),
+            agent.name.replace("_", r"\_"),
+        }
+        pattern = r"(?<=\W)(" + "|".join(map(re.escape, spellings)) + r")(?=\W)"
+        if re.search(pattern, f" {content} "):
+            names.append(agent.name)
+    return names
+
+
+def _selection_prompt(
+    groupchat: "GroupChat", messages: List[Dict], agents: List["Agent"]
+) -> List[Dict]:
+    # The request AutoGen's speaker_selection_agent would send: the selection
+    # system message, the group chat history with tool responses flattened
+    # as in generate_oai_reply, then the selection prompt
+    prompt = [{"role": "system", "content": groupchat.select_speaker_msg(agents)}]
+    for message in messages:
+        prompt.extend(message.get("tool_responses") or [])
+        if message.get("role") != "tool":
+            prompt.append({k: v for k, v in message.items() if k != "tool_responses"})
+    if groupchat.select_speaker_prompt_template is not None:
+        prompt.append(
+            {
+                "role": groupchat.role_for_select_speaker_messages,
+                "content": groupchat.select_speaker_prompt(agents),
+                "name": "checking_agent",
+            }
+        )
+    return prompt
+
+
+def _select_with_client(
+    groupchat: "GroupChat",
+    last_speaker: "Agent",
+    selector: "Agent",
+    messages: List[Dict],
+    agents: Optional[List["Agent"]],
+) -> "Agent":
+    agents = agents if agents is not None else groupchat.agents
+    prompt = _selection_prompt(groupchat, messages, agents)
+    agentlist = f"{[agent.name for agent in agents]}"
+    for _ in range(1 + groupchat.max_retries_for_selecting_speaker):
+        response = selector.client.create(messages=prompt)
+        reply = selector.client.extract_text_or_completion_object(response)[0]
+        name = (reply if isinstance(reply, str) else reply.content) or ""
+        mentions = _selected_names(name.strip(), agents)
+        if len(mentions) == 1:
+            return groupchat.agent_by_name(mentions[0])
+        template = (
+            groupchat.select_speaker_auto_multiple_template
+            if mentions
+            else groupchat.select_speaker_auto_none_template
+        )
+        prompt = prompt + [
+            {"role": "assistant", "content": name},
+            {
+                "role": groupchat.role_for_select_speaker_messages,
+                "content": template.format(agentlist=agentlist),
+                "name": "checking_agent",
+            },
+        ]
+    return groupchat.next_agent(last_speaker, agents)
+
+
+def _route_auto_selection(groupchat: "GroupChat") -> None:
+    missing = [hook for hook in _AUTO_SELECT_HOOKS if not hasattr(groupchat, hook)]
+    if missing:
+        import autogen
+
+        raise RuntimeError(
+            f"AutoGen {autogen.__version__} has no GroupChat.{', '.join(missing)}; "
+            "select_with_manager_client needs the AutoGen version pinned in "
+            "pyproject.toml"
+        )
+    auto_select_speaker = groupchat._auto_select_speaker
+    a_auto_select_speaker = groupchat.a_auto_select_speaker
+
+    def select(
+        last_speaker: "Agent",
+        selector: "Agent",
+        messages: List[Dict],
+        agents: Optional[List["Agent"]],
+    ) -> "Agent":
+        if getattr(selector, "client", None) is None:
+            return auto_select_speaker(last_speaker, selector, messages, agents)
+        return _select_with_client(groupchat, last_speaker, selector, messages, agents)
+
+    async def a_select(
+        last_speaker: "Agent",
+        selector: "Agent",
+        messages: List[Dict],
+        agents: Optional[List["Agent"]],
+    ) -> "Agent":
+        if getattr(selector, "client", None) is None:
+            return await a_auto_select_speaker(last_speaker, selector, messages, agents)
+        from offload import run_blocking
+
+        return await run_blocking(
+            _select_with_client, groupchat, last_speaker, selector, messages, agents
+        )
+
+    groupchat._auto_select_speaker = select
+    groupchat.a_auto_select_speaker = a_select
+
+
+def select_with_manager_client(groupchats: List["GroupChat"]) -> None:
+    """
+    Make "auto" speaker selection call the selecting manager's own client.
+
+    AutoGen 0.2 selects by chatting with a ``speaker_selection_agent`` it
+    builds for every turn, with a new OpenAIWrapper made from the manager's
+    llm_config, so wrappers on ``manager.client`` (tracing, budget, model
+    routing) never saw those completions. This sends the same request,
+    with the same requery prompts, through ``manager.client`` instead.
+    Pass the manager's GroupChat and the copies it runs the chat on.
+
+    A ``speaker_selection_method`` callable cannot do this: GroupChat calls
+    it synchronously in async chats too, so every selection would block the
+    event loop. It replaces GroupChat's auto-selection methods instead, and
+    raises RuntimeError if the installed AutoGen lacks them.
+    """
+    for groupchat in groupchats:
+        _route_auto_selection(groupchat)
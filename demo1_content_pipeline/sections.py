@@ -0,0 +1,433 @@
+"""
+Section-parallel generation for long-form Writer turns.
+
+A long piece written as one completion takes as long as decoding all of it.
+For the content types listed in SECTION_CONTENT_TYPES the Writer's turn is
+split up instead:
+
+1. The Planner's model turns the content type's guideline structure (from
+   get_writing_guidelines) into a JSON outline of sections.
+2. The Writer's model drafts every section concurrently, each call seeing
+   the whole conversation (research included) plus the outline.
+3. The sections are stitched together locally, and the Planner's model
+   makes a short consistency pass that answers with a few find-and-replace
+   edits rather than rewriting the piece.
+
+Revision turns skip the outline and the consistency pass: the sections of
+the latest draft that the review names are revised concurrently and the
+others are kept as they were. A review that names no section is left to
+the usual single completion.
+
+The content type comes from the pipeline (``set_content_type``) rather than
+from the wording of the task message.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from autogen import Agent, ConversableAgent
+
+from offload import run_blocking
+from prompt_prefix import agent_history, assemble_prompt
+from tools.knowledge_tools import get_writing_guidelines
+
+_SECTION_HEADING = re.compile(r"^## ", re.M)
+_EDIT = re.compile(r"^REPLACE:(.*?)^WITH:(.*?)(?=^REPLACE:|\Z)", re.M | re.S)
+
+OUTLINE_PROMPT = """Outline the {content_type} for the task below so that its sections can be written in parallel by different writers.
+
+Follow this structure for a {content_type}:
+{structure}
+
+Reply with JSON only, in this form:
+{{"title": "...", "sections": [{{"heading": "...", "brief": "what this section covers"}}]}}
+Use at most {max_sections} sections. The title is not a section."""
+
+SECTION_INSTRUCTION = """You are writing one section of a {content_type} titled "{title}". The full outline:
+{outline}
+
+Write only section {number}: "{heading}" ({brief}). Start with the line "## {heading}". Do not write the title, other sections, or a conclusion for the whole piece unless this section is the conclusion."""
+
+REVISION_INSTRUCTION = """Revise only the section "{heading}" of your latest draft to address the review. Start with the line "## {heading}" and return just that section, unchanged if the review does not concern it."""
+
+CONSISTENCY_PROMPT = """The {content_type} below was assembled from sections written separately. Find up to {max_edits} small edits that fix inconsistencies between sections: repeated introductions, contradictions, terminology drift or missing transitions.
+
+Reply with one block per edit:
+REPLACE: <exact text from the piece>
+WITH: <replacement text>
+Reply NONE if no edits are needed.
+
+{document}"""
+
+
+def _content(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("content") or ""
+    return message or ""
+
+
+def _parse_json(text: str) -> Optional[Dict[str, Any]]:
+    # Models often wrap JSON in a code fence
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def parse_outline(text: str, max_sections: int) -> Optional[Dict[str, Any]]:
+    """
+    Read the Planner's outline.
+
+    Returns:
+        Dict with ``title`` and a non-empty list of ``sections`` (each with
+        ``heading`` and ``brief``), or None if the reply is not usable
+    """
+    outline = _parse_json(text)
+    if not isinstance(outline, dict):
+        return None
+    sections = [
+        {
+            "heading": str(section["heading"]).strip().lstrip("#").strip(),
+            "brief": str(section.get("brief", "")).strip(),
+        }
+        for section in outline.get("sections") or []
+        if isinstance(section, dict) and str(section.get("heading", "")).strip()
+    ][:max_sections]
+    if not sections:
+        return None
+    return {"title": str(outline.get("title") or "").strip(), "sections": sections}
+
+
+def split_sections(draft: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split a draft at its ``## `` headings.
+
+    Returns:
+        The text before the first section (title and lead-in) and a list of
+        (heading, section text) pairs in order
+    """
+    starts = [match.start() for match in _SECTION_HEADING.finditer(draft)]
+    if not starts:
+        return draft, []
+    preamble = draft[: starts[0]].strip()
+    sections = []
+    for start, end in zip(starts, starts[1:] + [len(draft)]):
+        text = draft[start:end].strip()
+        sections.append((text.splitlines()[0][3:].strip(), text))
+    return preamble, sections
+
+
+def stitch(preamble: str, sections: Sequence[Tuple[str, str]]) -> str:
+    """Join the preamble and sections, making sure each section has its heading."""
+    parts = [preamble] if preamble else []
+    for heading, text in sections:
+        text = text.strip()
+        if not text.startswith("## "):
+            text = f"## {heading}\n\n{text}"
+        parts.append(text)
+    return "\n\n".join(parts)
+
+
+def apply_edits(document: str, reply: str, max_edits: int) -> Tuple[str, int]:
+    """
+    Apply the consistency pass's REPLACE/WITH edits.
+
+    Edits whose text is not found verbatim are skipped.
+
+    Returns:
+        The edited document and the number of edits applied
+    """
+    applied = 0
+    for match in _EDIT.finditer(reply):
+        if applied == max_edits:
+            break
+        old, new = match.group(1).strip(), match.group(2).strip()
+        if old and old in document:
+            document = document.replace(old, new, 1)
+            applied += 1
+    return document, applied
+
+
+def named_sections(review: str, headings: Sequence[str]) -> List[str]:
+    """The headings that ``review`` mentions by name (case-insensitive)."""
+    review = review.lower()
+    return [heading for heading in headings if heading.lower() in review]
+
+
+# A section to write (called in a worker thread) or one kept as it was
+Section = Tuple[str, Union[str, Callable[[], str]]]
+
+
+class _WriterState:
+    """What a Writer's reply functions share: its Planner and the content type."""
+
+    def __init__(self, planner: ConversableAgent):
+        self.planner = planner
+        self.content_type: Optional[str] = None
+
+    def __copy__(self) -> "_WriterState":
+        # register_reply copies each reply function's config; keep one state
+        return self
+
+
+def _forget(state: _WriterState) -> None:
+    state.content_type = None
+
+
+class SectionWriter:
+    """
+    Writes the Writer's turn section by section, concurrently.
+
+    One instance (and its thread pool) is shared by all pipelines in the
+    process; ``attach`` wires one Writer/Planner pair.
+
+    Args:
+        content_types: Content types written this way; others are written
+            in one completion as usual
+        max_sections: Upper bound on the sections in an outline
+        max_edits: Upper bound on the consistency pass's edits
+        max_workers: Threads running section completions in sync chats
+    """
+
+    def __init__(
+        self,
+        content_types: Sequence[str] = ("technical_blog", "tutorial", "documentation"),
+        max_sections: int = 8,
+        max_edits: int = 5,
+        max_workers: int = 8,
+    ):
+        self.content_types = set(content_types)
+        self.max_sections = max_sections
+        self.max_edits = max_edits
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="section"
+        )
+        self._lock = threading.Lock()
+        self._stats = {"turns": 0, "sections": 0, "kept": 0, "edits": 0}
+
+    def attach(self, writer: ConversableAgent, planner: ConversableAgent) -> None:
+        """Write ``writer``'s turns by section, outlined with ``planner``'s model."""
+        # The content type is cleared whenever the Writer resets
+        state = _WriterState(planner)
+        reply_funcs = [entry["reply_func"] for entry in writer._reply_func_list]
+        writer.register_reply(
+            [Agent, None],
+            self.generate_sections_reply,
+            position=reply_funcs.index(ConversableAgent.generate_oai_reply),
+            config=state,
+            reset_config=_forget,
+        )
+        reply_funcs = [entry["reply_func"] for entry in writer._reply_func_list]
+        writer.register_reply(
+            [Agent, None],
+            self.a_generate_sections_reply,
+            position=reply_funcs.index(ConversableAgent.a_generate_oai_reply),
+            config=state,
+            reset_config=_forget,
+            ignore_async_in_sync_chat=True,
+        )
+
+    def set_content_type(self, writer: ConversableAgent, content_type: str) -> None:
+        """Tell an attached ``writer`` what the current conversation produces."""
+        for entry in writer._reply_func_list:
+            if entry["reply_func"] == self.generate_sections_reply:
+                entry["config"].content_type = content_type
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return section-writing counters for the process.
+
+        Returns:
+            Writer turns written by section, sections written, sections of
+            a revised draft kept as they were and consistency edits applied
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _complete(
+        self, agent: ConversableAgent, messages: List[Dict], instruction: str
+    ) -> str:
+        reply = agent._generate_oai_reply_from_client(
+            agent.client,
+            assemble_prompt(agent, messages, instruction),
+            agent.client_cache,
+        )
+        return _content(reply)
+
+    def _plan(
+        self,
+        writer: ConversableAgent,
+        state: _WriterState,
+        messages: List[Dict],
+        sender: Optional[Agent] = None,
+    ) -> Optional[Tuple[str, List[Section], bool]]:
+        """
+        Decide this turn's sections.
+
+        Returns:
+            The preamble, the sections, and whether the stitched piece gets
+            a consistency pass (not for revisions), or None to leave the
+            turn to the usual single completion
+        """
+        planner, content_type = state.planner, state.content_type
+        if writer.client is None or planner.client is None or not messages:
+            return None
+        if content_type not in self.content_types:
+            return None
+
+        latest = next(
+            (
+                index
+                for index in range(len(messages) - 1, -1, -1)
+                if messages[index].get("name") == writer.name
+                and _content(messages[index])
+            ),
+            None,
+        )
+        if latest is not None:
+            preamble, sections = split_sections(_content(messages[latest]))
+            review = "\n".join(_content(m) for m in messages[latest + 1 :])
+            named = named_sections(review, [heading for heading, _ in sections])
+            if len(sections) < 2 or not named:
+                return None
+            return (
+                preamble,
+                [
+                    (
+                        (
+                            heading,
+                            lambda heading=heading: self._complete(
+                                writer,
+                                messages,
+                                REVISION_INSTRUCTION.format(heading=heading),
+                            ),
+                        )
+                        if heading in named
+                        else (heading, text)
+                    )
+                    for heading, text in sections
+                ],
+                False,
+            )
+
+        guidelines = get_writing_guidelines(content_type).get("guidelines", {})
+        structure = guidelines.get("structure", [])
+        outline = parse_outline(
+            self._complete(
+                planner,
+                # The Planner's own copy, so the call extends its cached prefix
+                agent_history(planner, sender, messages),
+                OUTLINE_PROMPT.format(
+                    content_type=content_type,
+                    structure="\n".join(structure),
+                    max_sections=self.max_sections,
+                ),
+            ),
+            self.max_sections,
+        )
+        if outline is None:
+            return None
+        listing = "\n".join(
+            f"{number}. {section['heading']}: {section['brief']}"
+            for number, section in enumerate(outline["sections"], start=1)
+        )
+        return (
+            f"# {outline['title']}" if outline["title"] else "",
+            [
+                (
+                    section["heading"],
+                    lambda number=number, section=section: self._complete(
+                        writer,
+                        messages,
+                        SECTION_INSTRUCTION.format(
+                            content_type=content_type,
+                            title=outline["title"],
+                            outline=listing,
+                            number=number,
+                            **section,
+                        ),
+                    ),
+                )
+                for number, section in enumerate(outline["sections"], start=1)
+            ],
+            True,
+        )
+
+    def _assemble(
+        self,
+        state: _WriterState,
+        preamble: str,
+        sections: List[Section],
+        texts: List[str],
+        check: bool,
+    ) -> str:
+        document = stitch(
+            preamble, [(heading, text) for (heading, _), text in zip(sections, texts)]
+        )
+        edits = 0
+        if check:
+            # The pass only needs the assembled piece, not the conversation
+            reply = self._complete(
+                state.planner,
+                [],
+                CONSISTENCY_PROMPT.format(
+                    content_type=state.content_type,
+                    max_edits=self.max_edits,
+                    document=document,
+                ),
+            )
+            document, edits = apply_edits(document, reply, self.max_edits)
+        kept = sum(isinstance(write, str) for _, write in sections)
+        with self._lock:
+            self._stats["turns"] += 1
+            self._stats["sections"] += len(sections) - kept
+            self._stats["kept"] += kept
+            self._stats["edits"] += edits
+        return document
+
+    def generate_sections_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[_WriterState] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Write the sections in the thread pool, then stitch them together."""
+        plan = self._plan(recipient, config, messages or [], sender)
+        if plan is None:
+            return False, None
+        preamble, sections, check = plan
+        pending = [
+            write if isinstance(write, str) else self._pool.submit(write)
+            for _, write in sections
+        ]
+        texts = [text if isinstance(text, str) else text.result() for text in pending]
+        return True, self._assemble(config, preamble, sections, texts, check)
+
+    async def a_generate_sections_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[_WriterState] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Async variant: every completion runs in the executor threads."""
+        plan = await run_blocking(self._plan, recipient, config, messages or [], sender)
+        if plan is None:
+            return False, None
+        preamble, sections, check = plan
+
+        async def text(write: Union[str, Callable[[], str]]) -> str:
+            return write if isinstance(write, str) else await run_blocking(write)
+
+        texts = await asyncio.gather(*(text(write) for _, write in sections))
+        return True, await run_blocking(
+            self._assemble, config, preamble, sections, list(texts), check
+        )
@@ -0,0 +1,566 @@
+"""
+HTTP job service around the content pipeline.
+
+Other systems submit (topic, content_type) jobs over HTTP instead of
+shelling out to the interactive script. Jobs wait in a bounded in-process
+queue and a fixed pool of worker threads runs them, each worker on its own
+PipelineSession. When the queue is full a submission is refused with 429
+and a Retry-After hint, so callers back off instead of piling up latency.
+
+Endpoints:
+    POST /jobs              {"topic": ..., "content_type": ..., "resume": null}
+                            -> 202 with the job's status (429 if the queue is full);
+                            "resume" takes a failed job's run_id to continue it
+                            from its checkpoint
+    GET  /jobs/<id>         status, queue position and timings
+    GET  /jobs/<id>/events  server-sent events: queued, started, one message
+                            event per group chat message, finished
+    GET  /jobs/<id>/result  the pipeline result; 409 until the job is finished
+                            (add ?wait=SECONDS to long-poll for it)
+    GET  /artifacts         stored approved content, newest first; filter with
+                            ?topic=&content_type=&since=&until=&limit=
+    GET  /artifacts/<key>   one stored result with its content text
+                            (add ?research=1 for the research payloads)
+    GET  /health            queue depth, busy workers and job counts
+
+Usage:
+    python demo1_content_pipeline/service.py --port 8080 --workers 4
+"""
+
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import (
+    ARTIFACT_STORE,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_RETAIN_JOBS,
+    SERVICE_WORKERS,
+)
+from main import CONTENT_TYPES
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+
+# Longest a single request may block waiting on a job
+MAX_WAIT_SECONDS = 300.0
+KEEPALIVE_SECONDS = 15.0
+# How often an idle worker checks whether the queue is stopping
+WORKER_POLL_SECONDS = 0.2
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when no more jobs can be queued."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"job queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    """One pipeline run: its request, progress events and result."""
+
+    def __init__(
+        self, number: int, topic: str, content_type: str, resume: Optional[str]
+    ):
+        self.id = uuid.uuid4().hex
+        self.number = number
+        self.topic = topic
+        self.content_type = content_type
+        # Keys the job's checkpoint; a resumed job continues the earlier one's
+        self.run_id = resume or self.id
+        self.resume = resume is not None
+        self.status = STATUS_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.rounds = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._emit(STATUS_QUEUED, {"topic": topic, "content_type": content_type})
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None
+
+    def _emit(self, event: str, data: Dict[str, Any]) -> None:
+        with self._cond:
+            self.events.append({"id": len(self.events), "event": event, "data": data})
+            self._cond.notify_all()
+
+    def start(self) -> None:
+        self.status = STATUS_RUNNING
+        self.started_at = time.time()
+        self._emit("started", {"queued_s": round(self.started_at - self.created_at, 3)})
+
+    def message(self, message: Dict[str, Any]) -> None:
+        self.rounds = message["round"]
+        self._emit("message", message)
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        self.finished_at = time.time()
+        with self._cond:
+            self.result = result
+            self.status = result["status"]
+            self.events.append(
+                {
+                    "id": len(self.events),
+                    "event": "finished",
+                    "data": {"status": self.status, "rounds": result.get("rounds")},
+                }
+            )
+            self._cond.notify_all()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the job has finished or ``timeout`` passes."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.finished, timeout)
+
+    def events_since(
+        self, index: int, timeout: float
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Wait up to ``timeout`` for events after the first ``index``.
+
+        Returns:
+            The new events and whether the job has finished
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self.events) > index or self.finished, timeout
+            )
+            return self.events[index:], self.finished
+
+    def describe(self, position: Optional[int] = None) -> Dict[str, Any]:
+        status = {
+            "id": self.id,
+            "run_id": self.run_id,
+            "topic": self.topic,
+            "content_type": self.content_type,
+            "status": self.status,
+            "rounds": self.rounds,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if position is not None:
+            status["queue_position"] = position
+        return status
+
+
+class JobQueue:
+    """
+    Bounded FIFO of pipeline jobs served by a fixed pool of worker threads.
+
+    Every worker builds one pipeline (``session_factory``, by default a
+    silent PipelineSession) when it starts and reuses it for all of its
+    jobs. The latest ``retain_jobs`` finished jobs are kept for their
+    results; older ones are dropped.
+    """
+
+    def __init__(
+        self,
+        workers: int = SERVICE_WORKERS,
+        queue_size: int = SERVICE_QUEUE_SIZE,
+        retain_jobs: int = SERVICE_RETAIN_JOBS,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.workers = workers
+        self.retain_jobs = retain_jobs
+        self.session_factory = session_factory
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.submitted = 0
+        self.dequeued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy = 0
+        self.job_seconds: Optional[float] = None
+
+    def start(self) -> "JobQueue":
+        if self.session_factory is None:
+            from pipeline import PipelineSession
+
+            self.session_factory = lambda: PipelineSession(silent=True)
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"pipeline-worker-{number}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Let the workers finish the queued jobs, then stop them."""
+        # An event rather than a sentinel per worker: putting one into a
+        # full queue would block until a worker made room
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _retry_after(self) -> int:
+        # Roughly how long until a worker frees a queue slot
+        job_seconds = self.job_seconds or 1.0
+        return max(1, math.ceil(job_seconds / max(1, self.workers)))
+
+    def submit(
+        self, topic: str, content_type: str, resume: Optional[str] = None
+    ) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            topic: Subject of the content
+            content_type: One of main.CONTENT_TYPES
+            resume: ``run_id`` of an earlier job to continue from its checkpoint
+
+        Raises:
+            QueueFull: When ``queue_size`` jobs are already waiting
+        """
+        with self._lock:
+            job = Job(self.submitted, topic, content_type, resume)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFull(self._retry_after()) from None
+            self.submitted += 1
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def position(self, job: Job) -> Optional[int]:
+        """Jobs ahead of ``job`` in the queue (None once it has started)."""
+        if job.status != STATUS_QUEUED:
+            return None
+        # Jobs leave the FIFO in submission order
+        return job.number - self.dequeued
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "busy": self.busy,
+                "queued": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "job_s_mean": (
+                    round(self.job_seconds, 3) if self.job_seconds is not None else None
+                ),
+            }
+
+    def _work(self) -> None:
+        session = self.session_factory()
+        while True:
+            try:
+                job = self._queue.get(timeout=WORKER_POLL_SECONDS)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            with self._lock:
+                self.dequeued += 1
+                self.busy += 1
+            job.start()
+            try:
+                result = session.run(
+                    job.topic,
+                    job.content_type,
+                    resume=job.resume,
+                    on_message=job.message,
+                    run_id=job.run_id,
+                )
+            except Exception as e:
+                # run() records conversation errors itself; this is the rest
+                result = {
+                    "topic": job.topic,
+                    "content_type": job.content_type,
+                    "status": "error",
+                    "rounds": job.rounds,
+                    "error": str(e),
+                }
+            job.finish(result)
+            self._finished(job)
+
+    def _finished(self, job: Job) -> None:
+        with self._lock:
+            self.busy -= 1
+            self.completed += 1
+            seconds = job.finished_at - job.started_at
+            self.job_seconds = (
+                seconds
+                if self.job_seconds is None
+                else 0.2 * seconds + 0.8 * self.job_seconds
+            )
+            finished = [job_id for job_id, j in self._jobs.items() if j.finished]
+            for job_id in finished[: max(0, len(finished) - self.retain_jobs)]:
+                del self._jobs[job_id]
+
+
+class JobServer:
+    """Threaded HTTP front end for a JobQueue; see the module docstring."""
+
+    def __init__(
+        self, jobs: JobQueue, host: str = SERVICE_HOST, port: int = SERVICE_PORT
+    ):
+        self.jobs = jobs
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type:
+        jobs = self.jobs
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                if urlsplit(self.path).path.rstrip("/") != "/jobs":
+                    self._send(404, {"error": f"unknown path {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send(400, {"error": "body must be a JSON object"})
+                    return
+                if not isinstance(request, dict):
+                    self._send(400, {"error": "body must be a JSON object"})
+                    return
+                topic = request.get("topic")
+                content_type = request.get("content_type") or "technical_blog"
+                if not isinstance(topic, str) or not topic.strip():
+                    self._send(400, {"error": "topic is required"})
+                    return
+                if content_type not in CONTENT_TYPES:
+                    self._send(
+                        400,
+                        {"error": f"content_type must be one of {CONTENT_TYPES}"},
+                    )
+                    return
+                resume = request.get("resume") or None
+                if resume is not None and not isinstance(resume, str):
+                    self._send(
+                        400, {"error": "resume must be the run_id of an earlier job"}
+                    )
+                    return
+                try:
+                    job = jobs.submit(topic.strip(), content_type, resume)
+                except QueueFull as e:
+                    self._send(
+                        429, {"error": str(e)}, {"Retry-After": str(e.retry_after)}
+                    )
+                    return
+                self._send(
+                    202,
+                    job.describe(jobs.position(job)),
+                    {"Location": f"/jobs/{job.id}"},
+                )
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                parts = [part for part in url.path.split("/") if part]
+                if parts == ["health"]:
+                    self._send(200, jobs.stats())
+                    return
+                if parts and parts[0] == "artifacts":
+                    self._send_artifacts(parts[1:], parse_qs(url.query))
+                    return
+                if len(parts) not in (2, 3) or parts[0] != "jobs":
+                    self._send(404, {"error": f"unknown path {self.path}"})
+                    return
+                job = jobs.get(parts[1])
+                if job is None:
+                    self._send(404, {"error": f"unknown job {parts[1]}"})
+                    return
+                if len(parts) == 2:
+                    self._send(200, job.describe(jobs.position(job)))
+                elif parts[2] == "events":
+                    self._stream_events(job)
+                elif parts[2] == "result":
+                    self._send_result(job, parse_qs(url.query))
+                else:
+                    self._send(404, {"error": f"unknown path {self.path}"})
+
+            def _send_artifacts(
+                self, parts: List[str], query: Dict[str, List[str]]
+            ) -> None:
+                if ARTIFACT_STORE is None:
+                    self._send(404, {"error": "artifacts are disabled"})
+                    return
+                if len(parts) == 1:
+                    artifact = ARTIFACT_STORE.get(
+                        parts[0], research=query.get("research", ["0"])[0] == "1"
+                    )
+                    if artifact is None:
+                        self._send(404, {"error": f"unknown artifact {parts[0]}"})
+                    else:
+                        self._send(200, artifact)
+                    return
+                if parts:
+                    self._send(404, {"error": f"unknown path {self.path}"})
+                    return
+                try:
+                    limit = int(query.get("limit", ["20"])[0])
+                except ValueError:
+                    self._send(400, {"error": "limit must be an integer"})
+                    return
+                filters = {
+                    name: query[name][0]
+                    for name in ("topic", "content_type", "since", "until")
+                    if name in query
+                }
+                self._send(
+                    200, {"artifacts": ARTIFACT_STORE.find(limit=limit, **filters)}
+                )
+
+            def _send_result(self, job: Job, query: Dict[str, List[str]]) -> None:
+                try:
+                    wait = float(query.get("wait", ["0"])[0])
+                except ValueError:
+                    self._send(400, {"error": "wait must be a number of seconds"})
+                    return
+                if not job.wait(min(max(0.0, wait), MAX_WAIT_SECONDS)):
+                    self._send(409, job.describe(jobs.position(job)))
+                    return
+                self._send(200, {"id": job.id, **job.result})
+
+            def _stream_events(self, job: Job) -> None:
+                # Server-sent events; a reconnecting client's Last-Event-ID
+                # resumes after the last event it saw
+                try:
+                    index = int(self.headers.get("Last-Event-ID", -1)) + 1
+                except ValueError:
+                    index = 0
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    while True:
+                        events, finished = job.events_since(index, KEEPALIVE_SECONDS)
+                        if not events and not finished:
+                            self.wfile.write(b": keep-alive\n\n")
+                        for event in events:
+                            self._event(event)
+                            index = event["id"] + 1
+                        self.wfile.flush()
+                        if finished and index >= len(job.events):
+                            return
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+
+            def _event(self, event: Dict[str, Any]) -> None:
+                data = json.dumps(event["data"], ensure_ascii=False, default=str)
+                self.wfile.write(
+                    f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n".encode(
+                        "utf-8"
+                    )
+                )
+
+            def _send(
+                self,
+                status: int,
+                body: Dict[str, Any],
+                headers: Optional[Dict[str, str]] = None,
+            ) -> None:
+                payload = json.dumps(body, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "JobServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "JobServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve the content pipeline as an HTTP job service."
+    )
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=SERVICE_WORKERS,
+        help=f"Pipelines running jobs at once (default: {SERVICE_WORKERS})",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=SERVICE_QUEUE_SIZE,
+        help=f"Jobs waiting before submissions get 429 (default: {SERVICE_QUEUE_SIZE})",
+    )
+    args = parser.parse_args()
+
+    jobs = JobQueue(workers=max(1, args.workers), queue_size=max(1, args.queue_size))
+    server = JobServer(jobs, host=args.host, port=args.port)
+    jobs.start()
+    print(
+        f"Content pipeline service on {server.base_url} "
+        f"({jobs.workers} workers, queue of {args.queue_size})"
+    )
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        stats = jobs.stats()
+        if stats["busy"] or stats["queued"]:
+            print(
+                f"Finishing {stats['busy']} running and {stats['queued']} queued "
+                "jobs (interrupt again to abandon them)"
+            )
+        jobs.stop()
+
+
+if __name__ == "__main__":
+    main()
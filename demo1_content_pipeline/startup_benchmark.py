@@ -0,0 +1,154 @@
+"""Import-time benchmark for the pipeline's entry points.
+
+Imports each entry-point module in a fresh interpreter with
+``python -X importtime`` and reports the median cumulative import time over
+--repeat runs. It also lists which heavy dependencies (AutoGen, openai,
+...) each import dragged in. The entry points used by short-lived workers
+and setup checks are expected to load none of them and to stay under
+--max-ms. pipeline.py, which legitimately loads everything, is reported for
+comparison but not checked.
+
+Exits with status 1 when a checked module exceeds the budget or imports a
+heavy dependency, so startup regressions fail CI.
+
+Usage:
+    python demo1_content_pipeline/startup_benchmark.py
+    python demo1_content_pipeline/startup_benchmark.py --repeat 9 --max-ms 150
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+# Modules that must import without loading the heavy dependencies
+CHECKED_MODULES = ["main", "batch", "config", "test_setup", "agents", "tools"]
+REFERENCE_MODULES = ["pipeline"]
+
+HEAVY_DEPENDENCIES = ["autogen", "openai", "flaml", "httpx", "httpx2", "tiktoken"]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_PROBE = (
+    "import json, sys\n"
+    "import {module}\n"
+    "print(json.dumps([m for m in {heavy!r} if m in sys.modules]))\n"
+)
+
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """
+    Import ``module`` in a fresh interpreter.
+
+    Returns:
+        The module's cumulative import time in milliseconds and the heavy
+        dependencies loaded by importing it
+    """
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _PROBE.format(module=module, heavy=HEAVY_DEPENDENCIES),
+        ],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:  self [us] | cumulative | name", with
+    # nested imports indented under the name column
+    cumulative_us = None
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2] == f" {module}":
+            cumulative_us = int(fields[1])
+    if cumulative_us is None:
+        raise RuntimeError(f"no import time reported for {module}")
+    return {
+        "ms": cumulative_us / 1000,
+        "heavy": json.loads(completed.stdout.strip().splitlines()[-1]),
+    }
+
+
+def benchmark(modules: List[str], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for module in modules:
+        runs = [measure_import(module) for _ in range(max(1, repeat))]
+        rows.append(
+            {
+                "module": module,
+                "median_ms": statistics.median(run["ms"] for run in runs),
+                "max_ms": max(run["ms"] for run in runs),
+                "heavy": sorted({name for run in runs for name in run["heavy"]}),
+            }
+        )
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'module':<16}{'median ms':>11}{'max ms':>10}  heavy dependencies"
+    print(header)
+    print("─" * len(header))
+    for row in rows:
+        print(
+            f"{row['module']:<16}{row['median_ms']:>11.1f}{row['max_ms']:>10.1f}"
+            f"  {', '.join(row['heavy']) or '-'}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of the pipeline's entry points."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Fresh imports per module"
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=300.0,
+        help="Budget for each checked module's median import time (default: 300)",
+    )
+    parser.add_argument(
+        "--module",
+        action="append",
+        default=[],
+        help="Check this module instead of the default entry points (repeatable)",
+    )
+    parser.add_argument("--json", help="Also write the per-module rows to this file")
+    args = parser.parse_args(argv)
+
+    checked = args.module or CHECKED_MODULES
+    reference = [module for module in REFERENCE_MODULES if module not in checked]
+    rows = benchmark(checked + reference, args.repeat)
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+    problems = []
+    for row in rows:
+        if row["module"] not in checked:
+            continue
+        if row["heavy"]:
+            problems.append(f"{row['module']} imports {', '.join(row['heavy'])}")
+        if row["median_ms"] > args.max_ms:
+            problems.append(
+                f"{row['module']} takes {row['median_ms']:.1f}ms to import "
+                f"(--max-ms {args.max_ms:g})"
+            )
+    if problems:
+        print("\nStartup regressed:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Token-level streaming of agent completions to pluggable sinks.
+
+AutoGen 0.2 streams only by printing deltas to the current IOStream, and
+then estimates the usage with tiktoken, which needs a network download.
+Instead, each attached agent's OpenAI clients are asked for a stream
+directly, with ``include_usage`` so the provider's own token counts
+(prefix-cached tokens included) come with the last chunk. Content deltas go
+to the configured sinks (terminal, file, callback) as they arrive, the
+agent's time to first token is recorded, and the chunks are assembled into
+the ChatCompletion AutoGen expects.
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from autogen import ConversableAgent, OpenAIWrapper
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage
+from termcolor import colored
+
+
+class ConsoleSink:
+    """Print tokens to the terminal as they arrive."""
+
+    def on_start(self, agent: str) -> None:
+        print(colored(f"\n{agent} (streaming):", "cyan", attrs=["bold"]), flush=True)
+
+    def on_token(self, agent: str, text: str) -> None:
+        print(text, end="", flush=True)
+
+    def on_end(self, agent: str) -> None:
+        print(flush=True)
+
+
+class FileSink:
+    """Append streamed tokens to a text file, one section per completion."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _write(self, text: str) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def on_start(self, agent: str) -> None:
+        self._write(f"\n--- {agent} ---\n")
+
+    def on_token(self, agent: str, text: str) -> None:
+        self._write(text)
+
+    def on_end(self, agent: str) -> None:
+        self._write("\n")
+
+
+class CallbackSink:
+    """Call ``callback(agent, text)`` for every streamed token."""
+
+    def __init__(self, callback: Callable[[str, str], None]):
+        self.callback = callback
+
+    def on_start(self, agent: str) -> None:
+        pass
+
+    def on_token(self, agent: str, text: str) -> None:
+        self.callback(agent, text)
+
+    def on_end(self, agent: str) -> None:
+        pass
+
+
+class _StreamedCompletion:
+    """Forwards one completion's content deltas to the sinks."""
+
+    def __init__(self, agent: str, sinks: List[Any]):
+        self.agent = agent
+        self.sinks = sinks
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    def token(self, text: str) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            for sink in self.sinks:
+                sink.on_start(self.agent)
+        for sink in self.sinks:
+            sink.on_token(self.agent, text)
+
+    def close(self) -> None:
+        if self.first_token_at is not None:
+            for sink in self.sinks:
+                sink.on_end(self.agent)
+
+
+def stream_chat_completion(
+    oai_client: Any, params: Dict[str, Any], on_token: Callable[[str], None]
+) -> ChatCompletion:
+    """
+    Request ``params`` as a stream and assemble the chunks.
+
+    Args:
+        oai_client: An ``openai.OpenAI`` client
+        params: Chat completion parameters, as AutoGen builds them
+        on_token: Called with every content delta of the first choice (with
+            ``n`` > 1 the other choices are assembled but not streamed)
+
+    Returns:
+        The completion, with the usage the provider reported (estimated
+        at four characters per token if it reported none)
+    """
+    n = params.get("n") or 1
+    contents = [""] * n
+    finish_reasons = ["stop"] * n
+    # One accumulator per choice; chunks of different choices interleave
+    function_calls: List[Any] = [None] * n
+    tool_calls: List[Optional[List[Any]]] = [None] * n
+    usage = None
+    deltas = 0
+    chunk = None
+    for chunk in oai_client.chat.completions.create(
+        **{**params, "stream": True, "stream_options": {"include_usage": True}}
+    ):
+        if chunk.usage is not None:
+            usage = chunk.usage
+        for choice in chunk.choices:
+            i, delta = choice.index, choice.delta
+            if choice.finish_reason:
+                finish_reasons[i] = choice.finish_reason
+            if getattr(delta, "function_call", None):
+                function_calls[i], deltas = (
+                    OpenAIWrapper._update_function_call_from_chunk(
+                        delta.function_call, function_calls[i], deltas
+                    )
+                )
+            for call in delta.tool_calls or []:
+                calls = tool_calls[i] = tool_calls[i] or []
+                calls += [None] * (call.index + 1 - len(calls))
+                calls[call.index], deltas = OpenAIWrapper._update_tool_calls_from_chunk(
+                    call, calls[call.index], deltas
+                )
+            if delta.content:
+                if i == 0:
+                    on_token(delta.content)
+                contents[i] += delta.content
+                deltas += 1
+    if chunk is None:
+        raise RuntimeError("the streamed completion returned no chunks")
+    if usage is None:
+        prompt_tokens = len(json.dumps(params["messages"], default=str)) // 4
+        completion_tokens = sum(len(content) for content in contents) // 4 or deltas
+        usage = CompletionUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+    return ChatCompletion(
+        id=chunk.id,
+        model=chunk.model,
+        created=chunk.created,
+        object="chat.completion",
+        choices=[
+            Choice(
+                index=i,
+                finish_reason=finish_reasons[i],
+                message=ChatCompletionMessage(
+                    role="assistant",
+                    content=contents[i],
+                    function_call=function_calls[i],
+                    tool_calls=tool_calls[i],
+                ),
+                logprobs=None,
+            )
+            for i in range(n)
+        ],
+        usage=usage,
+    )
+
+
+class TokenStreamer:
+    """
+    Streams completions of the agents it is attached to.
+
+    One instance is shared by all pipelines; time-to-first-token is
+    collected per agent across them.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None):
+        self.sinks = list(sinks or [])
+        self._lock = threading.Lock()
+        self._ttft: Dict[str, List[float]] = defaultdict(list)
+
+    def add_sink(self, sink: Any) -> None:
+        self.sinks.append(sink)
+
+    def attach(
+        self,
+        agent: ConversableAgent,
+        console: bool = True,
+        clients: Optional[List[Any]] = None,
+    ) -> None:
+        """
+        Stream ``agent``'s chat completions and route their tokens.
+
+        Args:
+            agent: Agent with an LLM client
+            console: Also echo tokens to the terminal
+            clients: Further OpenAIWrappers the agent's completions go
+                through, such as the ones ModelRouter.attach returns
+        """
+        client = getattr(agent, "client", None)
+        if client is None:
+            return
+        console_sinks = [ConsoleSink()] if console else []
+        model_clients = [
+            model_client
+            for wrapper in [client, *(clients or [])]
+            for model_client in wrapper._clients
+        ]
+        for model_client in model_clients:
+            oai_client = getattr(model_client, "_oai_client", None)
+            if oai_client is None:
+                # Custom model clients keep their own create
+                continue
+            create = model_client.create
+
+            @functools.wraps(create)
+            def streamed_create(
+                params: Dict[str, Any],
+                create: Any = create,
+                oai_client: Any = oai_client,
+            ) -> Any:
+                if "messages" not in params:
+                    return create(params)
+                stream = _StreamedCompletion(agent.name, self.sinks + console_sinks)
+                try:
+                    return stream_chat_completion(oai_client, params, stream.token)
+                finally:
+                    stream.close()
+                    if stream.first_token_at is not None:
+                        self._record(agent.name, stream.first_token_at - stream.started)
+
+            model_client.create = streamed_create
+
+    def _record(self, agent: str, seconds: float) -> None:
+        with self._lock:
+            self._ttft[agent].append(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return time-to-first-token per agent.
+
+        Returns:
+            Mapping of agent name to streamed completion count, mean and max
+            seconds until the first token arrived
+        """
+        with self._lock:
+            snapshot = {agent: list(values) for agent, values in self._ttft.items()}
+        return {
+            agent: {
+                "count": len(values),
+                "mean_s": sum(values) / len(values),
+                "max_s": max(values),
+            }
+            for agent, values in snapshot.items()
+        }
@@ -3,22 +3,36 @@ Quick setup test for Demo 1
 Run this to verify everything is configured correctly.
 """
 
+import importlib.util
 import sys
 import os
+import warnings
 
 
 def test_imports():
     """Test that all required packages are installed."""
     print("Testing imports...")
 
+    # Imported here rather than at module level, so importing this file
+    # stays within the startup gate (see startup_benchmark.py)
     try:
-        import autogen
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning, module="flaml")
+            import autogen
 
-        print("  ✓ autogen")
+        print(f"  ✓ autogen {autogen.__version__}")
     except ImportError:
         print("  ✗ autogen - Run: poetry install")
         return False
 
+    try:
+        import openai
+
+        print(f"  ✓ openai {openai.__version__}")
+    except ImportError:
+        print("  ✗ openai - Run: poetry install")
+        return False
+
     try:
         from dotenv import load_dotenv
 
@@ -100,14 +114,18 @@ def test_agents():
     print("\nTesting agent creation...")
 
     try:
-        from agents import (
-            create_planner_agent,
-            create_researcher_agent,
-            create_writer_agent,
-            create_critic_agent,
-        )
-
-        print("  ✓ Agent modules imported")
+        import agents
+
+        missing = [
+            name
+            for name, module in agents._FACTORY_MODULES.items()
+            if importlib.util.find_spec(module, "agents") is None
+        ]
+        if missing:
+            print(f"  ✗ Missing agent modules for: {', '.join(missing)}")
+            return False
+
+        print("  ✓ Agent modules found")
 
         # Note: We don't actually create agents here as that would require valid API config
         print("  ✓ Agent creation functions available")
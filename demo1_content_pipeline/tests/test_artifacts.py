@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from artifacts import ArtifactStore
+from pipeline import extract_approved_content
+from routing import APPROVAL_SIGNAL
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_put_and_get(store):
+    key = store.put(
+        "Python asyncio basics",
+        "technical_blog",
+        "# Asyncio\n\nBody",
+        research=[{"topic": "python_asyncio"}],
+        metadata={"status": "approved"},
+    )
+    artifact = store.get(key, research=True)
+    assert artifact["text"] == "# Asyncio\n\nBody"
+    assert artifact["research_payloads"] == [{"topic": "python_asyncio"}]
+    assert artifact["metadata"] == {"status": "approved"}
+    assert "research_payloads" not in store.get(key)
+
+
+def test_identical_content_is_stored_once(store, tmp_path):
+    first = store.put("t", "tutorial", "same text")
+    second = store.put("t", "tutorial", "same text")
+    assert first != second
+    assert store.get(first)["content"] == store.get(second)["content"]
+    blobs = [
+        name
+        for _, _, files in os.walk(os.path.join(str(tmp_path), "objects"))
+        for name in files
+    ]
+    # one content blob, one research blob, two manifests
+    assert len(blobs) == 4
+
+
+def test_find_and_latest(store):
+    store.put("a", "tutorial", "old")
+    newest = store.put("a", "tutorial", "new")
+    store.put("b", "technical_blog", "other")
+
+    assert [entry["topic"] for entry in store.find(topic="a")] == ["a", "a"]
+    assert len(store.find(content_type="technical_blog")) == 1
+    assert store.find(since="2999-01-01") == []
+    assert store.latest("a", "tutorial")["key"] == newest
+    assert store.latest("c", "tutorial") is None
+
+
+def test_unknown_or_malformed_keys(store):
+    assert store.get("0" * 64) is None
+    assert store.get("../../etc/passwd") is None
+
+
+def test_only_the_critic_approves_a_draft():
+    messages = [
+        {"name": "Writer", "content": "draft 1"},
+        {"name": "Critic", "content": APPROVAL_SIGNAL},
+        {"name": "Writer", "content": f"draft 2, quoting {APPROVAL_SIGNAL}"},
+    ]
+    assert extract_approved_content(messages) == "draft 1"
+    assert extract_approved_content(messages[2:]) is None
@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from budget import BudgetGovernor
+
+
+def response(prompt_tokens, completion_tokens, cost, cached=False):
+    response = SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        ),
+        cost=cost,
+    )
+    if cached:
+        response.from_completion_cache = True
+    return response
+
+
+def test_cache_hits_are_free():
+    governor = BudgetGovernor(max_tokens=100)
+    governor.record(response(60, 20, 0.01))
+    governor.record(response(60, 20, 0.01, cached=True))
+
+    usage = governor.usage()
+    assert usage["prompt_tokens"] == 60
+    assert usage["completion_tokens"] == 20
+    assert usage["cost_usd"] == 0.01
+    assert usage["cache_hits"] == 1
+    assert governor.check() is None
@@ -0,0 +1,91 @@
+import logging
+import os
+import threading
+
+import pytest
+from autogen import ConversableAgent, GroupChat, GroupChatManager
+
+from checkpoint import CheckpointStore
+
+TOPIC = "Python asyncio basics"
+MESSAGES = [
+    {"role": "user", "name": "User", "content": "Write a blog post"},
+    {"role": "user", "name": "Planner", "content": "Plan: ..."},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path))
+
+
+def test_save_then_load(store):
+    assert store.load(TOPIC, "technical_blog") is None
+
+    store.save(TOPIC, "technical_blog", MESSAGES)
+    checkpoint = store.load(TOPIC, "technical_blog")
+    assert checkpoint["messages"] == MESSAGES
+    assert checkpoint["round"] == 2
+    assert checkpoint["last_speaker"] == "Planner"
+    assert store.load(TOPIC, "tutorial") is None
+
+
+def test_clear(store):
+    store.save(TOPIC, "technical_blog", MESSAGES)
+    store.clear(TOPIC, "technical_blog")
+    assert store.load(TOPIC, "technical_blog") is None
+    store.clear(TOPIC, "technical_blog")
+
+
+def test_unreadable_checkpoint_is_ignored(store):
+    store.save(TOPIC, "technical_blog", MESSAGES)
+    with open(store.path(TOPIC, "technical_blog"), "w") as f:
+        f.write("{not json")
+    assert store.load(TOPIC, "technical_blog") is None
+
+
+def test_run_ids_keep_separate_checkpoints(store):
+    store.save(TOPIC, "technical_blog", MESSAGES, run_id="a")
+    store.save(TOPIC, "technical_blog", MESSAGES[:1], run_id="b")
+
+    assert store.load(TOPIC, "technical_blog", "a")["round"] == 2
+    assert store.load(TOPIC, "technical_blog", "b")["run_id"] == "b"
+    assert store.load(TOPIC, "technical_blog") is None
+
+
+def test_concurrent_saves_leave_a_whole_checkpoint(store, tmp_path):
+    history = [dict(MESSAGES[0], content="x" * 100_000)] * 20
+    threads = [
+        threading.Thread(
+            target=store.save, args=(TOPIC, "technical_blog", history[: n + 1])
+        )
+        for n in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.load(TOPIC, "technical_blog") is not None
+    assert os.listdir(tmp_path) == [
+        os.path.basename(store.path(TOPIC, "technical_blog"))
+    ]
+
+
+def test_failed_save_is_logged_and_the_chat_goes_on(tmp_path, caplog):
+    # A file where the checkpoint directory should be makes every save fail
+    blocked = tmp_path / "blocked"
+    blocked.write_text("")
+    store = CheckpointStore(str(blocked))
+    agents = [
+        ConversableAgent(name, llm_config=False, human_input_mode="NEVER")
+        for name in ("Planner", "Writer")
+    ]
+    manager = GroupChatManager(GroupChat(agents=agents, messages=[]), llm_config=False)
+    store.attach(manager, TOPIC, "technical_blog", run_id="job-1")
+
+    with caplog.at_level(logging.WARNING, logger="checkpoint"):
+        manager.groupchat.append(MESSAGES[1], agents[0])
+
+    assert len(manager.groupchat.messages) == 1
+    assert "Could not checkpoint round 1" in caplog.text
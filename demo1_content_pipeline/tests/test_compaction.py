@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+from compaction import TokenBudget
+
+
+def message(content, **extra):
+    return {"role": "user", "content": content, **extra}
+
+
+def test_short_history_is_untouched():
+    messages = [message("task"), message("reply")]
+    assert TokenBudget(1).apply_transform(messages) == messages
+
+
+def test_drops_oldest_messages_and_keeps_the_task():
+    messages = [message("task")] + [message("word " * 50) for _ in range(5)]
+    kept = TokenBudget(120).apply_transform(messages)
+    assert kept[0] is messages[0]
+    assert kept[-1] is messages[-1]
+    assert 1 < len(kept) < len(messages)
+    assert kept[1:] == messages[len(messages) - len(kept) + 1 :]
+
+
+def test_keeps_latest_message_even_over_budget():
+    messages = [message("task"), message("old"), message("word " * 500)]
+    assert TokenBudget(10).apply_transform(messages) == [messages[0], messages[-1]]
+
+
+def test_history_within_budget_is_kept_whole():
+    messages = [message("task"), message("a"), message("b")]
+    assert TokenBudget(1000).apply_transform(messages) == messages
+
+
+def tool_call(call_id):
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{"id": call_id, "type": "function", "function": {}}],
+    }
+
+
+def tool_result(call_id, content):
+    return {"role": "tool", "tool_call_id": call_id, "content": content}
+
+
+def test_tool_result_is_never_kept_without_its_call():
+    messages = [
+        message("task"),
+        message("word " * 50),
+        tool_call("a"),
+        tool_result("a", "word " * 100),
+    ]
+    kept = TokenBudget(20).apply_transform(messages)
+    assert kept == [messages[0], messages[2], messages[3]]
+
+
+def test_call_and_all_its_results_are_dropped_together():
+    messages = [
+        message("task"),
+        tool_call("a"),
+        tool_result("a", "word " * 40),
+        tool_result("a", "word " * 40),
+        message("word " * 20),
+    ]
+    kept = TokenBudget(70).apply_transform(messages)
+    assert kept == [messages[0], messages[-1]]
+
+
+def test_orphaned_tool_result_is_dropped():
+    messages = [message("task"), tool_result("a", "result"), message("next")]
+    assert TokenBudget(1000).apply_transform(messages) == [messages[0], messages[2]]
+
+
+def test_import_leaves_no_disk_cache_behind(tmp_path):
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run(
+        [sys.executable, "-c", "import compaction"],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": package_dir},
+        check=True,
+    )
+    assert not (tmp_path / ".cache").exists()
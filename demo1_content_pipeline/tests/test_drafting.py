@@ -0,0 +1,26 @@
+from drafting import parse_judgement
+
+DRAFTS = ["first draft", "second draft"]
+
+
+def test_picks_numbered_draft_with_review():
+    text = "BEST: 2\nREVIEW: Solid. APPROVED"
+    assert parse_judgement(text, DRAFTS) == ("second draft", "Solid. APPROVED", False)
+
+
+def test_merged_draft_wins_over_choice():
+    text = "BEST: 1\nMERGED: combined draft\nREVIEW: Needs examples."
+    assert parse_judgement(text, DRAFTS) == ("combined draft", "Needs examples.", True)
+
+
+def test_out_of_range_choice_falls_back_without_review():
+    assert parse_judgement("BEST: 3\nREVIEW: ok", DRAFTS) == (
+        "first draft",
+        None,
+        False,
+    )
+    assert parse_judgement("no verdict", DRAFTS) == ("first draft", None, False)
+
+
+def test_missing_review_section():
+    assert parse_judgement("best: 1", DRAFTS) == ("first draft", None, False)
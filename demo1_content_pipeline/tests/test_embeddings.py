@@ -0,0 +1,82 @@
+import sys
+import threading
+
+import numpy as np
+
+from tools.embeddings import VectorIndex, hybrid_rank
+
+
+def test_hybrid_rank_blends_normalized_scores():
+    ranked = hybrid_rank(
+        keyword=[("a", 4.0), ("b", 2.0)],
+        semantic=[("a", 0.2), ("b", 0.9)],
+        weight=0.5,
+        min_similarity=0.5,
+        top_k=5,
+    )
+    scores = dict(ranked)
+    assert scores["a"] == 0.5 * 1.0 + 0.5 * 0.2
+    assert scores["b"] == 0.5 * 0.5 + 0.5 * 0.9
+    assert [doc_id for doc_id, _ in ranked] == ["b", "a"]
+
+
+def test_hybrid_rank_keeps_semantic_only_matches_above_threshold():
+    ranked = hybrid_rank(
+        keyword=[],
+        semantic=[("near", 0.8), ("far", 0.1)],
+        weight=0.6,
+        min_similarity=0.3,
+        top_k=5,
+    )
+    assert [doc_id for doc_id, _ in ranked] == ["near"]
+
+
+def test_hybrid_rank_truncates_to_top_k():
+    ranked = hybrid_rank(
+        keyword=[("a", 3.0), ("b", 2.0), ("c", 1.0)],
+        semantic=[],
+        weight=0.5,
+        min_similarity=0.3,
+        top_k=2,
+    )
+    assert [doc_id for doc_id, _ in ranked] == ["a", "b"]
+
+
+def test_searches_during_updates_only_see_whole_documents():
+    axes = np.eye(4, dtype=np.float32)
+    index = VectorIndex(dim=4, capacity=2)
+    index.add("a", axes[0])
+    stop = threading.Event()
+    seen, errors = [], []
+
+    def search():
+        while not stop.is_set():
+            try:
+                seen.append(index.search(axes[:2], top_k=8))
+            except Exception as e:
+                errors.append(e)
+
+    searcher = threading.Thread(target=search)
+    # Switch threads often so searches interleave with the writes
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    searcher.start()
+    try:
+        for n in range(3000):
+            index.add("b", axes[1])
+            index.add(f"doc-{n}", axes[2])
+            index.remove("b")
+            index.remove(f"doc-{n - 1}")
+    finally:
+        stop.set()
+        searcher.join()
+        sys.setswitchinterval(interval)
+
+    # The queries lie on the axes of "a" and "b"; every other document is
+    # orthogonal to both, whatever row it was moved to
+    assert seen and not errors
+    for by_axis in seen:
+        for axis, results in enumerate(by_axis):
+            for doc_id, score in results:
+                expected = {"a": 0, "b": 1}.get(doc_id)
+                assert score == (1.0 if expected == axis else 0.0), doc_id
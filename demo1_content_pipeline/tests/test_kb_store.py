@@ -0,0 +1,26 @@
+import pytest
+
+from tools.kb_store import InMemoryKnowledgeStore, KnowledgeStore
+
+ENTRIES = {
+    "python_asyncio": {
+        "title": "Python asyncio",
+        "key_points": ["The event loop runs coroutines", "await yields control"],
+    },
+    "docker_basics": {
+        "title": "Docker basics",
+        "key_points": ["Images are built from a Dockerfile"],
+    },
+}
+
+
+def test_knowledge_store_is_abstract():
+    with pytest.raises(TypeError):
+        KnowledgeStore()
+
+
+def test_in_memory_store_search_modes():
+    for mode in ("keyword", "semantic", "hybrid"):
+        store = InMemoryKnowledgeStore(dict(ENTRIES), search_mode=mode)
+        assert store.search("asyncio event loop", 1)[0][0] == "python_asyncio"
+        assert "docker_basics" in store
@@ -0,0 +1,45 @@
+import json
+import pickle
+from types import SimpleNamespace
+
+from llm_cache import CompletionCache, from_cache
+
+REQUEST = json.dumps(
+    {"model": "gpt-4", "messages": [{"role": "user", "content": "hi"}]},
+    sort_keys=True,
+)
+
+
+def test_cache_hits_are_marked_as_such(tmp_path):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite"))
+    response = SimpleNamespace(text="hello")
+    cache.set(REQUEST, response)
+
+    hit = cache.get(REQUEST, agent="Writer")
+
+    assert hit.text == "hello" and from_cache(hit)
+    assert not from_cache(response)
+    assert cache.get("other", agent="Writer") is None
+    assert cache.stats()["Writer"]["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(tmp_path):
+    path = str(tmp_path / "completions.sqlite")
+    value = SimpleNamespace(text="x" * 1000)
+    entry_size = len(pickle.dumps(value))
+    cache = CompletionCache(path, max_bytes=3 * entry_size)
+    for key in ("a", "b", "c"):
+        cache.set(key, value)
+    cache.set("a", value)  # replacing an entry does not add to the size
+    cache.get("b")
+
+    cache.set("d", value)
+
+    assert cache.get("c") is None
+    assert all(cache.get(key) is not None for key in ("a", "b", "d"))
+    cache.close()
+
+    # A new instance starts from the size already stored
+    reopened = CompletionCache(path, max_bytes=3 * entry_size)
+    reopened.set("e", value)
+    assert [key for key in "abde" if reopened.get(key) is not None] == ["b", "d", "e"]
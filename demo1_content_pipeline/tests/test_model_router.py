@@ -0,0 +1,23 @@
+from model_router import ModelRouter
+
+
+def test_healthy_models_are_tried_fastest_first():
+    router = ModelRouter()
+    models = ["big", "small", "new"]
+    router._model_health("big").success(2.0)
+    router._model_health("small").success(0.5)
+
+    # An unmeasured model goes first once, to get a measurement
+    assert router.order(models) == [2, 1, 0]
+    router._model_health("new").success(1.0)
+    assert router.order(models) == [1, 2, 0]
+
+
+def test_failing_models_go_last_and_order_can_stay_as_listed():
+    router = ModelRouter(max_error_rate=0.2, rank_by_latency=False)
+    models = ["big", "small", "backup"]
+    router._model_health("big").success(2.0)
+    router._model_health("small").success(0.5)
+    router._model_health("small").failure()
+
+    assert router.order(models) == [0, 2, 1]
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from offload import run_blocking, use_executor
+
+
+def thread_name():
+    return threading.current_thread().name
+
+
+def test_run_blocking_uses_the_context_executor_only_inside_the_block():
+    async def main():
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dedicated")
+        try:
+            with use_executor(executor):
+                inside = await asyncio.gather(
+                    run_blocking(thread_name), asyncio.create_task(_nested())
+                )
+            outside = await run_blocking(thread_name)
+        finally:
+            executor.shutdown()
+        return inside, outside
+
+    async def _nested():
+        return await run_blocking(thread_name)
+
+    inside, outside = asyncio.run(main())
+    assert all(name.startswith("dedicated") for name in inside)
+    assert not outside.startswith("dedicated")
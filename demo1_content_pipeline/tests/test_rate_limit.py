@@ -0,0 +1,77 @@
+import threading
+
+from rate_limit import RateLimiter, TokenBucket
+
+
+def test_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    now = bucket.updated
+    assert bucket.wait_time(2, now) == 0.0
+    bucket.take(2)
+    assert bucket.wait_time(1, now) == 1.0
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_oversized_request_waits_for_full_bucket_then_leaves_debt():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    now = bucket.updated
+    assert bucket.wait_time(10, now) == 0.0
+    bucket.take(10)
+    assert bucket.level == -8
+    bucket.give(100)
+    assert bucket.level == 2
+
+
+def test_success_grows_and_429_cuts_the_limit():
+    limiter = RateLimiter(max_concurrency=8, min_concurrency=2)
+    limiter.limit = 4.0
+    limiter.release(limiter.acquire(10), 200)
+    assert limiter.limit == 4.25
+
+    ticket = limiter.acquire(10)
+    ticket["sent_at"] -= 1.0
+    limiter.release(ticket, 429)
+    assert limiter.limit == 2.125
+    assert limiter.stats()["throttled"] == 1
+
+    limiter.limit = 2.0
+    ticket = limiter.acquire(10)
+    ticket["sent_at"] -= 1.0
+    limiter._last_cut = 0.0
+    limiter.release(ticket, 429)
+    assert limiter.limit == 2.0
+
+
+def test_slow_responses_cut_the_limit():
+    limiter = RateLimiter(max_concurrency=10, target_latency_s=0.5)
+    ticket = limiter.acquire(1)
+    ticket["sent_at"] -= 1.0
+    limiter.release(ticket, 200)
+    assert limiter.limit == 9.0
+
+
+def test_release_settles_token_estimate():
+    limiter = RateLimiter(tokens_per_minute=6000)
+    ticket = limiter.acquire(100)
+    assert limiter.tokens.level == 500
+    limiter.release(ticket, 200, used_tokens=300)
+    assert limiter.tokens.level <= 301
+
+
+def test_acquire_blocks_at_the_concurrency_limit():
+    limiter = RateLimiter(max_concurrency=1)
+    ticket = limiter.acquire(1)
+    admitted = threading.Event()
+
+    def second():
+        limiter.release(limiter.acquire(1), 200)
+        admitted.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not admitted.wait(0.1)
+    assert limiter.stats()["queued"] == 1
+    limiter.release(ticket, 200)
+    assert admitted.wait(5)
+    thread.join()
+    assert limiter.stats()["in_flight"] == 0
@@ -0,0 +1,56 @@
+from tools.retrieval import BM25Index, tokenize
+
+ENTRIES = {
+    "python_asyncio": {
+        "title": "Python asyncio",
+        "key_points": ["The event loop runs coroutines", "await yields control"],
+    },
+    "docker_basics": {
+        "title": "Docker basics",
+        "key_points": ["Images are built from a Dockerfile"],
+    },
+    "rest_api_design": {
+        "title": "REST API design",
+        "key_points": ["Use nouns for resources", "Return proper status codes"],
+    },
+}
+
+
+def build_index():
+    index = BM25Index()
+    for doc_id, entry in ENTRIES.items():
+        index.add(doc_id, entry)
+    return index
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("How to use the Event-Loop?") == ["use", "event", "loop"]
+
+
+def test_search_ranks_matching_document_first():
+    results = build_index().search("asyncio event loop")
+    assert results[0][0] == "python_asyncio"
+    assert all(doc_id != "docker_basics" for doc_id, _ in results)
+
+
+def test_search_by_entry_key():
+    assert build_index().search("rest_api_design")[0][0] == "rest_api_design"
+
+
+def test_search_without_match_is_empty():
+    assert build_index().search("kubernetes") == []
+    assert BM25Index().search("asyncio") == []
+
+
+def test_add_replaces_and_remove_forgets():
+    index = build_index()
+    index.add("docker_basics", {"title": "Container images"})
+    assert len(index) == 3
+    assert index.search("dockerfile") == []
+    assert index.search("container")[0][0] == "docker_basics"
+
+    index.remove("docker_basics")
+    assert "docker_basics" not in index
+    assert index.search("container") == []
+    index.remove("docker_basics")
+    assert len(index) == 2
@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+
+import pytest
+from autogen import ConversableAgent, GroupChat
+
+from budget import BudgetGovernor
+from mock_server import MockLLMServer
+from model_router import ModelRouter
+from routing import select_with_manager_client
+
+
+class ScriptedClient:
+    """Answers each create() with the next scripted reply and records prompts."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def create(self, **config):
+        self.prompts.append(config["messages"])
+        return SimpleNamespace(text=self.replies.pop(0))
+
+    def extract_text_or_completion_object(self, response):
+        return [response.text]
+
+
+def build_group_chat():
+    agents = [
+        ConversableAgent(name, llm_config=False, human_input_mode="NEVER")
+        for name in ("Planner", "Writer", "Critic")
+    ]
+    group_chat = GroupChat(agents=agents, messages=[], max_round=5)
+    select_with_manager_client([group_chat])
+    return group_chat, agents
+
+
+def test_auto_selection_uses_the_selectors_client():
+    group_chat, (planner, writer, _) = build_group_chat()
+    client = ScriptedClient("Writer")
+    messages = [{"role": "user", "name": "Planner", "content": "Writer, go"}]
+
+    speaker = group_chat._auto_select_speaker(
+        planner, SimpleNamespace(client=client), messages, None
+    )
+
+    assert speaker is writer
+    (prompt,) = client.prompts
+    assert prompt[0]["role"] == "system"
+    assert prompt[1] == messages[0]
+    assert prompt[-1]["name"] == "checking_agent"
+
+
+def test_auto_selection_requeries_then_falls_back_to_next_agent():
+    group_chat, (planner, writer, _) = build_group_chat()
+    client = ScriptedClient("Writer or Critic", "nobody", "still nobody")
+
+    speaker = group_chat._auto_select_speaker(
+        planner, SimpleNamespace(client=client), [{"content": "hi"}], None
+    )
+
+    assert speaker is writer
+    assert len(client.prompts) == 1 + group_chat.max_retries_for_selecting_speaker
+    assert client.prompts[1][-2] == {"role": "assistant", "content": "Writer or Critic"}
+
+
+def test_auto_selection_matches_whole_names_only():
+    group_chat, (planner, _, critic) = build_group_chat()
+    client = ScriptedClient("Critic (not the Writers)")
+
+    speaker = group_chat._auto_select_speaker(
+        planner, SimpleNamespace(client=client), [{"content": "hi"}], None
+    )
+
+    assert speaker is critic
+
+
+def test_missing_autogen_hooks_fail_loudly():
+    group_chat = SimpleNamespace(a_auto_select_speaker=None)
+    with pytest.raises(RuntimeError, match="_auto_select_speaker"):
+        select_with_manager_client([group_chat])
+
+
+class MeteredClient(ScriptedClient):
+    """Reports usage and cost on every response, as OpenAIWrapper does."""
+
+    def create(self, **config):
+        response = super().create(**config)
+        response.usage = SimpleNamespace(prompt_tokens=900, completion_tokens=2)
+        response.cost = 0.03
+        return response
+
+
+def test_auto_selection_is_metered_by_the_budget():
+    group_chat, (planner, _, _) = build_group_chat()
+    manager = SimpleNamespace(
+        client=MeteredClient("Writer"), _is_termination_msg=lambda message: False
+    )
+    governor = BudgetGovernor(max_tokens=500)
+    governor.attach([], manager)
+
+    group_chat._auto_select_speaker(planner, manager, [{"content": "hi"}], None)
+
+    assert governor.usage()["prompt_tokens"] == 900
+    assert manager._is_termination_msg({"content": ""})
+
+
+def test_auto_selection_is_routed_by_model_health():
+    group_chat, (planner, writer, _) = build_group_chat()
+    router = ModelRouter(max_error_rate=0.2)
+    with MockLLMServer(failing_models=["sel-a"]) as server:
+        entries = [
+            {
+                "model": model,
+                "api_key": "sk-mock",
+                "base_url": server.base_url,
+                "max_retries": 0,
+            }
+            for model in ("sel-a", "sel-b")
+        ]
+        manager = ConversableAgent(
+            "manager", llm_config={"config_list": entries, "cache_seed": None}
+        )
+        router.attach(manager)
+
+        for _ in range(2):
+            speaker = group_chat._auto_select_speaker(
+                planner,
+                manager,
+                [{"role": "user", "name": "Planner", "content": "Writer, go"}],
+                None,
+            )
+
+    assert speaker is writer
+    stats = router.stats()
+    # Demoted after its first failure, so the second selection skips it
+    assert stats["sel-a"]["demoted"] and stats["sel-a"]["calls"] == 1
+    assert stats["sel-b"]["calls"] == 2
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+from sections import (
+    SectionWriter,
+    _WriterState,
+    apply_edits,
+    named_sections,
+    split_sections,
+    stitch,
+)
+
+DRAFT = """# Title
+
+Lead-in.
+
+## First
+
+One.
+
+## Second
+
+Two."""
+
+
+def test_split_sections():
+    preamble, sections = split_sections(DRAFT)
+    assert preamble == "# Title\n\nLead-in."
+    assert sections == [("First", "## First\n\nOne."), ("Second", "## Second\n\nTwo.")]
+
+
+def test_split_without_headings():
+    assert split_sections("plain text") == ("plain text", [])
+
+
+def test_stitch_round_trips_and_adds_missing_headings():
+    preamble, sections = split_sections(DRAFT)
+    assert stitch(preamble, sections) == DRAFT
+    assert stitch("", [("Third", "Three.")]) == "## Third\n\nThree."
+
+
+def test_apply_edits_replaces_verbatim_text_only():
+    reply = "REPLACE: One.\nWITH: Uno.\nREPLACE: missing\nWITH: x\n"
+    document, applied = apply_edits(DRAFT, reply, max_edits=5)
+    assert applied == 1
+    assert "Uno." in document and "One." not in document
+
+
+def test_apply_edits_stops_at_max_edits():
+    reply = "REPLACE: One.\nWITH: 1\nREPLACE: Two.\nWITH: 2\n"
+    document, applied = apply_edits(DRAFT, reply, max_edits=1)
+    assert applied == 1
+    assert "Two." in document
+
+
+def test_apply_edits_none():
+    assert apply_edits(DRAFT, "NONE", max_edits=3) == (DRAFT, 0)
+
+
+def test_named_sections_matches_headings_case_insensitively():
+    review = 'Please revise the "second" section.'
+    assert named_sections(review, ["First", "Second"]) == ["Second"]
+    assert named_sections("Looks fine", ["First", "Second"]) == []
+
+
+def revision_plan(review):
+    writer = SimpleNamespace(name="Writer", client=object())
+    state = _WriterState(SimpleNamespace(client=object()))
+    state.content_type = "technical_blog"
+    messages = [
+        {"name": "Admin", "content": "Write a technical blog"},
+        {"name": "Writer", "content": DRAFT},
+        {"name": "Critic", "content": review},
+    ]
+    return SectionWriter(max_workers=1)._plan(writer, state, messages)
+
+
+def test_revision_rewrites_only_the_named_sections():
+    preamble, sections, check = revision_plan('Expand the "Second" section.')
+    assert preamble == "# Title\n\nLead-in."
+    assert sections[0] == ("First", "## First\n\nOne.")
+    assert sections[1][0] == "Second" and callable(sections[1][1])
+    assert not check
+
+
+def test_revision_naming_no_section_is_a_single_completion():
+    assert revision_plan("Tighten the intro.") is None
+
+
+def test_other_content_types_are_not_split():
+    writer = SimpleNamespace(name="Writer", client=object())
+    state = _WriterState(SimpleNamespace(client=object()))
+    state.content_type = "email"
+    messages = [{"name": "Admin", "content": "Write an email"}]
+    assert SectionWriter(max_workers=1)._plan(writer, state, messages) is None
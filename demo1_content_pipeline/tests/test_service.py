@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from service import JobQueue, QueueFull
+
+
+class BlockingSession:
+    """Stands in for PipelineSession; each run waits until released."""
+
+    def __init__(self, release):
+        self.release = release
+
+    def run(self, topic, content_type, resume=False, on_message=None, run_id=None):
+        self.release.wait(5)
+        return {"topic": topic, "content_type": content_type, "status": "approved"}
+
+
+def test_full_queue_rejects_with_retry_after():
+    release = threading.Event()
+    jobs = JobQueue(
+        workers=1,
+        queue_size=1,
+        session_factory=lambda: BlockingSession(release),
+    ).start()
+    try:
+        running = jobs.submit("one", "tutorial")
+        # Wait for the worker to take the first job off the queue
+        for _ in range(100):
+            if jobs.stats()["busy"]:
+                break
+            threading.Event().wait(0.01)
+        queued = jobs.submit("two", "tutorial")
+        assert jobs.position(queued) == 0
+
+        with pytest.raises(QueueFull) as error:
+            jobs.submit("three", "tutorial")
+        assert error.value.retry_after >= 1
+        assert jobs.stats()["rejected"] == 1
+
+        # Stopping with a full queue does not wait for a free slot
+        started = time.perf_counter()
+        jobs.stop(timeout=0.1)
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        jobs.stop(timeout=5)
+
+    assert running.finished and queued.finished
+    assert queued.result["status"] == "approved"
+    assert jobs.stats()["completed"] == 2
+
+
+class RecordingSession:
+    """Stands in for PipelineSession; records how each job was run."""
+
+    def __init__(self, runs):
+        self.runs = runs
+
+    def run(self, topic, content_type, resume=False, on_message=None, run_id=None):
+        self.runs.append((topic, resume, run_id))
+        return {"topic": topic, "content_type": content_type, "status": "approved"}
+
+
+def test_jobs_checkpoint_under_their_run_id():
+    runs = []
+    jobs = JobQueue(workers=1, session_factory=lambda: RecordingSession(runs)).start()
+    try:
+        first = jobs.submit("one", "tutorial")
+        first.wait(5)
+        resumed = jobs.submit("one", "tutorial", resume=first.run_id)
+        resumed.wait(5)
+    finally:
+        jobs.stop(timeout=5)
+
+    assert first.run_id == first.id
+    assert resumed.id != first.id and resumed.run_id == first.id
+    assert runs == [("one", False, first.id), ("one", True, first.id)]
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletionChunk
+
+from streaming import stream_chat_completion
+
+
+def chunk(delta=None, finish_reason=None, usage=None, index=0):
+    choices = (
+        [{"index": index, "delta": delta or {}, "finish_reason": finish_reason}]
+        if usage is None
+        else []
+    )
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4",
+            "choices": choices,
+            "usage": usage,
+        }
+    )
+
+
+class FakeOpenAI:
+    def __init__(self, chunks):
+        self.requests = []
+        self.chunks = chunks
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **params):
+        self.requests.append(params)
+        return iter(self.chunks)
+
+
+PARAMS = {"model": "gpt-4", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def test_content_is_forwarded_and_provider_usage_kept():
+    client = FakeOpenAI(
+        [
+            chunk({"role": "assistant", "content": "Hello "}),
+            chunk({"content": "world"}),
+            chunk(finish_reason="stop"),
+            chunk(
+                usage={
+                    "prompt_tokens": 12,
+                    "completion_tokens": 2,
+                    "total_tokens": 14,
+                    "prompt_tokens_details": {"cached_tokens": 8},
+                }
+            ),
+        ]
+    )
+    tokens = []
+
+    response = stream_chat_completion(client, PARAMS, tokens.append)
+
+    assert tokens == ["Hello ", "world"]
+    assert response.choices[0].message.content == "Hello world"
+    assert response.choices[0].finish_reason == "stop"
+    assert response.usage.prompt_tokens == 12
+    assert response.usage.prompt_tokens_details.cached_tokens == 8
+    assert client.requests[0]["stream"] is True
+    assert client.requests[0]["stream_options"] == {"include_usage": True}
+
+
+def test_tool_calls_are_assembled_and_usage_estimated_without_tiktoken():
+    call = {
+        "index": 0,
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "search_knowledge_base", "arguments": '{"topic": '},
+    }
+    client = FakeOpenAI(
+        [
+            chunk({"role": "assistant", "tool_calls": [call]}),
+            chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"x"}'}}]}),
+            chunk(finish_reason="tool_calls"),
+        ]
+    )
+    tokens = []
+
+    response = stream_chat_completion(client, PARAMS, tokens.append)
+
+    assert tokens == []
+    (tool_call,) = response.choices[0].message.tool_calls
+    assert tool_call.function.name == "search_knowledge_base"
+    assert tool_call.function.arguments == '{"topic": "x"}'
+    assert response.usage.prompt_tokens > 0
+
+
+def test_each_choice_keeps_its_own_tool_calls():
+    def call(name):
+        function = {"name": name, "arguments": "{}"}
+        return {"index": 0, "id": name, "type": "function", "function": function}
+
+    client = FakeOpenAI(
+        [
+            chunk({"role": "assistant", "tool_calls": [call("a")]}, index=0),
+            chunk({"role": "assistant", "content": "second"}, index=1),
+            chunk({"tool_calls": [call("b")]}, index=1),
+            chunk(finish_reason="tool_calls", index=0),
+            chunk(finish_reason="tool_calls", index=1),
+        ]
+    )
+    tokens = []
+
+    response = stream_chat_completion(client, {**PARAMS, "n": 2}, tokens.append)
+
+    first, second = (choice.message for choice in response.choices)
+    assert [c.function.name for c in first.tool_calls] == ["a"]
+    assert [c.function.name for c in second.tool_calls] == ["b"]
+    assert second.content == "second"
+    assert tokens == []
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import threading
+import time
+
+from autogen import ConversableAgent
+from autogen.io import IOStream
+
+from pipeline import NullIOStream
+from tool_executor import ParallelToolExecutor
+
+
+def tool_call(call_id, name):
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps({})},
+    }
+
+
+def make_agent(release):
+    def hang():
+        release.wait(5)
+        return "late"
+
+    def quick():
+        return "ok"
+
+    return ConversableAgent(
+        "admin",
+        llm_config=False,
+        human_input_mode="NEVER",
+        function_map={"hang": hang, "quick": quick},
+    )
+
+
+def test_hung_call_times_out_and_later_calls_get_a_fresh_pool():
+    release = threading.Event()
+    agent = make_agent(release)
+    executor = ParallelToolExecutor(max_workers=1, timeout_seconds=0.2)
+    try:
+        _, reply = executor.generate_tool_calls_reply(
+            agent, [{"tool_calls": [tool_call("1", "hang")]}]
+        )
+        assert "timed out" in reply["tool_responses"][0]["content"]
+        assert executor.stats() == {"calls": 1, "timeouts": 1, "hung": 1}
+
+        # The only worker of the first pool is still blocked
+        _, reply = executor.generate_tool_calls_reply(
+            agent, [{"tool_calls": [tool_call("2", "quick")]}]
+        )
+        assert reply["tool_responses"][0]["content"] == "ok"
+    finally:
+        release.set()
+
+
+def test_async_hung_call_is_reported_until_it_returns():
+    release = threading.Event()
+    agent = make_agent(release)
+    executor = ParallelToolExecutor(max_workers=2, timeout_seconds=0.2)
+
+    async def main():
+        return await executor.a_generate_tool_calls_reply(
+            agent,
+            [{"tool_calls": [tool_call("1", "hang"), tool_call("2", "quick")]}],
+        )
+
+    _, reply = asyncio.run(main())
+    contents = [response["content"] for response in reply["tool_responses"]]
+    assert "timed out" in contents[0]
+    assert contents[1] == "ok"
+    assert executor.stats()["hung"] == 1
+
+    release.set()
+    for _ in range(50):
+        if executor.stats()["hung"] == 0:
+            break
+        time.sleep(0.05)
+    assert executor.stats()["hung"] == 0
+
+
+def test_tool_output_goes_to_the_callers_iostream(capsys):
+    agent = make_agent(threading.Event())
+    executor = ParallelToolExecutor()
+
+    with IOStream.set_default(NullIOStream()):
+        _, reply = executor.generate_tool_calls_reply(
+            agent, [{"tool_calls": [tool_call("1", "quick")]}]
+        )
+
+    assert reply["tool_responses"][0]["content"] == "ok"
+    assert "EXECUTING FUNCTION" not in capsys.readouterr().out
@@ -0,0 +1,183 @@
+"""
+Concurrent execution of the tool calls in one assistant turn.
+
+With the ``tools`` calling format the model can request several lookups in a
+single message. AutoGen 0.2 runs them one after another on the executing
+agent; the reply functions here run them concurrently, each bounded by its
+own timeout, and answer with all results in one ``tool`` message.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from autogen import Agent, ConversableAgent
+
+
+def _tool_response(tool_call: Dict[str, Any], content: Any) -> Dict[str, Any]:
+    response = {"role": "tool", "content": "" if content is None else str(content)}
+    # Leave out a missing id, as AutoGen does, for Mistral-style APIs
+    if tool_call.get("id") is not None:
+        response["tool_call_id"] = tool_call["id"]
+    return response
+
+
+def _reply(tool_responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "role": "tool",
+        "tool_responses": tool_responses,
+        "content": "\n\n".join(response["content"] for response in tool_responses),
+    }
+
+
+class ParallelToolExecutor:
+    """
+    Runs every tool call of an assistant turn concurrently.
+
+    One instance (and its thread pool) is shared by all pipelines in the
+    process. A call that exceeds ``timeout_seconds`` is answered with an
+    error result. Python threads cannot be interrupted, so the hung call
+    keeps its worker until it returns; the pool it runs in is retired (it
+    finishes the work it has, then its threads exit) and later calls go to
+    a fresh pool, so hung tools cannot use up the workers. ``stats`` reports
+    how many timed-out calls are still holding a thread.
+    """
+
+    def __init__(self, max_workers: int = 8, timeout_seconds: float = 30.0):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._pool = self._new_pool()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "timeouts": 0, "hung": 0}
+
+    def _new_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="tool"
+        )
+
+    def _submit(self, func: Any, *args: Any) -> Tuple[ThreadPoolExecutor, Future]:
+        with self._lock:
+            self._stats["calls"] += 1
+            pool = self._pool
+            # In the caller's context, so tool output goes to its IOStream
+            return pool, pool.submit(contextvars.copy_context().run, func, *args)
+
+    def _abandon(self, pool: ThreadPoolExecutor, future: Future) -> None:
+        # The timed-out call may still be running in ``pool``
+        with self._lock:
+            self._stats["timeouts"] += 1
+            self._stats["hung"] += 1
+            if self._pool is pool:
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False)
+        future.add_done_callback(self._returned)
+
+    def _returned(self, future: Future) -> None:
+        with self._lock:
+            self._stats["hung"] -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return tool call totals.
+
+        Returns:
+            Calls run in threads, calls that timed out, and timed-out calls
+            still running (each holding a thread)
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def attach(self, agent: ConversableAgent) -> None:
+        """Handle ``agent``'s tool calls here instead of AutoGen's serial loop."""
+        reply_funcs = [entry["reply_func"] for entry in agent._reply_func_list]
+        agent.register_reply(
+            [Agent, None],
+            self.generate_tool_calls_reply,
+            position=reply_funcs.index(ConversableAgent.generate_tool_calls_reply),
+        )
+        reply_funcs = [entry["reply_func"] for entry in agent._reply_func_list]
+        agent.register_reply(
+            [Agent, None],
+            self.a_generate_tool_calls_reply,
+            position=reply_funcs.index(ConversableAgent.a_generate_tool_calls_reply),
+            ignore_async_in_sync_chat=True,
+        )
+
+    def _timeout_message(self, tool_call: Dict[str, Any]) -> str:
+        name = tool_call.get("function", {}).get("name")
+        return f"Error: {name} timed out after {self.timeout_seconds:g}s"
+
+    def _execute(self, agent: ConversableAgent, tool_call: Dict[str, Any]) -> str:
+        function_call = tool_call.get("function", {})
+        func = agent.function_map.get(function_call.get("name"))
+        if inspect.iscoroutinefunction(func):
+            _, result = asyncio.run(agent.a_execute_function(function_call))
+        else:
+            _, result = agent.execute_function(function_call)
+        return result.get("content")
+
+    def generate_tool_calls_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[Any] = None,
+    ) -> Tuple[bool, Optional[Dict]]:
+        """Execute the last message's tool calls in the thread pool."""
+        tool_calls = (messages[-1] if messages else {}).get("tool_calls") or []
+        if not tool_calls:
+            return False, None
+
+        deadline = time.monotonic() + self.timeout_seconds
+        submitted = [
+            self._submit(self._execute, recipient, tool_call)
+            for tool_call in tool_calls
+        ]
+        responses = []
+        for tool_call, (pool, future) in zip(tool_calls, submitted):
+            try:
+                content = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                self._abandon(pool, future)
+                content = self._timeout_message(tool_call)
+            responses.append(_tool_response(tool_call, content))
+        return True, _reply(responses)
+
+    async def a_generate_tool_calls_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[Any] = None,
+    ) -> Tuple[bool, Optional[Dict]]:
+        """Async variant: coroutine tools run on the event loop, others in the pool."""
+        tool_calls = (messages[-1] if messages else {}).get("tool_calls") or []
+        if not tool_calls:
+            return False, None
+
+        async def run(tool_call: Dict[str, Any]) -> Dict[str, Any]:
+            function_call = tool_call.get("function", {})
+            func = recipient.function_map.get(function_call.get("name"))
+            future = None
+            if inspect.iscoroutinefunction(func):
+                pending = recipient.a_execute_function(function_call)
+            else:
+                pool, future = self._submit(recipient.execute_function, function_call)
+                pending = asyncio.wrap_future(future)
+            try:
+                _, result = await asyncio.wait_for(pending, self.timeout_seconds)
+                content = result.get("content")
+            except asyncio.TimeoutError:
+                # Coroutine tools are cancelled; threads have to be abandoned
+                if future is not None:
+                    self._abandon(pool, future)
+                content = self._timeout_message(tool_call)
+            return _tool_response(tool_call, content)
+
+        responses = await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+        return True, _reply(list(responses))
@@ -1,5 +1,21 @@
 """Tools for the content creation pipeline."""
 
-from .knowledge_tools import search_knowledge_base, get_writing_guidelines
+from .knowledge_tools import (
+    search_knowledge_base,
+    get_writing_guidelines,
+    a_search_knowledge_base,
+    a_get_writing_guidelines,
+    add_knowledge_entry,
+    get_knowledge_store,
+    set_knowledge_store,
+)
 
-__all__ = ["search_knowledge_base", "get_writing_guidelines"]
+__all__ = [
+    "search_knowledge_base",
+    "get_writing_guidelines",
+    "a_search_knowledge_base",
+    "a_get_writing_guidelines",
+    "add_knowledge_entry",
+    "get_knowledge_store",
+    "set_knowledge_store",
+]
@@ -0,0 +1,207 @@
+"""
+Local embeddings and vector search for the knowledge base.
+
+Entries and queries are embedded with a hashing vectorizer: every term and
+its character n-grams are hashed into a fixed number of signed dimensions,
+so "containers" lands near "containerization" without a model download or
+a fitted vocabulary. Vectors live in one contiguous float32 matrix and a
+batch of queries is ranked with a single matrix product.
+
+NumPy is imported here only; the stores import this module the first time a
+semantic search runs, so importing the tools package stays cheap.
+"""
+
+import math
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .retrieval import document_terms, tokenize
+
+DEFAULT_DIM = 512
+NGRAM_SIZES = (3, 4, 5)
+
+
+def _features(term: str) -> Iterable[str]:
+    """The term itself and its character n-grams, with word boundaries marked."""
+    yield term
+    padded = f"<{term}>"
+    for n in NGRAM_SIZES:
+        for start in range(len(padded) - n + 1):
+            yield padded[start : start + n]
+
+
+class HashingEmbedder:
+    """
+    Stateless text embedder using the hashing trick.
+
+    Features are hashed with CRC32 rather than ``hash()`` so vectors are
+    identical across processes and can be stored alongside the entries.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self._feature_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _term_vector(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        cached = self._feature_cache.get(term)
+        if cached is None:
+            hashes = [zlib.crc32(f.encode("utf-8")) for f in _features(term)]
+            indices = np.array([h % self.dim for h in hashes], dtype=np.intp)
+            # The top bit picks the sign so collisions tend to cancel out
+            signs = np.array(
+                [1.0 if h & 0x80000000 else -1.0 for h in hashes], dtype=np.float32
+            )
+            cached = self._feature_cache[term] = (indices, signs)
+        return cached
+
+    def embed_terms(self, terms: Counter) -> np.ndarray:
+        """L2-normalized vector for weighted term counts (sublinear tf)."""
+        if not terms:
+            return np.zeros(self.dim, dtype=np.float32)
+        features = [self._term_vector(term) for term in terms]
+        term_weights = [1.0 + math.log(count) for count in terms.values()]
+        weights = np.concatenate([signs for _, signs in features]) * np.repeat(
+            term_weights, [len(signs) for _, signs in features]
+        )
+        vector = np.bincount(
+            np.concatenate([indices for indices, _ in features]),
+            weights,
+            minlength=self.dim,
+        ).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_entry(self, doc_id: str, entry: Dict[str, Any]) -> np.ndarray:
+        return self.embed_terms(document_terms(doc_id, entry))
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return self.embed_terms(Counter(tokenize(query.replace("_", " "))))
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Stack query vectors into a (len(queries), dim) matrix."""
+        matrix = np.empty((len(queries), self.dim), dtype=np.float32)
+        for row, query in enumerate(queries):
+            matrix[row] = self.embed_query(query)
+        return matrix
+
+
+class VectorIndex:
+    """
+    Unit vectors in a contiguous, growable float32 matrix.
+
+    Rows are kept dense: removing a document moves the last row into its
+    slot, so a search always multiplies against ``matrix[:len(self)]``.
+    Capacity doubles as documents are added.
+
+    Writes hold a lock. A search takes the matrix and ids under it and ranks
+    without it, so writes that change rows a search may be reading (replacing
+    or removing a document) copy them first; appends only touch new rows.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, capacity: int = 64):
+        self.dim = dim
+        self._matrix = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def add(self, doc_id: str, vector: np.ndarray) -> None:
+        """Store a document's vector, replacing any previous version."""
+        with self._lock:
+            row = self._rows.get(doc_id)
+            if row is None:
+                row = len(self._ids)
+                if row == len(self._matrix):
+                    grown = np.zeros((2 * row, self.dim), dtype=np.float32)
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+                self._ids.append(doc_id)
+                self._rows[doc_id] = row
+            else:
+                self._matrix = self._matrix.copy()
+            self._matrix[row] = vector
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return
+            self._ids = list(self._ids)
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._matrix = self._matrix.copy()
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+
+    def search(
+        self, queries: np.ndarray, top_k: int = 3
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Rank documents by cosine similarity for a batch of query vectors.
+
+        Args:
+            queries: (n_queries, dim) matrix of unit vectors
+            top_k: Maximum number of results per query
+
+        Returns:
+            One list of (doc_id, similarity) pairs per query, best first
+        """
+        with self._lock:
+            ids = self._ids
+            n_docs = len(ids)
+            matrix = self._matrix[:n_docs]
+        if not n_docs or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ matrix.T
+        k = min(top_k, n_docs)
+        if k < n_docs:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n_docs), (len(queries), n_docs))
+        results = []
+        for row, candidates in enumerate(top):
+            order = candidates[np.argsort(-scores[row, candidates], kind="stable")]
+            results.append([(ids[i], float(scores[row, i])) for i in order])
+        return results
+
+
+def hybrid_rank(
+    keyword: List[Tuple[str, float]],
+    semantic: List[Tuple[str, float]],
+    weight: float,
+    min_similarity: float,
+    top_k: int,
+) -> List[Tuple[str, float]]:
+    """
+    Blend keyword and semantic rankings into one list.
+
+    Keyword scores are divided by the best keyword score so both signals
+    lie in [0, 1]; the result is ``weight * similarity + (1 - weight) *
+    keyword``. Documents without a keyword match are kept only when their
+    similarity reaches ``min_similarity``, so unrelated queries still come
+    back empty.
+    """
+    best_keyword = max((score for _, score in keyword), default=0.0)
+    combined: Dict[str, float] = {}
+    if best_keyword > 0:
+        for doc_id, score in keyword:
+            combined[doc_id] = (1 - weight) * score / best_keyword
+    for doc_id, similarity in semantic:
+        if doc_id in combined or similarity >= min_similarity:
+            combined[doc_id] = combined.get(doc_id, 0.0) + weight * max(similarity, 0.0)
+    ranked = sorted(combined.items(), key=lambda item: item[1], reverse=True)
+    return ranked[:top_k]
@@ -0,0 +1,344 @@
+"""
+Storage backends for the knowledge base.
+
+The in-memory store keeps the demo's built-in entries and a BM25 index in
+the process. The SQLite store keeps entries and a full-text index on disk,
+loads entries on demand and holds only a bounded LRU of them in memory, so
+many worker processes can share one large corpus file.
+
+Both stores support three search modes: "keyword" (BM25 only), "semantic"
+(cosine similarity of local hashing embeddings, see embeddings.py) and
+"hybrid", which blends the two so paraphrased queries still find an entry.
+
+Build a SQLite knowledge base with build_kb.py.
+"""
+
+import abc
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .retrieval import BM25Index, tokenize
+
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
+# Semantic and hybrid searches rank this many candidates per requested result
+# from each signal before blending
+CANDIDATE_FACTOR = 4
+
+
+class KnowledgeStore(abc.ABC):
+    """
+    Interface shared by the knowledge base backends.
+
+    Subclasses implement the abstract storage and keyword search methods;
+    search dispatches on search_mode. The vector index is built on the first
+    semantic or hybrid search, so NumPy is never imported by keyword-only
+    stores.
+    """
+
+    def __init__(
+        self,
+        search_mode: str = "keyword",
+        embedding_dim: int = 512,
+        hybrid_weight: float = 0.5,
+        min_similarity: float = 0.2,
+    ):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode '{search_mode}', expected one of {SEARCH_MODES}"
+            )
+        self.search_mode = search_mode
+        self.embedding_dim = embedding_dim
+        self.hybrid_weight = hybrid_weight
+        self.min_similarity = min_similarity
+        self._embedder = None
+        self._vectors = None
+        self._vectors_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry stored under ``key``, or None."""
+
+    @abc.abstractmethod
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store ``entry`` under ``key``, replacing any earlier version."""
+
+    @abc.abstractmethod
+    def keyword_search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Rank entries by keyword (BM25) score, best first."""
+
+    @abc.abstractmethod
+    def _load_vectors(self, embedder, vectors) -> None:
+        """Fill a new, empty vector index with every stored entry."""
+
+    def _vector_index(self):
+        if self._vectors is None:
+            with self._vectors_lock:
+                if self._vectors is None:
+                    from .embeddings import HashingEmbedder, VectorIndex
+
+                    embedder = HashingEmbedder(self.embedding_dim)
+                    vectors = VectorIndex(self.embedding_dim)
+                    self._load_vectors(embedder, vectors)
+                    self._embedder = embedder
+                    self._vectors = vectors
+        return self._embedder, self._vectors
+
+    def _index_vector(self, key: str, entry: Dict[str, Any]):
+        """Keep an already built vector index current; returns the vector."""
+        if self._vectors is None:
+            return None
+        vector = self._embedder.embed_entry(key, entry)
+        self._vectors.add(key, vector)
+        return vector
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Rank entries against a free-text query using the store's search mode.
+
+        Returns:
+            List of (key, score) pairs, best first; empty if nothing matches
+        """
+        if self.search_mode == "keyword":
+            return self.keyword_search(query, top_k)
+        return self.search_many([query], top_k)[0]
+
+    def search_many(
+        self, queries: List[str], top_k: int
+    ) -> List[List[Tuple[str, float]]]:
+        """Rank entries for several queries with one batched vector search."""
+        if self.search_mode == "keyword":
+            return [self.keyword_search(query, top_k) for query in queries]
+
+        from .embeddings import hybrid_rank
+
+        embedder, vectors = self._vector_index()
+        pool = top_k * CANDIDATE_FACTOR
+        semantic = vectors.search(embedder.embed_queries(queries), pool)
+        if self.search_mode == "semantic":
+            return [
+                [(key, s) for key, s in ranked if s >= self.min_similarity][:top_k]
+                for ranked in semantic
+            ]
+        return [
+            hybrid_rank(
+                self.keyword_search(query, pool),
+                ranked,
+                weight=self.hybrid_weight,
+                min_similarity=self.min_similarity,
+                top_k=top_k,
+            )
+            for query, ranked in zip(queries, semantic)
+        ]
+
+    @abc.abstractmethod
+    def keys(self, limit: Optional[int] = None) -> Iterator[str]:
+        """Iterate over the stored keys, at most ``limit`` of them."""
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class InMemoryKnowledgeStore(KnowledgeStore):
+    """Dict-backed store with an incremental BM25 index."""
+
+    def __init__(
+        self, entries: Optional[Dict[str, Dict[str, Any]]] = None, **search_options
+    ):
+        super().__init__(**search_options)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._index = BM25Index()
+        for key, entry in (entries or {}).items():
+            self.put(key, entry)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(key)
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._entries[key] = entry
+        self._index.add(key, entry)
+        self._index_vector(key, entry)
+
+    def keyword_search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        return self._index.search(query, top_k=top_k)
+
+    def _load_vectors(self, embedder, vectors) -> None:
+        for key, entry in list(self._entries.items()):
+            vectors.add(key, embedder.embed_entry(key, entry))
+
+    def keys(self, limit: Optional[int] = None) -> Iterator[str]:
+        return iter(list(self._entries)[:limit])
+
+
+class SQLiteKnowledgeStore(KnowledgeStore):
+    """
+    Disk-backed store using SQLite with an FTS5 full-text index.
+
+    Entries are stored as JSON and decoded only when requested; decoded
+    entries are kept in a bounded LRU. Ranking uses FTS5's built-in BM25 with
+    the same field weights as the in-memory index.
+
+    Embeddings are stored as float32 blobs next to the entries. A worker
+    reads them into its vector index on the first semantic search; entries
+    without a vector of the configured size are embedded then and the
+    vectors written back, so the corpus is embedded once, not per worker.
+    """
+
+    def __init__(self, path: str, cache_size: int = 1024, **search_options):
+        super().__init__(**search_options)
+        self.path = path
+        self.cache_size = cache_size
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                """CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    key UNINDEXED, title, key_points, examples, common_pitfalls
+                )"""
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entry_vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry
+            row = self._conn.execute(
+                "SELECT data FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = json.loads(row[0])
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self.put_many([(key, entry)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Insert or replace many entries in one transaction.
+
+        Outside keyword mode each entry's embedding is stored as well.
+        """
+        if self.search_mode != "keyword":
+            self._vector_index()
+        with self._lock, self._conn:
+            for key, entry in items:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?)",
+                    (key, json.dumps(entry, ensure_ascii=False)),
+                )
+                self._conn.execute("DELETE FROM entries_fts WHERE key = ?", (key,))
+                self._conn.execute(
+                    "INSERT INTO entries_fts VALUES (?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        f"{key.replace('_', ' ')} {entry.get('title', '')}",
+                        "\n".join(entry.get("key_points", [])),
+                        "\n".join(entry.get("examples", [])),
+                        "\n".join(entry.get("common_pitfalls", [])),
+                    ),
+                )
+                self._cache.pop(key, None)
+                vector = self._index_vector(key, entry)
+                if vector is None:
+                    self._conn.execute(
+                        "DELETE FROM entry_vectors WHERE key = ?", (key,)
+                    )
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entry_vectors VALUES (?, ?)",
+                        (key, vector.tobytes()),
+                    )
+
+    def keyword_search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        terms = set(tokenize(query.replace("_", " ")))
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in sorted(terms))
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT key, bm25(entries_fts, 0.0, 2.0, 1.0, 1.0, 1.0) AS rank
+                FROM entries_fts WHERE entries_fts MATCH ?
+                ORDER BY rank LIMIT ?""",
+                (match, top_k),
+            ).fetchall()
+        # FTS5 reports BM25 as a negative number where lower is better.
+        return [(key, -rank) for key, rank in rows]
+
+    def _load_vectors(self, embedder, vectors) -> None:
+        import numpy as np
+
+        size = embedder.dim * np.dtype(np.float32).itemsize
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT entries.key, entry_vectors.vector FROM entries
+                LEFT JOIN entry_vectors ON entry_vectors.key = entries.key"""
+            ).fetchall()
+        stale = []
+        for key, blob in rows:
+            if blob is not None and len(blob) == size:
+                vectors.add(key, np.frombuffer(blob, dtype=np.float32))
+            else:
+                stale.append(key)
+        if not stale:
+            return
+        updates = []
+        for key in stale:
+            vector = embedder.embed_entry(key, self.get(key))
+            vectors.add(key, vector)
+            updates.append((key, vector.tobytes()))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entry_vectors VALUES (?, ?)", updates
+            )
+
+    def keys(self, limit: Optional[int] = None) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM entries ORDER BY key LIMIT ?",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        return (key for (key,) in rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(
+    backend: str, path: str = "", cache_size: int = 1024, **search_options
+) -> KnowledgeStore:
+    """
+    Open a knowledge base store.
+
+    Args:
+        backend: "memory" for the built-in entries, or "sqlite"
+        path: SQLite database file (sqlite backend only)
+        cache_size: Maximum number of decoded entries kept in memory
+        **search_options: search_mode, embedding_dim, hybrid_weight and
+            min_similarity, passed to the store
+
+    Returns:
+        The opened store
+    """
+    if backend == "sqlite":
+        return SQLiteKnowledgeStore(path, cache_size=cache_size, **search_options)
+    if backend == "memory":
+        from .knowledge_tools import KNOWLEDGE_BASE
+
+        return InMemoryKnowledgeStore(KNOWLEDGE_BASE, **search_options)
+    raise ValueError(f"Unknown knowledge base backend '{backend}'")
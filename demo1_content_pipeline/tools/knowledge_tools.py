@@ -3,10 +3,17 @@ Knowledge base tools for research.
 Simple, local tools without external API dependencies.
 """
 
-from typing import Dict, List, Any
+import asyncio
+import threading
+from typing import Dict, List, Any, Optional
 
+from .kb_store import KnowledgeStore, open_store
 
-# Simple in-memory knowledge base for demo purposes
+DEFAULT_TOP_K = 3
+MAX_LISTED_TOPICS = 20
+
+
+# Built-in entries served by the default "memory" backend (see kb_store.py)
 KNOWLEDGE_BASE = {
     "python_asyncio": {
         "title": "Python Asyncio Basics",
@@ -114,36 +121,107 @@ KNOWLEDGE_BASE = {
 }
 
 
-def search_knowledge_base(topic: str) -> Dict[str, Any]:
+_store: Optional[KnowledgeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_knowledge_store() -> KnowledgeStore:
+    """
+    Return the process-wide knowledge store, opening it on first use.
+
+    The backend is chosen by KB_BACKEND in config: "memory" serves the
+    built-in KNOWLEDGE_BASE, "sqlite" opens KB_PATH and loads entries lazily.
+    KB_SEARCH_MODE picks keyword, semantic or hybrid ranking.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                import config
+
+                _store = open_store(
+                    config.KB_BACKEND,
+                    config.KB_PATH,
+                    config.KB_CACHE_SIZE,
+                    **search_options(),
+                )
+    return _store
+
+
+def search_options() -> Dict[str, Any]:
+    """Store search settings from config (KB_SEARCH_MODE and friends)."""
+    import config
+
+    return {
+        "search_mode": config.KB_SEARCH_MODE,
+        "embedding_dim": config.KB_EMBEDDING_DIM,
+        "hybrid_weight": config.KB_HYBRID_WEIGHT,
+        "min_similarity": config.KB_MIN_SIMILARITY,
+    }
+
+
+def set_knowledge_store(store: KnowledgeStore) -> None:
+    """Use ``store`` for all subsequent knowledge base lookups."""
+    global _store
+    _store = store
+
+
+def add_knowledge_entry(key: str, entry: Dict[str, Any]) -> None:
+    """
+    Add or replace a knowledge base entry and index it for search.
+
+    Args:
+        key: Entry identifier (e.g., "python_asyncio")
+        entry: Dictionary with title, key_points, examples, and common_pitfalls
+    """
+    get_knowledge_store().put(key, entry)
+
+
+def search_knowledge_base(topic: str, top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
     """
     Search the knowledge base for information on a given topic.
 
-    This is a read-only, safe tool with no side effects.
+    This is a read-only, safe tool with no side effects. Entries are ranked
+    over their titles, key points, examples, and pitfalls with BM25, local
+    embeddings, or a blend of both (KB_SEARCH_MODE).
 
     Args:
-        topic: The topic to search for (e.g., "python_asyncio", "autogen_agents")
+        topic: The topic to search for (e.g., "python asyncio", "autogen agents")
+        top_k: Maximum number of ranked matches to return
 
     Returns:
-        Dictionary with title, key_points, examples, and common_pitfalls
+        Dictionary with the best match under "data" and the ranked matches
+        (key, score, data) under "results"
         Returns error message if topic not found
     """
+    store = get_knowledge_store()
     topic_normalized = topic.lower().replace(" ", "_").replace("-", "_")
 
-    # Try exact match first
-    if topic_normalized in KNOWLEDGE_BASE:
+    # An exact key always wins
+    exact = store.get(topic_normalized)
+    if exact is not None:
         return {
             "success": True,
             "topic": topic,
-            "data": KNOWLEDGE_BASE[topic_normalized],
+            "data": exact,
+            "results": [{"key": topic_normalized, "score": None, "data": exact}],
         }
 
-    # Try partial match
-    for key, value in KNOWLEDGE_BASE.items():
-        if topic_normalized in key or key in topic_normalized:
-            return {"success": True, "topic": topic, "data": value}
+    ranked = store.search(topic, top_k)
+    if ranked:
+        results = [
+            {"key": key, "score": round(score, 3), "data": store.get(key)}
+            for key, score in ranked
+        ]
+        return {
+            "success": True,
+            "topic": topic,
+            "data": results[0]["data"],
+            "results": results,
+        }
 
-    # List available topics if not found
-    available_topics = list(KNOWLEDGE_BASE.keys())
+    # List (a sample of) available topics if not found
+    available_topics = list(store.keys(limit=MAX_LISTED_TOPICS))
     return {
         "success": False,
         "topic": topic,
@@ -272,6 +350,20 @@ def get_writing_guidelines(content_type: str = "technical_blog") -> Dict[str, An
         }
 
 
+async def a_search_knowledge_base(
+    topic: str, top_k: int = DEFAULT_TOP_K
+) -> Dict[str, Any]:
+    """Async wrapper around search_knowledge_base for async pipelines."""
+    return await asyncio.to_thread(search_knowledge_base, topic, top_k)
+
+
+async def a_get_writing_guidelines(
+    content_type: str = "technical_blog",
+) -> Dict[str, Any]:
+    """Async wrapper around get_writing_guidelines for async pipelines."""
+    return await asyncio.to_thread(get_writing_guidelines, content_type)
+
+
 # Tool schemas for AutoGen registration
 TOOL_SCHEMAS = [
     {
@@ -304,3 +396,6 @@ TOOL_SCHEMAS = [
         },
     },
 ]
+
+# The same schemas wrapped for the ``tools`` calling format
+TOOLS = [{"type": "function", "function": schema} for schema in TOOL_SCHEMAS]
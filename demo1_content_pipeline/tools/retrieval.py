@@ -0,0 +1,134 @@
+"""
+Inverted-index retrieval with BM25 scoring for the knowledge base.
+
+Documents can be added (or replaced) one at a time, so the index grows
+incrementally with the knowledge base instead of being rebuilt.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the to with".split()
+)
+
+# Fields of a knowledge base entry that are indexed, with their weight.
+# Title terms count double so a query naming a topic ranks that topic first.
+FIELD_WEIGHTS = {
+    "title": 2,
+    "key_points": 1,
+    "examples": 1,
+    "common_pitfalls": 1,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics and drop stopwords."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _field_text(item)
+
+
+def document_terms(doc_id: str, entry: Dict[str, Any]) -> Counter:
+    """
+    Count weighted term frequencies for one knowledge base entry.
+
+    The entry key (e.g. "python_asyncio") is indexed like a title so lookups
+    by the old key names keep working.
+    """
+    terms = Counter()
+    for token in tokenize(doc_id.replace("_", " ")):
+        terms[token] += FIELD_WEIGHTS["title"]
+    for field, weight in FIELD_WEIGHTS.items():
+        for text in _field_text(entry.get(field)):
+            for token in tokenize(text):
+                terms[token] += weight
+    return terms
+
+
+class BM25Index:
+    """
+    Token-level inverted index scored with Okapi BM25.
+
+    Postings map each term to the documents containing it and the term's
+    frequency there, so a query only touches documents sharing a term with it.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: str, entry: Dict[str, Any]) -> None:
+        """Index a knowledge base entry, replacing any previous version."""
+        if doc_id in self._doc_lengths:
+            self.remove(doc_id)
+
+        terms = document_terms(doc_id, entry)
+        for term, frequency in terms.items():
+            self._postings[term][doc_id] = frequency
+        length = sum(terms.values())
+        self._doc_lengths[doc_id] = length
+        self._doc_terms[doc_id] = tuple(terms)
+        self._total_length += length
+
+    def remove(self, doc_id: str) -> None:
+        length = self._doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id):
+            del self._postings[term][doc_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Rank documents against a free-text query.
+
+        Args:
+            query: Free-text query (e.g., "asyncio event loop")
+            top_k: Maximum number of results to return
+
+        Returns:
+            List of (doc_id, score) pairs, best first; empty if nothing matches
+        """
+        if not self._doc_lengths:
+            return []
+
+        n_docs = len(self._doc_lengths)
+        avg_length = self._total_length / n_docs
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term in set(tokenize(query.replace("_", " "))):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length
+                )
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
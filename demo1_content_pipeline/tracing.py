@@ -0,0 +1,256 @@
+"""
+Per-round, per-agent instrumentation for the content pipeline.
+
+A Tracer records one span per LLM completion, speaker selection and tool
+execution. Spans carry the agent, the group chat round they happened in,
+wall time, token usage, cache status and fallbacks, and are appended to a
+JSONL file after each run so slow stages can be found across many runs.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from autogen import Agent, GroupChat, GroupChatManager, UserProxyAgent
+
+from llm_cache import from_cache
+from prompt_prefix import cached_tokens
+
+SPAN_LLM = "llm"
+SPAN_SPEAKER = "speaker_selection"
+SPAN_TOOL = "tool"
+
+
+def _usage(response: Any) -> Dict[str, int]:
+    usage = getattr(response, "usage", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        # Part of prompt_tokens the provider served from its prefix cache
+        "cached_prompt_tokens": cached_tokens(response),
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+class Tracer:
+    """
+    Collects spans for one pipeline run.
+
+    Thread-safe, since AutoGen's async path runs completions in executor
+    threads. ``round`` on every span is the number of group chat messages
+    when the span started.
+    """
+
+    def __init__(self, group_chat: Optional[GroupChat] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.group_chat = group_chat
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Start a new trace, for reusing the instrumented pipeline."""
+        with self._lock:
+            self.trace_id = uuid.uuid4().hex
+            self.spans = []
+
+    def current_round(self) -> int:
+        return len(self.group_chat.messages) if self.group_chat is not None else 0
+
+    @contextmanager
+    def span(
+        self, kind: str, agent: str, **attributes: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block and record it as a span.
+
+        The yielded dict can be updated inside the block to attach results
+        (tokens, cache status); an exception is recorded and re-raised.
+        """
+        record = {
+            "trace_id": self.trace_id,
+            "kind": kind,
+            "agent": agent,
+            "round": self.current_round(),
+            "start": time.time(),
+            **attributes,
+        }
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration_s"] = round(time.perf_counter() - started, 6)
+            with self._lock:
+                self.spans.append(record)
+
+    def export_jsonl(self, path: str) -> None:
+        """Append this run's spans to ``path``, one JSON object per line."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "a", encoding="utf-8") as f:
+            for record in spans:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate spans by kind and agent (tool spans by tool name).
+
+        Returns:
+            One row per group with count, total/mean/max seconds, token
+            totals (prompt, prefix-cached prompt, completion), completion
+            cache hits and errors, slowest group first
+        """
+        groups: Dict[tuple, Dict[str, Any]] = defaultdict(
+            lambda: {
+                "count": 0,
+                "total_s": 0.0,
+                "max_s": 0.0,
+                "prompt_tokens": 0,
+                "cached_prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cache_hits": 0,
+                "errors": 0,
+            }
+        )
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            name = record.get("tool") or record["agent"]
+            row = groups[(record["kind"], name)]
+            row["count"] += 1
+            row["total_s"] += record["duration_s"]
+            row["max_s"] = max(row["max_s"], record["duration_s"])
+            row["prompt_tokens"] += record.get("prompt_tokens", 0)
+            row["cached_prompt_tokens"] += record.get("cached_prompt_tokens", 0)
+            row["completion_tokens"] += record.get("completion_tokens", 0)
+            row["cache_hits"] += 1 if record.get("cached") else 0
+            row["errors"] += 1 if "error" in record else 0
+
+        rows = []
+        for (kind, name), row in groups.items():
+            row["mean_s"] = row["total_s"] / row["count"]
+            rows.append({"kind": kind, "name": name, **row})
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def format_summary(self) -> str:
+        header = (
+            f"{'kind':<18}{'name':<24}{'calls':>6}{'total s':>10}{'mean s':>9}"
+            f"{'max s':>9}{'prompt':>9}{'pfx hit':>9}{'compl':>8}{'cached':>8}"
+        )
+        lines = [header, "─" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['kind']:<18}{row['name'][:23]:<24}{row['count']:>6}"
+                f"{row['total_s']:>10.2f}{row['mean_s']:>9.2f}{row['max_s']:>9.2f}"
+                f"{row['prompt_tokens']:>9}{row['cached_prompt_tokens']:>9}"
+                f"{row['completion_tokens']:>8}{row['cache_hits']:>8}"
+            )
+        return "\n".join(lines)
+
+
+def _instrument_client(tracer: Tracer, agent: Agent) -> None:
+    client = getattr(agent, "client", None)
+    if client is None:
+        return
+    create = client.create
+
+    @functools.wraps(create)
+    def traced_create(**config: Any) -> Any:
+        with tracer.span(SPAN_LLM, agent.name) as record:
+            response = create(**config)
+            record.update(_usage(response))
+            record["model"] = getattr(response, "model", None)
+            record["cached"] = from_cache(response)
+            # Number of config_list entries that failed before this one answered
+            record["retries"] = getattr(response, "config_id", 0) or 0
+            return response
+
+    client.create = traced_create
+
+
+def _instrument_speaker_selection(tracer: Tracer, group_chat: GroupChat) -> None:
+    select_speaker = group_chat.select_speaker
+    a_select_speaker = group_chat.a_select_speaker
+
+    @functools.wraps(select_speaker)
+    def traced_select_speaker(last_speaker: Agent, selector: Agent) -> Agent:
+        with tracer.span(
+            SPAN_SPEAKER, selector.name, last_speaker=last_speaker.name
+        ) as record:
+            speaker = select_speaker(last_speaker, selector)
+            record["selected"] = speaker.name
+            return speaker
+
+    @functools.wraps(a_select_speaker)
+    async def a_traced_select_speaker(last_speaker: Agent, selector: Agent) -> Agent:
+        with tracer.span(
+            SPAN_SPEAKER, selector.name, last_speaker=last_speaker.name
+        ) as record:
+            speaker = await a_select_speaker(last_speaker, selector)
+            record["selected"] = speaker.name
+            return speaker
+
+    group_chat.select_speaker = traced_select_speaker
+    group_chat.a_select_speaker = a_traced_select_speaker
+
+
+def _trace_tool(tracer: Tracer, executor: str, name: str, func: Callable) -> Callable:
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def a_traced_tool(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(SPAN_TOOL, executor, tool=name):
+                return await func(*args, **kwargs)
+
+        return a_traced_tool
+
+    @functools.wraps(func)
+    def traced_tool(*args: Any, **kwargs: Any) -> Any:
+        with tracer.span(SPAN_TOOL, executor, tool=name):
+            return func(*args, **kwargs)
+
+    return traced_tool
+
+
+def instrument_pipeline(
+    agents: List[Agent],
+    user_proxy: UserProxyAgent,
+    group_chat: GroupChat,
+    manager: GroupChatManager,
+) -> Tracer:
+    """
+    Attach a new Tracer to a freshly built pipeline.
+
+    Wraps each agent's LLM client, the group chat's speaker selection and
+    the tools in the Admin's function map. "auto" speaker selection calls
+    the manager's client (see routing.select_with_manager_client), so each
+    selection completion gets an llm span for the manager inside its
+    speaker_selection span.
+
+    Returns:
+        The Tracer collecting this pipeline's spans
+    """
+    tracer = Tracer(group_chat)
+    for agent in agents + [manager]:
+        _instrument_client(tracer, agent)
+    # GroupChatManager runs the chat on a shallow copy of the GroupChat made
+    # when its reply functions were registered, so patch those copies too.
+    for reply_func in manager._reply_func_list:
+        if isinstance(reply_func["config"], GroupChat):
+            _instrument_speaker_selection(tracer, reply_func["config"])
+    _instrument_speaker_selection(tracer, group_chat)
+    function_map = user_proxy.function_map
+    for name, func in list(function_map.items()):
+        function_map[name] = _trace_tool(tracer, user_proxy.name, name, func)
+    return tracer